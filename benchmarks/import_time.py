@@ -0,0 +1,118 @@
+"""Measure startup cost of each `run.py` mode.
+
+Every mode is timed in fresh interpreters: the wall time of importing what
+the mode loads before doing any work, and the slowest outermost imports from
+`python -X importtime`. Pipelines are not run.
+
+Examples:
+
+    # time all modes, results go to benchmarks/results/import_time_<commit>.json
+    python -m benchmarks.import_time
+
+    # time selected modes with more repeats
+    python -m benchmarks.import_time --mode help --mode training --repeats 10
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import click
+
+from benchmarks.run_benchmarks import RESULTS_DIR, _git_commit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# code each mode executes before its own work starts
+MODES = {
+    "help": "import sys, runpy; sys.argv = ['run.py', '--help']\n"
+            "try:\n    runpy.run_path('run.py', run_name='__main__')\n"
+            "except SystemExit:\n    pass",
+    "show_leaderboard": "import run; from utils.leaderboard import Leaderboard",
+    "serve": "import run; from utils.prediction_server import serve",
+    "training": "import run; from zenml.client import Client; "
+                "from pipelines.training import e2e_use_case_training",
+    "only_inference": "import run; from zenml.client import Client; "
+                      "from pipelines.deployment import e2e_use_case_deployment; "
+                      "from pipelines.batch_inference import e2e_use_case_batch_inference",
+}
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _run(code: str, importtime: bool = False) -> Tuple[float, str]:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    start = time.perf_counter()
+    result = subprocess.run(
+        command, cwd=REPO_DIR, capture_output=True, text=True,
+        env={
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")])),
+        },
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "failed")
+    return elapsed, result.stderr
+
+
+def slowest_imports(importtime_output: str, top: int = 10) -> List[Tuple[str, float]]:
+    """Cumulative import time in ms of the outermost imports from `-X importtime` output."""
+    totals: Dict[str, float] = defaultdict(float)
+    for line in importtime_output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        # only outermost imports, their cumulative time includes nested ones
+        if match and len(match.group(3)) == 1:
+            totals[match.group(4)] += int(match.group(2)) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def measure_mode(mode: str, repeats: int) -> Dict[str, object]:
+    """Median wall time of starting a mode and its slowest imports."""
+    try:
+        timings = [_run(MODES[mode])[0] for _ in range(repeats)]
+        _, importtime_output = _run(MODES[mode], importtime=True)
+    except RuntimeError as e:
+        return {"mode": mode, "wall_s": None, "error": str(e)}
+    return {
+        "mode": mode,
+        "wall_s": statistics.median(timings),
+        "min_wall_s": min(timings),
+        "slowest_imports_ms": dict(slowest_imports(importtime_output)),
+        "error": None,
+    }
+
+
+@click.command(help=__doc__)
+@click.option("--mode", "modes", multiple=True, type=click.Choice(list(MODES)),
+              help="Modes to time, all by default.")
+@click.option("--repeats", default=5, type=click.IntRange(min=1),
+              help="Fresh interpreters started per mode.")
+@click.option("--output", default=None, type=click.Path(dir_okay=False),
+              help="Results JSON file.")
+def main(modes: Tuple[str, ...] = (), repeats: int = 5, output: Optional[str] = None):
+    commit = _git_commit()
+    records = []
+    for mode in modes or MODES:
+        record = measure_mode(mode, repeats)
+        records.append({"commit": commit, **record})
+        if record["error"]:
+            click.echo(f"{mode:<18} FAILED {record['error']}")
+            continue
+        slowest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in list(record["slowest_imports_ms"].items())[:3])
+        click.echo(f"{mode:<18} {record['wall_s']:.2f}s  ({slowest})")
+
+    output = output or os.path.join(RESULTS_DIR, f"import_time_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(records, f, indent=2)
+    click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Benchmark pipeline steps on synthetic datasets of configurable scale.
+
+Steps are called directly through their entrypoints, outside of the orchestrator.
+Steps that need a step context (hyperparameter search, training, inference) are
+not run; the estimator calls at their core are timed instead, under their own
+names: `search_fit[<strategy>]`, `forest_fit` and `chunked_predict`.
+
+Examples:
+
+    # benchmark default scales, results go to benchmarks/results/<commit>.json/.csv
+    python -m benchmarks.run_benchmarks --preset default
+
+    # benchmark custom scales
+    python -m benchmarks.run_benchmarks --rows 10000,100000 --cols 30,100
+
+    # diff results of two commits
+    python -m benchmarks.run_benchmarks --compare results/abc123.json results/def456.json
+"""
+import csv
+import json
+import os
+import subprocess
+import time
+from datetime import datetime as dt
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import click
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic import make_synthetic_dataset
+from steps.etl.traini_data_preprocessor import train_data_preprocessor
+from steps.etl.train_data_split import train_data_splitter
+from utils.hp_search import build_search
+from utils.preprocess import transform_inference_frame
+from utils.resources import RSSSampler
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "results")
+TARGET = "target"
+
+SCALE_PRESETS = {
+    "smoke": {"rows": [10_000], "cols": [30]},
+    "default": {"rows": [10_000, 100_000, 1_000_000], "cols": [30, 100]},
+    "full": {"rows": [10_000, 100_000, 1_000_000, 10_000_000], "cols": [30, 100, 1000]},
+}
+
+SEARCH_GRID = {
+    "criterion": ["gini", "entropy"],
+    "max_depth": [2, 4, 6, 8, 10, 12],
+    "min_samples_leaf": range(1, 10),
+    "n_estimators": range(50, 500, 25),
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return "unknown"
+
+
+def measure(fn: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, float]]:
+    """Run `fn` and measure wall time, CPU time, peak RSS and RSS growth over the start."""
+    with RSSSampler() as sampler:
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result = fn(*args, **kwargs)
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.process_time() - cpu_start
+    return result, {
+        "wall_s": wall_time,
+        "cpu_s": cpu_time,
+        "peak_mb": sampler.peak_mb,
+        "delta_mb": sampler.delta_mb,
+    }
+
+
+def _subsample(dataset, max_rows: int):
+    if len(dataset) <= max_rows:
+        return dataset
+    return dataset.sample(max_rows, random_state=42)
+
+
+def _chunked_predict(model, preprocess_pipeline, dataset, chunk_size: int) -> int:
+    features = dataset.drop(columns=[TARGET])
+    for start in range(0, len(features), chunk_size):
+        chunk = features.iloc[start: start + chunk_size]
+        model.predict(transform_inference_frame(preprocess_pipeline, chunk, TARGET))
+    return len(features)
+
+
+def benchmark_scale(
+        n_rows: int,
+        n_cols: int,
+        hp_max_rows: int,
+        train_max_rows: int,
+        chunk_size: int,
+) -> List[Dict[str, Any]]:
+    """Benchmark all steps on one synthetic dataset size."""
+    records = []
+
+    def record(step: str, fn: Callable, rows: int, *args, **kwargs):
+        try:
+            result, metrics = measure(fn, *args, **kwargs)
+            error = None
+        except Exception as e:
+            result, metrics, error = None, {"wall_s": None, "cpu_s": None, "peak_mb": None, "delta_mb": None}, repr(e)
+        records.append({
+            "step": step,
+            "rows": n_rows,
+            "cols": n_cols,
+            "rows_processed": rows,
+            **metrics,
+            "rows_per_s": rows / metrics["wall_s"] if metrics["wall_s"] else None,
+            "error": error,
+        })
+        click.echo(
+            f"  {step:<32} rows={rows:<10} "
+            + (f"wall={metrics['wall_s']:.2f}s peak={metrics['peak_mb']:.0f}MB "
+               f"delta={metrics['delta_mb']:+.0f}MB" if error is None else f"FAILED {error}")
+        )
+        return result
+
+    # roughly 1% of rows get a missing value, independent of the column count
+    dataset, _ = measure(make_synthetic_dataset, n_rows, n_cols, TARGET, na_fraction=0.01 / n_cols)
+    split = record(
+        "train_data_splitter", train_data_splitter.entrypoint, n_rows,
+        dataset=dataset, test_size=0.2,
+    )
+    if split is None:
+        return records
+    raw_trn, raw_tst = split
+    del dataset
+
+    preprocessed = None
+    for fused in (False, True):
+        result = record(
+            f"train_data_preprocessor{'[fused]' if fused else ''}",
+            train_data_preprocessor.entrypoint, n_rows,
+            dataset_trn=raw_trn, dataset_tst=raw_tst,
+            drop_na=True, normalize=True, fused=fused, target=TARGET,
+        )
+        preprocessed = result or preprocessed
+    if preprocessed is None:
+        return records
+    dataset_trn, _, preprocess_pipeline = preprocessed
+
+    hp_sample = _subsample(dataset_trn, hp_max_rows)
+    x_hp, y_hp = hp_sample.drop(columns=[TARGET]), hp_sample[TARGET]
+    for strategy in ("random", "halving", "hyperband"):
+        search_strategy = {"name": strategy}
+        if strategy != "random":
+            search_strategy["resource"] = "n_estimators"
+        search = build_search(
+            RandomForestClassifier(), dict(SEARCH_GRID), y_hp, search_strategy
+        )
+        record(f"search_fit[{strategy}]", search.fit, len(hp_sample), x_hp, y_hp)
+
+    train_sample = _subsample(dataset_trn, train_max_rows)
+    model = RandomForestClassifier(n_estimators=100, max_depth=10, n_jobs=-1)
+    record(
+        "forest_fit", model.fit, len(train_sample),
+        train_sample.drop(columns=[TARGET]), train_sample[TARGET],
+    )
+    record(
+        "chunked_predict", _chunked_predict, len(raw_tst),
+        model, preprocess_pipeline, raw_tst, chunk_size,
+    )
+    return records
+
+
+def write_results(records: List[Dict[str, Any]], output: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(records, f, indent=2)
+    with open(f"{os.path.splitext(output)[0]}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def _delta_mb(record: Dict[str, Any]) -> float:
+    # result files written before `delta_mb` was added stored the growth as `peak_mb`
+    return record.get("delta_mb", record["peak_mb"])
+
+
+def compare_results(baseline: str, candidate: str) -> None:
+    """Print wall time and RSS growth change per step and scale between two result files.
+
+    Growth is compared rather than peak RSS, which includes whatever earlier
+    benchmarks left allocated in the process.
+    """
+    def load(path):
+        with open(path) as f:
+            return {(r["step"], r["rows"], r["cols"]): r for r in json.load(f)}
+
+    before, after = load(baseline), load(candidate)
+    click.echo(f"{'step':<36}{'rows':>10}{'cols':>6}{'wall':>10}{'delta':>10}")
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if old["wall_s"] is None or new["wall_s"] is None:
+            continue
+        click.echo(
+            f"{key[0]:<36}{key[1]:>10}{key[2]:>6}"
+            f"{(new['wall_s'] / old['wall_s'] - 1) * 100:>+9.1f}%"
+            f"{(_delta_mb(new) / max(_delta_mb(old), 1e-9) - 1) * 100:>+9.1f}%"
+        )
+
+
+def _int_list(_ctx, _param, value: Optional[str]) -> Optional[List[int]]:
+    return [int(v) for v in value.split(",")] if value else None
+
+
+@click.command(help=__doc__)
+@click.option("--preset", default="smoke", type=click.Choice(list(SCALE_PRESETS)),
+              help="Predefined set of dataset sizes.")
+@click.option("--rows", default=None, callback=_int_list,
+              help="Comma-separated row counts, overrides the preset.")
+@click.option("--cols", default=None, callback=_int_list,
+              help="Comma-separated column counts, overrides the preset.")
+@click.option("--max-cells", default=500_000_000, type=click.IntRange(min=1),
+              help="Skip sizes with more rows x columns than this.")
+@click.option("--hp-max-rows", default=100_000, type=click.IntRange(min=1),
+              help="Rows sampled for hyperparameter search benchmarks.")
+@click.option("--train-max-rows", default=1_000_000, type=click.IntRange(min=1),
+              help="Rows sampled for the training benchmark.")
+@click.option("--chunk-size", default=100_000, type=click.IntRange(min=1),
+              help="Chunk size of the batch inference benchmark.")
+@click.option("--output", default=None, type=click.Path(dir_okay=False),
+              help="Results JSON file, a CSV is written next to it.")
+@click.option("--compare", nargs=2, default=None, type=click.Path(exists=True, dir_okay=False),
+              help="Compare two results JSON files instead of running benchmarks.")
+def main(
+        preset: str = "smoke",
+        rows: Optional[List[int]] = None,
+        cols: Optional[List[int]] = None,
+        max_cells: int = 500_000_000,
+        hp_max_rows: int = 100_000,
+        train_max_rows: int = 1_000_000,
+        chunk_size: int = 100_000,
+        output: Optional[str] = None,
+        compare: Optional[Tuple[str, str]] = None,
+):
+    if compare:
+        compare_results(*compare)
+        return
+
+    commit = _git_commit()
+    started = dt.now().isoformat(timespec="seconds")
+    records = []
+    for n_rows in rows or SCALE_PRESETS[preset]["rows"]:
+        for n_cols in cols or SCALE_PRESETS[preset]["cols"]:
+            if n_rows * n_cols > max_cells:
+                click.echo(f"Skipping {n_rows}x{n_cols}, above --max-cells")
+                continue
+            click.echo(f"Benchmarking {n_rows} rows x {n_cols} columns")
+            for record in benchmark_scale(n_rows, n_cols, hp_max_rows, train_max_rows, chunk_size):
+                records.append({"commit": commit, "started": started, **record})
+
+    if not records:
+        click.echo("Nothing to benchmark")
+        return
+    output = output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    write_results(records, output)
+    click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
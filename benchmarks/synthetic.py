@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+
+
+def make_synthetic_dataset(
+        n_rows: int,
+        n_cols: int,
+        target: str = "target",
+        na_fraction: float = 0.0,
+        random_state: int = 42,
+) -> pd.DataFrame:
+    """Generate a binary classification dataset shaped like the breast cancer data.
+
+    Args:
+        n_rows: Number of rows.
+        n_cols: Number of feature columns.
+        target: Name of target column.
+        na_fraction: Share of feature values replaced with NA.
+        random_state: Seed of the generator.
+
+    Returns:
+        Dataset with float32 features `f0..f{n_cols-1}` and an integer target.
+    """
+    X, y = make_classification(
+        n_samples=n_rows,
+        n_features=n_cols,
+        n_informative=max(2, min(n_cols // 3, 30)),
+        n_redundant=min(n_cols // 10, 10),
+        random_state=random_state,
+    )
+    X = X.astype(np.float32)
+    if na_fraction > 0:
+        rng = np.random.RandomState(random_state)
+        X[rng.random_sample(X.shape) < na_fraction] = np.nan
+    dataset = pd.DataFrame(X, columns=[f"f{i}" for i in range(n_cols)], copy=False)
+    dataset[target] = y
+    return dataset
@@ -0,0 +1,2 @@
+from materializers.compact_forest_materializer import CompactForestMaterializer
+from materializers.parquet_dataframe_materializer import ParquetDataFrameMaterializer
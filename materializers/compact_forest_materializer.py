@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any, ClassVar, Optional, Tuple, Type
+
+from utils.compact_forest import CompactForest
+
+from zenml.enums import ArtifactType
+from zenml.io import fileio
+from zenml.materializers.base_materializer import BaseMaterializer
+
+# written instead of the arrays when the model could not be exported
+_NOT_EXPORTED_FILENAME = "not_exported"
+
+
+class CompactForestMaterializer(BaseMaterializer):
+    """Materializer storing a `CompactForest` as `.npy` arrays.
+
+    Artifacts on local disk are loaded memory-mapped in place, others are
+    copied to a temporary directory first, which is deleted once the loaded
+    forest is garbage collected or the process exits. `None` is stored as a
+    marker for models that have no compact representation.
+    """
+
+    ASSOCIATED_TYPES: ClassVar[Tuple[Type[Any], ...]] = (CompactForest,)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.MODEL
+
+    def load(self, data_type: Type[Any]) -> Optional[CompactForest]:
+        if fileio.exists(os.path.join(self.uri, _NOT_EXPORTED_FILENAME)):
+            return None
+        if os.path.isdir(self.uri):
+            return CompactForest.load(self.uri)
+        directory = tempfile.mkdtemp(prefix="compact_model_")
+        try:
+            for filename in fileio.listdir(self.uri):
+                fileio.copy(os.path.join(self.uri, filename), os.path.join(directory, filename))
+            forest = CompactForest.load(directory)
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        # the arrays are mapped from the copy and worker processes reload it by path,
+        # so it has to live as long as the forest does
+        weakref.finalize(forest, shutil.rmtree, directory, ignore_errors=True)
+        return forest
+
+    def save(self, data: Optional[CompactForest]) -> None:
+        if data is None:
+            with fileio.open(os.path.join(self.uri, _NOT_EXPORTED_FILENAME), "w") as f:
+                f.write("")
+            return
+        if os.path.isdir(self.uri):
+            data.save(self.uri)
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            data.save(directory)
+            for filename in os.listdir(directory):
+                fileio.copy(os.path.join(directory, filename), os.path.join(self.uri, filename))
@@ -1,7 +1,13 @@
+from typing import Dict, Optional
+
 from steps.etl.data_loader import data_loader
 from steps.etl.inference_data_preprocessor import inference_data_processing
 from steps.data_quality.drift_quality_gate import drift_quality_gate
+from steps.data_quality.streaming_drift_gate import streaming_drift_gate
 from steps.inference.inference_predict import inference_predict
+from steps.inference.segmented_inference_predict import segmented_inference_predict
+from steps.inference.sharded_inference_predict import sharded_inference_predict
+from steps.inference.streaming_inference_predict import streaming_inference_predict
 from steps.alerts.notify_on import notify_on_failure, notify_on_success
 
 from zenml import get_pipeline_context, pipeline
@@ -12,38 +18,122 @@ from zenml.logger import get_logger
 logger = get_logger(__name__)
 
 @pipeline(on_failure=notify_on_failure)
-def e2e_use_case_batch_inference():
+def e2e_use_case_batch_inference(
+        streaming_source: Optional[str] = None,
+        streaming_output: Optional[str] = None,
+        chunk_size: int = 100_000,
+        native_drift: bool = False,
+        fail_on_drift: bool = False,
+        n_shards: Optional[int] = None,
+        prediction_cache: bool = False,
+        segment_key: Optional[str] = None,
+        segment_models: Optional[Dict[str, str]] = None,
+        default_segment_model: Optional[str] = None,
+):
     """
         Model batch inference pipeline.
 
         This is a pipeline that loads the inference data, processes
         it, analyze for data drift and run inference.
+
+        Args:
+            streaming_source: Path to a local CSV/Parquet scoring set. If set, it is
+                scored chunk by chunk and predictions are appended to a Parquet file
+            streaming_output: Path of the predictions Parquet file in streaming mode
+            chunk_size: Number of rows per chunk in streaming mode
+            native_drift: If `True` drift is computed in a single pass against the
+                `reference_sketch` built at training time instead of a full Evidently report
+            fail_on_drift: If `True` drift found by the native engine fails the run,
+                otherwise it is only logged. Streamed scoring sets are checked once
+                all predictions are written
+            n_shards: If set, the streaming scoring set is split into this many shards
+                scored by parallel worker processes
+            prediction_cache: If `True` predictions of feature rows scored before by the
+                same model version are reused from an on-disk cache
+            segment_key: If set with `segment_models`, rows are routed by this column
+                to per-segment model versions, all scored in this run
+            segment_models: `name:version` model spec per segment value
+            default_segment_model: Model spec for segments missing in `segment_models`
     """
 
     model = get_pipeline_context().model
+    if streaming_source:
+        if not native_drift:
+            logger.warning(
+                "Streaming inference skips the full-frame data quality report."
+            )
+        streaming_args = {
+            "source_path": streaming_source,
+            "output_path": streaming_output,
+            "chunk_size": chunk_size,
+            "preprocess_pipeline": model.get_artifact("preprocess_pipeline"),
+            "reference_sketch": model.get_artifact("reference_sketch") if native_drift else None,
+            "fail_on_drift": fail_on_drift,
+        }
+        if n_shards:
+            sharded_inference_predict(n_shards=n_shards, **streaming_args)
+            predict_step = "sharded_inference_predict"
+        else:
+            streaming_inference_predict(**streaming_args)
+            predict_step = "streaming_inference_predict"
+        notify_on_success(
+            after=[predict_step],
+        )
+        return
+
     ##### ETL STAGE ####
     df_inference, target = data_loader(random_state=model.get_artifact("random_state"),
                                        is_inference=True)
+    if segment_key and segment_models:
+        logger.warning(
+            "Segmented inference skips the data quality report and drift checks, each model "
+            "version has its own reference data."
+        )
+        segmented_inference_predict(
+            dataset_inf=df_inference,
+            segment_key=segment_key,
+            segment_models=segment_models,
+            default_model=default_segment_model,
+            target=target,
+        )
+        notify_on_success(
+            after=["segmented_inference_predict"],
+        )
+        return
+
     df_inference = inference_data_processing(
         dataset_inf = df_inference, preprocess_pipeline = model.get_artifact("preprocess_pipeline"),
         target = target,
     )
 
     #### DataQuality stage ####
-    report, _ = evidently_report_step(
-        reference_dataset = model.get_artifact("dataset_trn"),
-        comparison_dataset = df_inference,
-        ignored_columns = ["target"],
-        metrics = [
-            EvidentlyMetricConfig.metric("DataQualityPreset"),
-        ],
-    )
-    drift_quality_gate(report)
+    if native_drift:
+        streaming_drift_gate(
+            dataset_inf=df_inference,
+            reference_sketch=model.get_artifact("reference_sketch"),
+            chunk_size=chunk_size,
+            fail_on_drift=fail_on_drift,
+        )
+        drift_gate = "streaming_drift_gate"
+    else:
+        # the report stays an artifact for inspection, the gate compares NA metadata
+        evidently_report_step(
+            reference_dataset = model.get_artifact("dataset_trn"),
+            comparison_dataset = df_inference,
+            ignored_columns = ["target"],
+            metrics = [
+                EvidentlyMetricConfig.metric("DataQualityPreset"),
+            ],
+        )
+        drift_quality_gate(after=["inference_data_processing"])
+        drift_gate = "drift_quality_gate"
 
     #### Inference stage #####
     inference_predict(
         dataset_inf = df_inference,
-        after=["drift_quality_gate"],
+        prediction_cache=prediction_cache,
+        preprocess_pipeline=model.get_artifact("preprocess_pipeline") if prediction_cache else None,
+        after=[drift_gate],
     )
 
     notify_on_success(
@@ -2,13 +2,21 @@ import random
 from typing import Any, Dict, List, Optional
 
 from steps.alerts.notify_on import notify_on_failure, notify_on_success
+from steps.data_quality.reference_sketch_builder import reference_sketch_builder
+from steps.etl.cached_train_data_preparation import cached_train_data_preparation
 from steps.etl.data_loader import data_loader
+from steps.etl.shared_data_cleanup import shared_data_cleanup
+from steps.etl.shared_data_materializer import shared_data_materializer
+from steps.etl.split_dataset_loader import split_dataset_loader
+from steps.etl.streaming_train_data_split import streaming_train_data_splitter
 from steps.etl.traini_data_preprocessor import train_data_preprocessor
 from steps.etl.train_data_split import train_data_splitter
+from steps.hp_tuning.hp_tuning_parallel_search import hp_tuning_parallel_search
 from steps.hp_tuning.hp_tuning_single_search import hp_tuning_single_search
 from steps.hp_tuning.hp_tuning_select_best_model import hp_tuning_select_best_model
 from steps.promotion.compute_performance_metric import compute_performance_metric_on_current_data
 from steps.promotion.promote_with_metric_compare import promote_with_metric_compare
+from steps.training.compact_model_exporter import compact_model_exporter
 from steps.training.model_evaluator import model_evaluator
 from steps.training.model_trainer import model_trainer
 
@@ -28,6 +36,16 @@ def e2e_use_case_training(
         min_train_accuracy: float = 0.0,
         min_test_accuracy: float = 0.0,
         fail_on_accuracy_quality_gates: bool = False,
+        shared_memory_search: bool = False,
+        incremental_training: bool = False,
+        etl_cache: bool = False,
+        fused_preprocessing: bool = False,
+        split_key: Optional[str] = None,
+        stratified_split: bool = False,
+        split_source: Optional[str] = None,
+        parallel_search: bool = False,
+        early_stopping_evaluation: bool = False,
+        mlflow_autolog: str = "full",
 ):
     """
         Model training pipeline.
@@ -47,46 +65,140 @@ def e2e_use_case_training(
             min_test_accuracy: Threshold to stop execution if test set accuracy is lower
             fail_on_accuracy_quality_gates: If `True` and `min_train_accuracy` or `min_test_accuracy`
                 are not met - execution will be interrupted early
+            shared_memory_search: If `True` datasets are materialized once as memory-mapped
+                arrays shared by all hyperparameter search steps
+            incremental_training: If `True` the model promoted to `target_env` is trained
+                further on new rows only, when its estimator and feature schema allow it
+            etl_cache: If `True` split and preprocessing outputs are reused from an on-disk
+                cache keyed on the source data and preprocessing parameters
+            fused_preprocessing: If `True` preprocessing runs as a single pass over a
+                contiguous array instead of a chain of DataFrame-copying stages
+            split_key: Column with a stable row identifier. If set, train/test
+                assignment is by the hash of this column instead of random
+            stratified_split: If `True` a hash split is stratified on the target. Every
+                class is split exactly, but rows only keep their partition for unchanged data
+            split_source: Local CSV/Parquet dataset with a `target` column to hash split
+                out-of-core by `split_key` instead of loading the dataset with `data_loader`
+            parallel_search: If `True` all model configurations are searched in a
+                single step over one shared process pool instead of a step per configuration
+            early_stopping_evaluation: If `True` quality gates are decided on sampled subsets
+                with confidence intervals, full datasets are only scored for borderline models
+            mlflow_autolog: MLflow autologging in model training, `full`, `light` or `off`
     """
-    raw_data, target, _ = data_loader(
-        random_state=random.randint(0, 100)
-    )
-    dataset_trn, dataset_tst = train_data_splitter(
-        dataset = raw_data, test_size=test_size
-    )
-    dataset_trn, dataset_tst, _ = train_data_preprocessor(
-        dataset_trn=dataset_trn,
-        dataset_tst=dataset_tst,
-        drop_na=drop_na,
-        normalize=normalize,
-        drop_columns=drop_columns,
-    )
+    if split_source is not None:
+        if split_key is None:
+            raise ValueError("`split_source` is split by the hash of `split_key`, which is not set")
+        target = "target"
+        raw_trn_path, raw_tst_path = streaming_train_data_splitter(
+            source_path=split_source,
+            split_key=split_key,
+            test_size=test_size,
+            stratify_on=target if stratified_split else None,
+        )
+        dataset_trn, dataset_tst, _ = split_dataset_loader(
+            train_path=raw_trn_path, test_path=raw_tst_path, split_key=split_key,
+            random_state=random.randint(0, 100),
+        )
+        dataset_trn, dataset_tst, _ = train_data_preprocessor(
+            dataset_trn=dataset_trn,
+            dataset_tst=dataset_tst,
+            drop_na=drop_na,
+            normalize=normalize,
+            drop_columns=drop_columns,
+            fused=fused_preprocessing,
+            target=target,
+        )
+    elif etl_cache:
+        raw_data, target, _ = data_loader(
+            random_state=random.randint(0, 100)
+        )
+        dataset_trn, dataset_tst, _ = cached_train_data_preparation(
+            dataset=raw_data,
+            target=target,
+            test_size=test_size,
+            split_key=split_key,
+            stratify_on=target if stratified_split else None,
+            drop_na=drop_na,
+            normalize=normalize,
+            drop_columns=drop_columns,
+            fused=fused_preprocessing,
+        )
+    else:
+        raw_data, target, _ = data_loader(
+            random_state=random.randint(0, 100)
+        )
+        dataset_trn, dataset_tst = train_data_splitter(
+            dataset = raw_data, test_size=test_size,
+            split_key=split_key,
+            stratify_on=target if stratified_split else None,
+        )
+        dataset_trn, dataset_tst, _ = train_data_preprocessor(
+            dataset_trn=dataset_trn,
+            dataset_tst=dataset_tst,
+            drop_na=drop_na,
+            normalize=normalize,
+            drop_columns=drop_columns,
+            fused=fused_preprocessing,
+            target=target,
+        )
+
+    reference_sketch_builder(dataset_trn=dataset_trn, target=target)
 
     #### Hyperparameter tuning ####
+    if shared_memory_search:
+        search_datasets = {
+            "shared_dataset": shared_data_materializer(
+                dataset_trn=dataset_trn,
+                dataset_tst=dataset_tst,
+                target=target,
+            )
+        }
+    else:
+        search_datasets = {"dataset_tr": dataset_trn, "dataset_tst": dataset_tst}
     after = []
     search_steps_prefix = "hp_tuning_search_"
-    for config_name, model_search_configuration in model_search_space.items():
-        step_name = f"{search_steps_prefix}{config_name}"
-        hp_tuning_single_search(
-            id=step_name,
-            model_package=model_search_configuration["model_package"],
-            model_class=model_search_configuration["model_class"],
-            search_grid=model_search_configuration["search_grid"],
-            dataset_tst=dataset_tst,
-            dataset_trn=dataset_trn,
+    if parallel_search:
+        hp_tuning_parallel_search(
+            model_search_space=model_search_space,
             target=target,
+            **search_datasets,
         )
-        after.append(step_name)
+        after.append("hp_tuning_parallel_search")
+    else:
+        for config_name, model_search_configuration in model_search_space.items():
+            step_name = f"{search_steps_prefix}{config_name}"
+            hp_tuning_single_search(
+                id=step_name,
+                config_name=config_name,
+                model_package=model_search_configuration["model_package"],
+                model_class=model_search_configuration["model_class"],
+                search_grid=model_search_configuration["search_grid"],
+                search_strategy=model_search_configuration.get("search_strategy"),
+                prebin=model_search_configuration.get("prebin", False),
+                max_fit_time_s=model_search_configuration.get("max_fit_time_s"),
+                target=target,
+                **search_datasets,
+            )
+            after.append(step_name)
     best_model = hp_tuning_select_best_model(
-        step_name=after, after=after,
+        step_names=after, after=after,
     )
+    if shared_memory_search:
+        shared_data_cleanup(
+            shared_dataset=search_datasets["shared_dataset"],
+            after=after,
+        )
 
     ##### Training Stage ####
     model = model_trainer(
         dataset_trn=dataset_trn,
-        dataset_tst=dataset_tst,
+        model=best_model,
         target=target,
+        incremental=incremental_training,
+        target_env=target_env,
+        autolog_mode=mlflow_autolog,
     )
+    compact_model_exporter(model=model, dataset_tst=dataset_tst, target=target)
 
     model_evaluator(
         model=model,
@@ -95,21 +207,23 @@ def e2e_use_case_training(
         min_test_accuracy=min_test_accuracy,
         min_train_accuracy=min_train_accuracy,
         fail_on_accuracy_quality_gates=fail_on_accuracy_quality_gates,
+        early_stopping=early_stopping_evaluation,
         target=target,
     )
 
     #### Promotions Stage ####
-    latest_metric, current_metric = (
+    latest_metric, current_metric, metric_comparison = (
         compute_performance_metric_on_current_data(
             dataset_tst=dataset_tst,
             target_env=target_env,
-            after=["model_evaluator"],
+            after=["model_evaluator", "compact_model_exporter"],
         )
     )
 
     last_step = promote_with_metric_compare(
         latest_metric=latest_metric,
         current_metric=current_metric,
+        metric_comparison=metric_comparison,
         mlflow_model_name="e2e_use_case",
         target_env=target_env,
         after=["compute_performance_metric_on_current_data"],
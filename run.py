@@ -6,15 +6,19 @@ from typing import Optional
 import click
 import yaml
 
-from pipelines.training import e2e_use_case_training
-from pipelines.deployment import e2e_use_case_deployment
-from pipelines.batch_inference import e2e_use_case_batch_inference
-
+# pipelines, integrations and the ZenML client are imported only by the modes
+# that need them, so `--help`, `--serve` or `--show-leaderboard` start fast
 from zenml.logger import get_logger
-from zenml.client import Client
 
 logger = get_logger(__name__)
 
+# training config file of each `--training-profile`
+TRAINING_PROFILES = {
+    "default": "train_config.yaml",
+    "fast": "train_config_fast.yaml",
+}
+
+
 @click.command(
     help="""
 ZenML E2E project CLI v0.0.1.
@@ -43,11 +47,59 @@ Examples:
   # as test set.
   python run.py --no-drop-na --no-normalize --drop-columns A,B,C --test-size 0.1
 
+  \b
+  # Run the pipeline with NA drop, column drop and normalization
+  # fused into a single pass over the dataset
+  python run.py --drop-columns A,B,C --fused-preprocessing
+
   \b
   # Run the pipeline with Quality Gate for accuracy set at 90% for train set 
   # and 85% for test set. If any of accuracies will be lower - pipeline will fail.
   python run.py --min-train-accuracy 0.9 --min-test-accuracy 0.85 --fail-on-accuracy-quality-gates
 
+  \b
+  # Run the pipeline with hyperparameter search steps sharing
+  # memory-mapped datasets instead of loading their own copies
+  python run.py --shared-memory-search
+
+  \b
+  # Run the pipeline continuing training of the promoted model
+  # on new rows only (warm start / partial fit)
+  python run.py --incremental-training
+
+  \b
+  # Run the pipeline reusing cached split and preprocessing
+  # outputs when source data and parameters are unchanged
+  python run.py --etl-cache
+
+  \b
+  # Run only batch inference, streaming a large scoring set
+  # in chunks of 50k rows into a Parquet predictions file
+  python run.py --only-inference --inference-source scoring.parquet \\
+    --inference-output predictions.parquet --inference-chunk-size 50000
+
+  \b
+  # Score the same file in 8 shards over parallel worker processes
+  python run.py --only-inference --inference-source scoring.parquet --inference-shards 8
+
+  \b
+  # Run only batch inference with single-pass drift statistics
+  # against the reference sketch built at training time
+  python run.py --only-inference --native-drift
+
+  \b
+  # Same, failing the run if the scoring set drifted
+  python run.py --only-inference --native-drift --fail-on-drift
+
+  \b
+  # Serve online predictions of the staging model on localhost:8000
+  # with micro-batches of up to 128 rows waiting at most 2ms
+  python run.py --serve --serve-port 8000 --max-batch-size 128 --max-wait-ms 2
+
+  \b
+  # Show the 10 best hyperparameter search results over all runs
+  python run.py --show-leaderboard --leaderboard-size 10
+
   \b
   # Run the pipeline with explicit MLFlow stack setup
   python run.py --setup-mlflow-stack
@@ -104,12 +156,179 @@ Examples:
     help="Whether to fail the pipeline run if the model evaluation step "
          "finds that the model is not accurate enough.",
 )
+@click.option(
+    "--early-stopping-evaluation",
+    is_flag=True,
+    default=False,
+    help="Whether the model evaluation step decides quality gates on sampled "
+         "subsets with confidence intervals instead of full datasets.",
+)
+@click.option(
+    "--shared-memory-search",
+    is_flag=True,
+    default=False,
+    help="Whether to share the preprocessed datasets as memory-mapped arrays "
+         "across all hyperparameter search steps.",
+)
+@click.option(
+    "--mlflow-autolog",
+    default="full",
+    type=click.Choice(["full", "light", "off"]),
+    help="MLflow autologging in model training. `light` skips datasets, input "
+         "examples and signatures, `off` logs only params and the model.",
+)
+@click.option(
+    "--training-profile",
+    default="default",
+    type=click.Choice(list(TRAINING_PROFILES)),
+    help="Training config to run. `fast` searches histogram gradient boosting "
+         "on pre-binned features with capped fit times, for large retrains.",
+)
+@click.option(
+    "--parallel-search",
+    is_flag=True,
+    default=False,
+    help="Whether to search all model configurations in one step over a shared "
+         "process pool instead of one step per configuration.",
+)
+@click.option(
+    "--incremental-training",
+    is_flag=True,
+    default=False,
+    help="Whether to continue training the promoted model on new rows only "
+         "instead of fitting from scratch.",
+)
+@click.option(
+    "--etl-cache",
+    is_flag=True,
+    default=False,
+    help="Whether to reuse split and preprocessing outputs from an on-disk "
+         "cache keyed on the source data and preprocessing parameters.",
+)
+@click.option(
+    "--fused-preprocessing",
+    is_flag=True,
+    default=False,
+    help="Whether to preprocess the dataset in a single pass over a contiguous "
+         "array instead of a chain of DataFrame-copying stages.",
+)
+@click.option(
+    "--split-key",
+    default=None,
+    type=click.STRING,
+    help="Column with a stable row identifier to split train/test by its hash "
+         "instead of randomly.",
+)
+@click.option(
+    "--stratified-split",
+    is_flag=True,
+    default=False,
+    help="Whether a hash split is stratified on the target. Every class is split "
+         "exactly, but rows only keep their partition for an unchanged dataset.",
+)
+@click.option(
+    "--split-source",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Local CSV/Parquet training set with a `target` column to split out-of-core "
+         "by the hash of --split-key instead of loading the default dataset.",
+)
 @click.option(
     "--only-inference",
     is_flag=True,
     default=False,
     help="Whether to run only inference pipeline.",
 )
+@click.option(
+    "--inference-source",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Local CSV/Parquet scoring set to stream through batch inference in chunks.",
+)
+@click.option(
+    "--inference-output",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Parquet file to append streamed predictions to.",
+)
+@click.option(
+    "--inference-chunk-size",
+    default=100_000,
+    type=click.IntRange(min=1),
+    help="Number of rows per chunk in streaming batch inference.",
+)
+@click.option(
+    "--inference-shards",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Number of shards the streaming scoring set is split into, each scored "
+         "by a worker process. Requires `--inference-source`.",
+)
+@click.option(
+    "--prediction-cache",
+    is_flag=True,
+    default=False,
+    help="Whether batch inference reuses cached predictions of feature rows "
+         "already scored by the same model version.",
+)
+@click.option(
+    "--native-drift",
+    is_flag=True,
+    default=False,
+    help="Whether batch inference checks drift in a single pass against the "
+         "reference sketch built at training time instead of an Evidently report.",
+)
+@click.option(
+    "--fail-on-drift",
+    is_flag=True,
+    default=False,
+    help="Whether drift found by the native drift engine fails batch inference "
+         "instead of only being logged.",
+)
+@click.option(
+    "--serve",
+    is_flag=True,
+    default=False,
+    help="Serve online predictions of the model version from the inference config "
+         "with a local micro-batching HTTP server instead of running pipelines.",
+)
+@click.option(
+    "--serve-host",
+    default="127.0.0.1",
+    type=click.STRING,
+    help="Host the prediction server binds to.",
+)
+@click.option(
+    "--serve-port",
+    default=8000,
+    type=click.IntRange(min=0),
+    help="Port the prediction server listens on.",
+)
+@click.option(
+    "--max-batch-size",
+    default=64,
+    type=click.IntRange(min=1),
+    help="Maximum number of rows per micro-batch of the prediction server.",
+)
+@click.option(
+    "--max-wait-ms",
+    default=5.0,
+    type=click.FloatRange(min=0.0),
+    help="Maximum time a request waits for its micro-batch to fill up.",
+)
+@click.option(
+    "--show-leaderboard",
+    is_flag=True,
+    default=False,
+    help="Print the best hyperparameter search results over all runs "
+         "instead of running pipelines.",
+)
+@click.option(
+    "--leaderboard-size",
+    default=20,
+    type=click.IntRange(min=1),
+    help="Number of leaderboard rows to print.",
+)
 @click.option(
     "--setup-mlflow-stack",
     is_flag=True,
@@ -125,7 +344,32 @@ def main(
         min_train_accuracy: float = 0.8,
         min_test_accuracy: float = 0.8,
         fail_on_accuracy_quality_gates: bool = False,
+        early_stopping_evaluation: bool = False,
+        shared_memory_search: bool = False,
+        parallel_search: bool = False,
+        training_profile: str = "default",
+        mlflow_autolog: str = "full",
+        incremental_training: bool = False,
+        etl_cache: bool = False,
+        fused_preprocessing: bool = False,
+        split_key: Optional[str] = None,
+        stratified_split: bool = False,
+        split_source: Optional[str] = None,
         only_inference: bool = False,
+        inference_source: Optional[str] = None,
+        inference_output: Optional[str] = None,
+        inference_chunk_size: int = 100_000,
+        inference_shards: Optional[int] = None,
+        prediction_cache: bool = False,
+        native_drift: bool = False,
+        fail_on_drift: bool = False,
+        serve: bool = False,
+        serve_host: str = "127.0.0.1",
+        serve_port: int = 8000,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        show_leaderboard: bool = False,
+        leaderboard_size: int = 20,
         setup_mlflow_stack: bool = False,
 ):
     """Main entry point for the pipeline execution.
@@ -147,13 +391,94 @@ def main(
         fail_on_accuracy_quality_gates: If `True` and any of minimal accuracy
             thresholds are violated - the pipeline will fail. If `False` thresholds will
             not affect the pipeline.
+        early_stopping_evaluation: If `True` accuracy is estimated on growing samples
+            until its confidence interval clears the thresholds, so only borderline
+            models are scored on the full train and test sets.
+        shared_memory_search: If `True` hyperparameter search steps read the datasets
+            from shared memory-mapped arrays.
+        parallel_search: If `True` all model configurations are searched together
+            over a single process pool with fair scheduling across configurations.
+        training_profile: Training config to run, `default` or `fast`.
+        mlflow_autolog: MLflow autologging in model training, `full`, `light` or `off`.
+        incremental_training: If `True` the promoted model is trained further on new
+            rows only, falling back to full refit when the feature schema changed.
+        etl_cache: If `True` unchanged source data and preprocessing parameters
+            reuse cached train/test datasets and preprocessing pipeline.
+        fused_preprocessing: If `True` column selection, NA dropping and normalization
+            are fused into one pass over a contiguous array.
+        split_key: Column with a stable row identifier, if set rows are assigned
+            to train/test by its hash so the split is reproducible as data grows.
+        stratified_split: If `True` a hash split is stratified on the target. Every
+            class is split exactly, but rows only keep their partition for unchanged data.
+        split_source: Path to a local CSV/Parquet training set. If set, it is split
+            chunk by chunk by the hash of `split_key` without loading it at once.
         only_inference: If `True` only inference pipeline will be triggered.
+        inference_source: Path to a local CSV/Parquet scoring set. If set, batch
+            inference streams it in chunks instead of loading it at once.
+        inference_output: Parquet file streamed predictions are appended to.
+        inference_chunk_size: Number of rows per chunk in streaming batch inference.
+        inference_shards: If set, streaming batch inference is split into this many
+            shards scored in parallel by worker processes.
+        prediction_cache: If `True` batch inference only predicts feature rows that are
+            not in the on-disk prediction cache of the model version.
+        native_drift: If `True` batch inference computes per-column drift against
+            the reference sketch of the model instead of a full Evidently report.
+        fail_on_drift: If `True` drift found by the native drift engine fails batch
+            inference, otherwise it is only logged.
+        serve: If `True` a local prediction server is started for the model version
+            from the inference config, no pipeline is run.
+        serve_host: Host the prediction server binds to.
+        serve_port: Port the prediction server listens on.
+        max_batch_size: Maximum number of rows per micro-batch.
+        max_wait_ms: Maximum time a request waits for its micro-batch to fill up.
+        show_leaderboard: If `True` the best hyperparameter search results are
+            printed from the leaderboard, no pipeline is run.
+        leaderboard_size: Number of leaderboard rows to print.
         setup_mlflow_stack: If `True` explicitly set up the MLFlow stack before running the pipeline.
     """
+    if inference_shards is not None and not inference_source:
+        raise click.UsageError("--inference-shards only applies to streamed inference, set --inference-source.")
+    if fail_on_drift and not native_drift:
+        raise click.UsageError("--fail-on-drift applies to the native drift engine, set --native-drift.")
+    if split_source and not split_key:
+        raise click.UsageError("--split-source requires --split-key to split by.")
+
+    if show_leaderboard:
+        from utils.leaderboard import Leaderboard
+
+        leaderboard = Leaderboard().top(leaderboard_size)
+        columns = ["config_name", "model_class", "holdout_score", "cv_score", "fit_time_s", "params", "run_id"]
+        click.echo(leaderboard[columns].to_string(index=False) if len(leaderboard) else "Leaderboard is empty")
+        return
+
+    if serve:
+        from utils.prediction_server import serve as serve_predictions
+
+        with open(
+            os.path.join(
+                os.path.dirname(os.path.realpath(__file__)),
+                "config",
+                "inference_config.yaml",
+            ),
+            "r",
+        ) as f:
+            model_config = yaml.safe_load(f)["model"]
+        serve_predictions(
+            model_name=model_config["name"],
+            model_version=model_config["version"],
+            host=serve_host,
+            port=serve_port,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+        )
+        return
+
     # Check if MLFlow experiment tracker is in the active stack or if setup is explicitly requested
     try:
         setup_required = setup_mlflow_stack
         if not setup_required:
+            from zenml.client import Client
+
             client = Client()
             if not client.active_stack.experiment_tracker or client.active_stack.experiment_tracker.flavor != "mlflow":
                 setup_required = True
@@ -187,6 +512,16 @@ def main(
             "min_train_accuracy": min_train_accuracy,
             "min_test_accuracy": min_test_accuracy,
             "fail_on_accuracy_quality_gates": fail_on_accuracy_quality_gates,
+            "early_stopping_evaluation": early_stopping_evaluation,
+            "mlflow_autolog": mlflow_autolog,
+            "shared_memory_search": shared_memory_search,
+            "parallel_search": parallel_search,
+            "incremental_training": incremental_training,
+            "etl_cache": etl_cache,
+            "fused_preprocessing": fused_preprocessing,
+            "split_key": split_key,
+            "stratified_split": stratified_split,
+            "split_source": split_source and os.path.abspath(split_source),
         }
         if drop_columns:
             run_args_train["drop_columns"] = drop_columns.split(",")
@@ -195,7 +530,7 @@ def main(
         config_path = os.path.join(
             os.path.dirname(os.path.realpath(__file__)),
             "config",
-            "train_config.yaml",
+            TRAINING_PROFILES[training_profile],
         )
         pipeline_args["config_path"] = config_path
 
@@ -214,6 +549,8 @@ def main(
         pipeline_args["run_name"] = (
             f"e2e_use_case_training_run_{dt.now().strftime('%Y_%m_%d_%H_%M_%S')}"
         )
+        from pipelines.training import e2e_use_case_training
+
         e2e_use_case_training.with_options(**pipeline_args)(**run_args_train)
         logger.info("Training pipeline finished successfully!")
 
@@ -227,10 +564,23 @@ def main(
     pipeline_args["run_name"] = (
         f"e2e_use_case_deployment_run_{dt.now().strftime('%Y_%m_%d_%H_%M_%S')}"
     )
+    from pipelines.deployment import e2e_use_case_deployment
+
     e2e_use_case_deployment.with_options(**pipeline_args)(**run_args_inference)
 
     # Execute Batch Inference Pipeline
-    run_args_inference = {}
+    run_args_inference = {
+        "native_drift": native_drift,
+        "fail_on_drift": fail_on_drift,
+        "prediction_cache": prediction_cache,
+    }
+    if inference_source:
+        run_args_inference.update({
+            "streaming_source": os.path.abspath(inference_source),
+            "streaming_output": inference_output and os.path.abspath(inference_output),
+            "chunk_size": inference_chunk_size,
+            "n_shards": inference_shards,
+        })
     pipeline_args["config_path"] = os.path.join(
         os.path.dirname(os.path.realpath(__file__)),
         "config",
@@ -239,6 +589,8 @@ def main(
     pipeline_args["run_name"] = (
         f"e2e_use_case_batch_inference_run_{dt.now().strftime('%Y_%m_%d_%H_%M_%S')}"
     )
+    from pipelines.batch_inference import e2e_use_case_batch_inference
+
     e2e_use_case_batch_inference.with_options(**pipeline_args)(
         **run_args_inference
     )
@@ -1,8 +1,15 @@
+from functools import lru_cache
+
+from utils.profiling import profile_step
+
 from zenml import get_step_context, step
 from zenml.client import Client
 from zenml.utils.dashboard_utils import get_run_url
 
-alerter = Client().active_stack.alerter
+@lru_cache(maxsize=None)
+def get_alerter():
+    """Alerter of the active stack, looked up on first notification instead of on import."""
+    return Client().active_stack.alerter
 
 def build_message(status: str) -> str:
     """Builds a message to post.
@@ -25,12 +32,15 @@ def build_message(status: str) -> str:
 def notify_on_failure() -> None:
     """Notify user on step failure. Used in hook"""
     step_context = get_step_context()
+    alerter = get_alerter()
     if alerter and step_context.pipeline_run.config.extra["notify_on_failure"]:
         alerter.post(message=build_message(status="FAILED"))
 
 @step(enable_cache=False)
+@profile_step
 def notify_on_success(notify_on_success: bool) -> None:
     """Notify user on pipeline success"""
 
+    alerter = get_alerter()
     if alerter and notify_on_success:
         alerter.post(message=build_message(status="succeeded"))
\ No newline at end of file
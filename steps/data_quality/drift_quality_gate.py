@@ -1,19 +1,44 @@
-import json
-from zenml import step
+from utils.drift import na_ratio_drift
+from utils.profiling import profile_step
+
+from zenml import get_step_context, step
+from zenml.client import Client
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
 
 @step
-def drift_quality_gate(report: str, na_drift_tolerance: float = 0.1) -> None:
-    """Analyze the evident report and raise runtimeError on
-        high deviation of NA count in 2 dataset.
+@profile_step
+def drift_quality_gate(
+        na_drift_tolerance: float = 0.1,
+        inference_step: str = "inference_data_processing",
+) -> None:
+    """Raise RuntimeError on a high deviation of NA ratios between train and scoring datasets.
+
+    NA counts are taken from the `null_counts` and `shape` metadata that
+    `ParquetDataFrameMaterializer` logged from the Parquet footers of the
+    model version's `dataset_trn` and this run's `inference_date`, so neither
+    dataset is loaded.
+
+    Args:
+        na_drift_tolerance: Maximum allowed relative change of NA ratio per column.
+        inference_step: Step of this run that produced `inference_date`.
     """
-    result = json.loads(report)["metrics"][0]["result"]
-    if result["reference"]["number_of_missing_values"] > 0 and (
-        abs(
-            result["reference"]["number_of_missing_values"]
-            - result["reference"]["number_of_missing_values"]
-        )
-        / result["reference"]["number_of_missing_values"] > na_drift_tolerance
-    ):
+    context = get_step_context()
+    reference = context.model.get_artifact("dataset_trn").run_metadata
+    run = Client().get_pipeline_run(context.pipeline_run.id)
+    current = run.steps[inference_step].outputs["inference_date"][0].run_metadata
+    if "null_counts" not in reference or "null_counts" not in current:
+        logger.warning("Datasets have no `null_counts` metadata, NA drift is not checked")
+        return
+
+    drifted = na_ratio_drift(reference, current, na_drift_tolerance)
+    if drifted:
         raise RuntimeError(
-            "Number of NA values in scoring dataset is significantly different compare to train dataset"
-        )
\ No newline at end of file
+            "Number of NA values in scoring dataset is significantly different compare to train dataset:\n"
+            + "\n".join(
+                f"{column}: NA ratio {na_current:.3f}, was {na_reference:.3f}"
+                for column, (na_reference, na_current) in drifted.items()
+            )
+        )
+    logger.info("NA ratios of the scoring dataset match the train dataset")
@@ -0,0 +1,30 @@
+import pandas as pd
+from typing_extensions import Annotated
+
+from utils.drift import DriftSketch
+from utils.profiling import profile_step
+
+from zenml import step
+
+@step
+@profile_step
+def reference_sketch_builder(
+        dataset_trn: pd.DataFrame,
+        target: str,
+        n_bins: int = 20,
+) -> Annotated[DriftSketch, "reference_sketch"]:
+    """Summarize the train dataset once for drift detection at inference time.
+
+    The sketch holds per-column quantile-binned histograms and NA counts of the
+    preprocessed train set and is linked to the model version, so scoring runs
+    don't need to rescan the reference dataset.
+
+    Args:
+        dataset_trn: The preprocessed train dataset.
+        target: Name of target column, excluded from the sketch.
+        n_bins: Maximum number of histogram bins per column.
+
+    Returns:
+        Reference drift sketch.
+    """
+    return DriftSketch.from_reference(dataset_trn, n_bins=n_bins, exclude_columns=[target])
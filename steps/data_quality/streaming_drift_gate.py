@@ -0,0 +1,50 @@
+import pandas as pd
+
+from utils.drift import MIN_DRIFT_ROWS, DriftSketch, enforce_drift_gate, summarize_drift
+from utils.profiling import profile_step
+
+from zenml import log_metadata, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+@step
+@profile_step
+def streaming_drift_gate(
+        dataset_inf: pd.DataFrame,
+        reference_sketch: DriftSketch,
+        chunk_size: int = 100_000,
+        psi_threshold: float = 0.2,
+        ks_threshold: float = 0.2,
+        na_drift_tolerance: float = 0.1,
+        fail_on_drift: bool = False,
+        min_rows: int = MIN_DRIFT_ROWS,
+) -> None:
+    """Compare the scoring dataset against the reference sketch in a single pass.
+
+    The scoring dataset is summarized chunk by chunk into a sketch sharing the
+    reference bin edges and per-column PSI, KS and NA ratio drift is computed
+    from the two sketches. Raises RuntimeError on drift if `fail_on_drift` is set
+    and the scoring dataset has at least `min_rows` rows; smaller scoring sets
+    only get a warning, their histograms being too sparse to tell drift from noise.
+
+    Args:
+        dataset_inf: The preprocessed scoring dataset.
+        reference_sketch: Sketch of the train dataset built at training time.
+        chunk_size: Number of rows summarized at a time.
+        psi_threshold: Maximum allowed population stability index per column.
+        ks_threshold: Maximum allowed KS statistic per column.
+        na_drift_tolerance: Maximum allowed relative change of NA ratio per column.
+        fail_on_drift: If `True` drift fails the pipeline, otherwise it is only logged.
+        min_rows: Number of scoring rows below which drift is never fatal.
+    """
+    comparison_sketch = reference_sketch.empty_like()
+    for start in range(0, len(dataset_inf), chunk_size):
+        comparison_sketch.update(dataset_inf.iloc[start: start + chunk_size])
+
+    drift = reference_sketch.compare(comparison_sketch)
+    log_metadata(metadata={"drift": summarize_drift(drift)})
+    enforce_drift_gate(
+        drift, comparison_sketch.n_rows, fail_on_drift, min_rows,
+        psi_threshold, ks_threshold, na_drift_tolerance,
+    )
@@ -1,6 +1,8 @@
 from typing import Optional
 
 from typing_extensions import Annotated
+from utils.profiling import profile_step
+
 from zenml import ArtifactConfig, get_step_context, step
 from zenml.client import Client
 from zenml.integrations.mlflow.services.mlflow_deployment import (
@@ -14,6 +16,7 @@ from zenml.logger import get_logger
 logger = get_logger(__name__)
 
 @step
+@profile_step
 def deployment_deploy() -> Annotated[Optional[MLFlowDeploymentService], ArtifactConfig(name="mlflow_deployment", is_deployment_artifact=True),]:
     """Prediction step.
     This is an example of a predictions step that takes the data in and returns
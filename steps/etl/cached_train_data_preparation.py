@@ -0,0 +1,104 @@
+from typing import List, Optional, Tuple
+
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from typing_extensions import Annotated
+
+from steps.etl.traini_data_preprocessor import train_data_preprocessor
+from steps.etl.train_data_split import train_data_splitter
+from utils.etl_cache import DEFAULT_ETL_CACHE_DIR, ETLCache
+from utils.hashing import hash_dataframe, hash_params
+from materializers import ParquetDataFrameMaterializer
+from utils.profiling import profile_step
+
+from zenml import log_metadata, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# bump when splitting/preprocessing logic changes to invalidate cached entries
+ETL_CACHE_VERSION = 4
+
+@step(output_materializers={
+    "dataset_trn": ParquetDataFrameMaterializer,
+    "dataset_tst": ParquetDataFrameMaterializer,
+})
+@profile_step
+def cached_train_data_preparation(
+        dataset: pd.DataFrame,
+        target: str,
+        test_size: float = 0.2,
+        split_key: Optional[str] = None,
+        stratify_on: Optional[str] = None,
+        drop_na: Optional[bool] = None,
+        normalize: Optional[bool] = None,
+        drop_columns: Optional[List[str]] = None,
+        fused: bool = False,
+        cache_dir: str = DEFAULT_ETL_CACHE_DIR,
+        max_cache_size_mb: int = 1024,
+) -> Tuple[
+    Annotated[pd.DataFrame, "dataset_trn"],
+    Annotated[pd.DataFrame, "dataset_tst"],
+    Annotated[Pipeline, "preprocess_pipeline"],
+]:
+    """Split and preprocess the dataset, reusing results for unchanged inputs.
+
+    Outputs are cached on disk under a fingerprint of the source data and the
+    split/preprocessing parameters, so runs on unchanged data skip straight to
+    the cached `dataset_trn`, `dataset_tst` and `preprocess_pipeline`.
+
+    Args:
+        dataset: The raw dataset.
+        target: Name of target column.
+        test_size: Size of holdout set 0.0..1.0.
+        split_key: Column to split by hash of, instead of a random split.
+        stratify_on: Column to stratify a hash split on.
+        drop_na: If `True` all NA rows will be dropped.
+        normalize: If `True` all numeric fields will be normalized.
+        drop_columns: List of column names to drop.
+        fused: If `True` preprocessing is done by a single `FusedPreprocessor` pass.
+        cache_dir: Directory of the on-disk cache.
+        max_cache_size_mb: Size above which least recently used entries are evicted.
+
+    Returns:
+        The processed datasets (dataset_trn, dataset_tst) and fitted `Pipeline` object.
+    """
+    fingerprint = hash_params(
+        version=ETL_CACHE_VERSION,
+        dataset=hash_dataframe(dataset),
+        target=target,
+        test_size=test_size,
+        split_key=split_key,
+        stratify_on=stratify_on,
+        drop_na=drop_na,
+        normalize=normalize,
+        drop_columns=drop_columns,
+        fused=fused,
+    )
+    cache = ETLCache(cache_dir, max_bytes=max_cache_size_mb * 1024 ** 2)
+
+    cached = cache.get(fingerprint)
+    if cached is not None:
+        logger.info(f"ETL cache hit for fingerprint {fingerprint}")
+        dataset_trn, dataset_tst, preprocess_pipeline = cached
+    else:
+        logger.info(f"ETL cache miss for fingerprint {fingerprint}")
+        dataset_trn, dataset_tst = train_data_splitter.entrypoint(
+            dataset=dataset, test_size=test_size,
+            split_key=split_key, stratify_on=stratify_on,
+        )
+        dataset_trn, dataset_tst, preprocess_pipeline = train_data_preprocessor.entrypoint(
+            dataset_trn=dataset_trn,
+            dataset_tst=dataset_tst,
+            drop_na=drop_na,
+            normalize=normalize,
+            drop_columns=drop_columns,
+            fused=fused,
+            target=target,
+        )
+        cache.put(fingerprint, (dataset_trn, dataset_tst, preprocess_pipeline))
+
+    log_metadata(
+        metadata={"etl_fingerprint": fingerprint, "etl_cache_hit": cached is not None}
+    )
+    return dataset_trn, dataset_tst, preprocess_pipeline
@@ -1,21 +1,48 @@
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 import pandas as pd
 from sklearn.datasets import load_breast_cancer
 from typing_extensions import Annotated
 
+from materializers import ParquetDataFrameMaterializer
+from utils.data_sources import load_from_config
+from utils.profiling import profile_step
+
 from zenml import step
 from zenml.logger import get_logger
 
 logger = get_logger(__name__)
 
-@step
+@step(output_materializers={"dataset": ParquetDataFrameMaterializer})
+@profile_step
 def data_loader(random_state: int,
-                is_inference: bool = False) -> Tuple[
+                is_inference: bool = False,
+                source: Optional[Dict[str, Any]] = None,
+                target: str = "target") -> Tuple[
     Annotated[pd.DataFrame, "dataset"],
     Annotated[str, "target_column"],
     Annotated[int, "random_state"]]:
 
-    """Dataset reader step."""
+    """Dataset reader step.
+
+    Without `source` the breast cancer dataset is loaded and a random 5%
+    sample of it is the inference set. With `source`, set in the pipeline YAML
+    config, only the configured slice of a partitioned Parquet/CSV directory
+    or SQLite table is read, see `utils.data_sources.load_from_config`.
+
+    Args:
+        random_state: Seed of the inference sample.
+        is_inference: If `True` the inference set without target is returned.
+        source: Data source config with `type`, its location and the
+            `partitions`, `columns`, `filters` and budget to read.
+        target: Name of target column in a configured source.
+    """
+
+    if source is not None:
+        dataset = load_from_config(source)
+        if is_inference:
+            dataset = dataset.drop(columns=[target], errors="ignore")
+        logger.info(f"Dataset with  {len(dataset)} record is loaded from {source['type']} source.")
+        return dataset, target, random_state
 
     dataset = load_breast_cancer(as_frame=True)
     inference_size = int(len(dataset.target) * 0.05)
@@ -33,5 +60,3 @@ def data_loader(random_state: int,
     dataset.reset_index(drop=True, inplace=True)
     logger.info(f"Dataset with  {len(dataset)} record is loaded.")
     return dataset, target, random_state
-
-
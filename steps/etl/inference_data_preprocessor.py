@@ -3,9 +3,13 @@ from pandas.conftest import datetime_series
 from sklearn.pipeline import Pipeline
 from typing_extensions import Annotated
 
+from materializers import ParquetDataFrameMaterializer
+from utils.profiling import profile_step
+
 from zenml import step
 
-@step
+@step(output_materializers={"inference_date": ParquetDataFrameMaterializer})
+@profile_step
 def inference_data_processing(dataset_inf: pd.DataFrame,
                               preprocessing_pipeline: Pipeline,
                               target: str) -> Annotated[pd.DataFrame, "inference_date"]:
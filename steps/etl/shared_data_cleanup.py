@@ -0,0 +1,20 @@
+from typing import Any, Dict
+
+from utils.profiling import profile_step
+from utils.shared_dataset import remove_shared_dataset
+
+from zenml import step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+@step
+@profile_step
+def shared_data_cleanup(shared_dataset: Dict[str, Any]) -> None:
+    """Delete the memory-mapped datasets once all search steps are done.
+
+    Args:
+        shared_dataset: Manifest returned by `shared_data_materializer`.
+    """
+    remove_shared_dataset(shared_dataset)
+    logger.info(f"Removed shared dataset {shared_dataset['root_dir']}")
@@ -0,0 +1,58 @@
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from typing_extensions import Annotated
+
+from utils.profiling import profile_step
+from utils.resources import RSSSampler
+from utils.shared_dataset import materialize_shared_dataset, prune_shared_datasets
+
+from zenml import get_step_context, log_metadata, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+@step
+@profile_step
+def shared_data_materializer(
+        dataset_trn: pd.DataFrame,
+        dataset_tst: pd.DataFrame,
+        target: str,
+        root_dir: Optional[str] = None,
+        dtype: str = "float32",
+) -> Annotated[Dict[str, Any], "shared_dataset_manifest"]:
+    """Materialize preprocessed datasets once as memory-mapped arrays.
+
+    All hyperparameter search steps of the run read the same files instead of
+    deserializing their own copy of `dataset_trn`/`dataset_tst`. The files are
+    written to local disk, so this only works when steps share a filesystem
+    (e.g. local orchestrator). They are removed by `shared_data_cleanup` at
+    the end of the run; leftovers of failed runs are pruned here after a day.
+
+    Args:
+        dataset_trn: The train dataset.
+        dataset_tst: The test dataset.
+        target: Name of target column.
+        root_dir: Directory to write arrays to, defaults to a per-run temp directory.
+        dtype: Float dtype of the feature matrices.
+
+    Returns:
+        Manifest with array paths and column names.
+    """
+    if root_dir is None:
+        parent_dir = os.path.join(tempfile.gettempdir(), "e2e_use_case_shared")
+        prune_shared_datasets(parent_dir)
+        root_dir = os.path.join(parent_dir, str(get_step_context().pipeline_run.id))
+    with RSSSampler() as sampler:
+        manifest = materialize_shared_dataset(
+            dataset_trn=dataset_trn,
+            dataset_tst=dataset_tst,
+            target=target,
+            root_dir=root_dir,
+            dtype=dtype,
+        )
+    logger.info(f"Shared dataset materialized in {root_dir}")
+    log_metadata(metadata={"peak_rss_mb": sampler.peak_mb, "rss_growth_mb": sampler.delta_mb})
+    return manifest
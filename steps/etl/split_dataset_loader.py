@@ -0,0 +1,44 @@
+from typing import Tuple
+
+import pandas as pd
+from typing_extensions import Annotated
+
+from materializers import ParquetDataFrameMaterializer
+from utils.profiling import profile_step
+
+from zenml import step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+@step(output_materializers={
+    "raw_dataset_tr": ParquetDataFrameMaterializer,
+    "raw_dataset_tst": ParquetDataFrameMaterializer,
+})
+@profile_step
+def split_dataset_loader(
+        train_path: str,
+        test_path: str,
+        split_key: str,
+        random_state: int,
+) -> Tuple[
+    Annotated[pd.DataFrame, "raw_dataset_tr"],
+    Annotated[pd.DataFrame, "raw_dataset_tst"],
+    Annotated[int, "random_state"],
+]:
+    """Load the partitions written by `streaming_train_data_splitter`.
+
+    Args:
+        train_path: Path of the train Parquet file.
+        test_path: Path of the test Parquet file.
+        split_key: Row identifier the split was made by, dropped as it is no feature.
+        random_state: Seed of the inference sample, linked to the model version
+            as `data_loader` does, batch inference reads it from there.
+
+    Returns:
+        The train and test datasets and `random_state`.
+    """
+    dataset_tr = pd.read_parquet(train_path).drop(columns=[split_key])
+    dataset_tst = pd.read_parquet(test_path).drop(columns=[split_key])
+    logger.info(f"Loaded {len(dataset_tr)} train and {len(dataset_tst)} test rows")
+    return dataset_tr, dataset_tst, random_state
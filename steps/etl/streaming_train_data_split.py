@@ -0,0 +1,56 @@
+import os
+from typing import Optional, Tuple
+
+from typing_extensions import Annotated
+
+from utils.hash_split import hash_split_file
+from utils.profiling import profile_step
+
+from zenml import log_metadata, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# only the path of the source is an input, a changed file must not be a cache hit
+@step(enable_cache=False)
+@profile_step
+def streaming_train_data_splitter(
+        source_path: str,
+        split_key: str,
+        test_size: float = 0.2,
+        output_dir: Optional[str] = None,
+        chunk_size: int = 100_000,
+        stratify_on: Optional[str] = None,
+) -> Tuple[
+    Annotated[str, "raw_dataset_tr_path"],
+    Annotated[str, "raw_dataset_tst_path"],
+]:
+    """Out-of-core splitter step for datasets larger than memory.
+
+    The source file is read in chunks of `chunk_size` rows and every row is
+    appended to the train or test Parquet file by the hash of its `split_key`.
+    The step is never cached, as the file at `source_path` may have grown
+    since the last run.
+
+    Args:
+        source_path: Path to the raw dataset (`.csv` or `.parquet`).
+        split_key: Column with a stable row identifier.
+        test_size: Size of holdout set 0.0..1.0.
+        output_dir: Directory of the partitions, defaults to `<source_path>_split`.
+        chunk_size: Number of rows per chunk.
+        stratify_on: Column to stratify the split on, usually the target. Every
+            class is then split exactly, but assignment is only stable for an
+            unchanged dataset.
+
+    Returns:
+        Paths of the train and test Parquet files.
+    """
+    if output_dir is None:
+        output_dir = f"{os.path.splitext(source_path)[0]}_split"
+    train_path, test_path, counts = hash_split_file(
+        source_path, output_dir, split_key, test_size,
+        chunk_size=chunk_size, stratify_on=stratify_on,
+    )
+    logger.info(f"Split {source_path} into {counts['train']} train and {counts['test']} test rows")
+    log_metadata(metadata={"rows": counts})
+    return train_path, test_path
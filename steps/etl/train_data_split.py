@@ -1,13 +1,44 @@
-from typing import Tuple
+from typing import Optional, Tuple
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from typing_extensions import Annotated
 
+from materializers import ParquetDataFrameMaterializer
+from utils.hash_split import hash_split_frame
+from utils.profiling import profile_step
+
 from zenml import step
 
-@step
-def train_data_splitter(dataset: pd.DataFrame, test_size=0.2) -> Tuple[Annotated[pd.DataFrame, "raw_dataset_tr"], Annotated[pd.DataFrame, "raw_dataset_tst"]]:
-    """Dataset splitter step."""
+@step(output_materializers={
+    "raw_dataset_tr": ParquetDataFrameMaterializer,
+    "raw_dataset_tst": ParquetDataFrameMaterializer,
+})
+@profile_step
+def train_data_splitter(
+        dataset: pd.DataFrame,
+        test_size=0.2,
+        split_key: Optional[str] = None,
+        stratify_on: Optional[str] = None,
+) -> Tuple[Annotated[pd.DataFrame, "raw_dataset_tr"], Annotated[pd.DataFrame, "raw_dataset_tst"]]:
+    """Dataset splitter step.
+
+    Args:
+        dataset: The raw dataset.
+        test_size: Size of holdout set 0.0..1.0.
+        split_key: Column with a stable row identifier. If set, rows are assigned
+            by the hash of this column, so a row stays in the same partition
+            across runs and as the dataset grows. The column is an identifier,
+            not a feature, and is dropped from both datasets.
+        stratify_on: Column to stratify a hash split on, usually the target. Every
+            class is then split exactly, but assignment is only stable for an
+            unchanged dataset.
+
+    Returns:
+        The train and test datasets.
+    """
+    if split_key is not None:
+        dataset_tr, dataset_tst = hash_split_frame(dataset, split_key, test_size, stratify_on=stratify_on)
+        return dataset_tr.drop(columns=[split_key]), dataset_tst.drop(columns=[split_key])
 
     dataset_tr, dataset_tst = train_test_split(dataset,
                                                test_size=test_size,
@@ -5,16 +5,24 @@ from alembic.ddl.base import drop_column
 from sklearn.pipeline import Pipeline
 from typing_extensions import Annotated
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from utils.preprocess import ColumnDropper, DataFrameCaster, NADropper
+from utils.preprocess import ColumnDropper, DataFrameCaster, FusedPreprocessor, NADropper
+from materializers import ParquetDataFrameMaterializer
+from utils.profiling import profile_step
 from zenml import step
 
-@step
+@step(output_materializers={
+    "dataset_trn": ParquetDataFrameMaterializer,
+    "dataset_tst": ParquetDataFrameMaterializer,
+})
+@profile_step
 def train_data_preprocessor(
     dataset_trn: pd.DataFrame,
     dataset_tst: pd.DataFrame,
     drop_na: Optional[bool] = None,
     normalize: Optional[bool] = None,
     drop_columns: Optional[List[str]] = None,
+    fused: bool = False,
+    target: Optional[str] = None,
 ) -> Tuple[
     Annotated[pd.DataFrame, "dataset_trn"],
     Annotated[pd.DataFrame, "dataset_tst"],
@@ -28,11 +36,28 @@ def train_data_preprocessor(
         drop_na: If `True` all NA rows will be dropped.
         normalize: If `True` all numeric fields will be normalized.
         drop_columns: List of column names to drop.
+        fused: If `True` column selection, NA dropping and scaling are done by a single
+            `FusedPreprocessor` pass over a contiguous array instead of a chain of
+            DataFrame-copying stages.
+        target: Name of target column, left unscaled by the fused preprocessor.
 
     Returns:
         The processed datasets (dataset_trn, dataset_tst) and fitted `Pipeline` object.
     """
     ### ADD YOUR OWN CODE HERE - THIS IS JUST AN EXAMPLE ###
+    if fused:
+        preprocess_pipeline = Pipeline([
+            ("fused", FusedPreprocessor(
+                drop_na=bool(drop_na),
+                drop_columns=drop_columns,
+                normalize=bool(normalize),
+                target=target,
+            )),
+        ])
+        dataset_trn = preprocess_pipeline.fit_transform(dataset_trn)
+        dataset_tst = preprocess_pipeline.transform(dataset_tst)
+        return dataset_trn, dataset_tst, preprocess_pipeline
+
     preprocess_pipeline = Pipeline([("passthrough", "passthrough")])
     if drop_na:
         preprocess_pipeline.steps.append(("drop_na", NADropper()))
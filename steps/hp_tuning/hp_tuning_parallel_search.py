@@ -0,0 +1,98 @@
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from typing_extensions import Annotated
+
+from utils.leaderboard import Leaderboard
+from utils.parallel_search import run_parallel_search
+from utils.profiling import profile_step
+from utils.resources import RSSSampler, peak_children_rss_mb
+from utils.shared_dataset import load_shared_dataset
+
+from zenml import get_step_context, log_metadata, save_artifact, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+@step
+@profile_step
+def hp_tuning_parallel_search(
+        model_search_space: Dict[str, Dict[str, Any]],
+        target: str,
+        dataset_tr: Optional[pd.DataFrame] = None,
+        dataset_tst: Optional[pd.DataFrame] = None,
+        shared_dataset: Optional[Dict[str, Any]] = None,
+        cpu_budget: Optional[int] = None,
+) -> Annotated[Dict[str, float], "hp_metrics"]:
+    """Hyperparameter tuning of all model configurations over one shared process pool.
+
+    Replaces one `hp_tuning_single_search` step per configuration when steps run
+    sequentially on the local orchestrator. All searches share `cpu_budget`
+    single-threaded workers with fair scheduling across configurations; random
+    searches, every halving round and every hyperband bracket round are split
+    into a task per candidate and CV fold. `prebin` and `max_fit_time_s` of a
+    configuration are applied as in `hp_tuning_single_search`. The best
+    model of every configuration is saved as an `hp_result` artifact with its
+    `metric` metadata, same as the single search steps produce, and recorded
+    in the leaderboard.
+
+    Args:
+        model_search_space: Model configurations keyed by name, as in the train config.
+        target: Name of target column.
+        dataset_tr: The preprocessed train dataset.
+        dataset_tst: The preprocessed test dataset.
+        shared_dataset: Manifest of memory-mapped datasets, used instead of
+            `dataset_tr`/`dataset_tst` if given.
+        cpu_budget: Number of worker processes, all CPUs by default.
+
+    Returns:
+        Test accuracy of the best model per configuration.
+    """
+    if shared_dataset is not None:
+        x_trn, y_trn, x_tst, y_tst = load_shared_dataset(shared_dataset)
+    else:
+        x_trn = dataset_tr.drop(columns=[target])
+        y_trn = dataset_tr[target]
+        x_tst = dataset_tst.drop(columns=[target])
+        y_tst = dataset_tst[target]
+
+    with RSSSampler() as sampler:
+        results = run_parallel_search(
+            model_search_space, x_trn, y_trn, x_tst, y_tst, cpu_budget=cpu_budget
+        )
+    context = get_step_context()
+    leaderboard = Leaderboard()
+    for config_name, result in results.items():
+        artifact = save_artifact(result["model"], name="hp_result")
+        leaderboard.record(
+            run_id=str(context.pipeline_run.id),
+            step_name=context.step_run.name,
+            config_name=config_name,
+            model_class=(
+                f"{model_search_space[config_name]['model_package']}."
+                f"{model_search_space[config_name]['model_class']}"
+            ),
+            params=result["params"],
+            holdout_score=result["metric"],
+            cv_score=result["cv_score"],
+            fit_time_s=result["fit_time_s"],
+            artifact_uri=artifact.uri,
+            artifact_id=str(artifact.id),
+        )
+        log_metadata(
+            metadata={
+                "metric": result["metric"],
+                "search_config_name": config_name,
+                "best_params": {key: str(value) for key, value in result["params"].items()},
+            },
+            artifact_version_id=artifact.id,
+        )
+    log_metadata(
+        metadata={
+            "peak_rss_mb": sampler.peak_mb,
+            "rss_growth_mb": sampler.delta_mb,
+            "peak_worker_rss_mb": peak_children_rss_mb(),
+            "shared_dataset": shared_dataset is not None,
+        }
+    )
+    return {config_name: result["metric"] for config_name, result in results.items()}
@@ -1,37 +1,65 @@
 from typing import List
+from uuid import UUID
 
 from sklearn.base import ClassifierMixin
 from typing_extensions import Annotated
 
+from utils.leaderboard import Leaderboard
+from utils.profiling import profile_step
+
 from zenml import get_step_context, step
+from zenml.client import Client
 from zenml.logger import get_logger
 
 logger = get_logger(__name__)
 
 @step
+@profile_step
 def hp_tuning_select_best_model(
         step_names: List[str],
 ) -> Annotated[ClassifierMixin, "best_model"]:
     """Find best model across all HP tuning attempts.
 
-    Model hyperparameter tuning step that loops
-    other artifacts linked to model version in Model Control Plane to find
-    the best hyperparameter tuning output model of all according to the metric.
+    Model hyperparameter tuning step that looks up the best hyperparameter
+    tuning output of this run in the leaderboard and loads only that model.
+    The leaderboard is only trusted if every step of `step_names` recorded
+    its results in it; otherwise (e.g. steps ran on different machines with
+    their own leaderboard files) the `metric` metadata of the `hp_result`
+    outputs of all `step_names` is compared instead, still loading just the
+    winning model.
+
+    Args:
+        step_names: Names of the hyperparameter search steps of this run.
 
     Returns:
         The best possible model class and its parameters.
     """
+    run = Client().get_pipeline_run(get_step_context().pipeline_run.id)
 
-    model = get_step_context().model
-
-    best_model = None
-    best_metric = .1
+    leaderboard = Leaderboard()
+    missing = set(step_names) - leaderboard.recorded_steps(str(run.id), step_names)
+    if step_names and not missing:
+        best = leaderboard.best(run_id=str(run.id), step_names=step_names)
+        logger.info(
+            f"Best model is `{best['config_name']}` from `{best['step_name']}` "
+            f"with holdout score {best['holdout_score']:.4f}"
+        )
+        if best["artifact_id"]:
+            return Client().get_artifact_version(UUID(best["artifact_id"])).load()
+        return run.steps[best["step_name"]].outputs["hp_result"][0].load()
 
+    logger.warning(
+        f"No leaderboard entries for steps {sorted(missing)} of this run, "
+        "comparing `hp_result` metadata of all steps"
+    )
+    best_output = None
+    best_metric = None
     for step_name in step_names:
-        hp_output = model.get_artifact("hp_result")
-        model_: ClassifierMixin = hp_output.load()
-        #fetching metadata we attached earlier
-        metric = float(hp_output.run_metadata["metric"])
-        if best_model is None or best_metric < metric:
-            best_model= model_
-    return best_model
\ No newline at end of file
+        for hp_output in run.steps[step_name].outputs.get("hp_result", []):
+            #fetching metadata we attached earlier
+            metric = float(hp_output.run_metadata["metric"])
+            if best_metric is None or best_metric < metric:
+                best_output, best_metric = hp_output, metric
+    if best_output is None:
+        raise RuntimeError(f"No `hp_result` found in steps {step_names}")
+    return best_output.load()
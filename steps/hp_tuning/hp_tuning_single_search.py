@@ -1,68 +1,147 @@
-from typing import Any, Dict
+import time
+from typing import Any, Dict, Optional
 import pandas as pd
 
 from sklearn.base import ClassifierMixin
 from sklearn.metrics import accuracy_score
-from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import Pipeline
 
 from typing_extensions import Annotated
-from utils import get_model_from_config
+from utils.fast_training import FitTimeCap, QuantileBinner, capped_search_space, uncapped_params
+from utils.get_model_from_config import get_estimator_spec
+from utils.hp_search import build_search, expand_search_grid, resolve_search_strategy
+from utils.leaderboard import Leaderboard
+from utils.profiling import profile_step
+from utils.resources import RSSSampler, peak_children_rss_mb
+from utils.shared_dataset import load_shared_dataset
 
-from zenml import log_metadata, step
+from zenml import get_step_context, log_metadata, step
 from zenml.logger import get_logger
 
 logger = get_logger(__name__)
 
 @step
+@profile_step
 def hp_tuning_single_search(
         model_package: str,
         model_class: str,
         search_grid: Dict[str, Any],
-        dataset_tr: pd.DataFrame,
-        dataset_tst: pd.DataFrame,
-        target: str
+        target: str,
+        dataset_tr: Optional[pd.DataFrame] = None,
+        dataset_tst: Optional[pd.DataFrame] = None,
+        search_strategy: Optional[Dict[str, Any]] = None,
+        shared_dataset: Optional[Dict[str, Any]] = None,
+        config_name: Optional[str] = None,
+        prebin: bool = False,
+        max_fit_time_s: Optional[float] = None,
 ) -> Annotated[ClassifierMixin, "hp_result"]:
     """Evaluate a trained model
-    A model hyperparameter tuning step that takes in train and test datasets to perform a randomized search for best model
-    in configured space.
+    A model hyperparameter tuning step that takes in train and test datasets to perform a search for best model
+    in configured space. The search strategy (`random`, `halving` or `hyperband`) and its budget
+    are taken from `search_strategy`, random search is used if it is not set.
+
+    If `shared_dataset` manifest is given, the datasets are read as memory-mapped
+    arrays shared by all search steps and their workers instead of `dataset_tr`/`dataset_tst`.
+
+    Scores, fit time and artifact URI of the tuned model are recorded in the
+    leaderboard under `config_name`, so best model selection doesn't load estimators.
+
+    Estimators that use float32 natively are searched on float32 features.
+    Estimators with their own `n_jobs` get `n_jobs=1`, since the search itself
+    parallelizes over candidates and CV folds.
+
+    With `prebin` features are mapped to quantile bins once and all candidates
+    are fitted on the binned matrix, the returned model is a pipeline of the
+    binner and the tuned estimator. With `max_fit_time_s` every candidate fit
+    of a `warm_start` estimator stops growing once the time cap is reached.
     """
 
-    model_class = get_model_from_config(model_package, model_class)
-
-    for search_key in search_grid:
-        if "range" in search_grid[search_key]:
-            search_grid[search_key] = range(
-                search_grid[search_key]["range"]["start"],
-                search_grid[search_key]["range"]["end"],
-                search_grid[search_key]["range"].get("step", 1),
-            )
-
-    x_trn = dataset_tr.drop(columns=[target])
-    y_trn = dataset_tr[target]
-    x_tst = dataset_tst.drop(columns=[target])
-    y_tst = dataset_tst[target]
-
-    logger.info("Running hyperparameter tuning with search randomized search")
-    cv = RandomizedSearchCV(
-        estimator=model_class(),
-        param_distributions=search_grid,
-        cv=3,
-        n_jobs=-1,
-        n_iter=10,
-        random_state=42,
-        scoring="accuracy",
-        refit=True,
+    # the process may have run other steps before, its lifetime peak RSS is no step metric
+    sampler = RSSSampler().start()
+    spec = get_estimator_spec(model_package, model_class)
+    model_class = spec.estimator
+    strategy = resolve_search_strategy(search_strategy)
+
+    search_grid = expand_search_grid(search_grid)
+
+    if shared_dataset is not None:
+        x_trn, y_trn, x_tst, y_tst = load_shared_dataset(shared_dataset)
+    else:
+        x_trn = dataset_tr.drop(columns=[target])
+        y_trn = dataset_tr[target]
+        x_tst = dataset_tst.drop(columns=[target])
+        y_tst = dataset_tst[target]
+        if spec.float32:
+            # cast once instead of in every CV fit
+            x_trn = x_trn.astype("float32")
+            x_tst = x_tst.astype("float32")
+
+    binner = None
+    if prebin:
+        binner = QuantileBinner().fit(x_trn)
+        x_trn = binner.transform(x_trn)
+        x_tst = binner.transform(x_tst)
+
+    logger.info(f"Running hyperparameter tuning with {strategy['name']} search")
+    estimator = model_class()
+    if spec.n_jobs:
+        # the search parallelizes over candidates and folds
+        estimator.set_params(n_jobs=1)
+    if max_fit_time_s is not None:
+        estimator = FitTimeCap(estimator, max_fit_time_s=max_fit_time_s)
+        search_grid, strategy = capped_search_space(search_grid, strategy)
+    cv = build_search(
+        estimator=estimator,
+        search_grid=search_grid,
+        y=y_trn,
+        search_strategy=strategy,
     )
 
+    fit_start = time.perf_counter()
     cv.fit(x_trn, y_trn)
+    fit_time = time.perf_counter() - fit_start
     y_pred = cv.predict(x_tst)
     score = accuracy_score(y_tst, y_pred)
+    sampler.stop()
+    best_params = uncapped_params(cv.best_params_)
+    best_model = cv.best_estimator_
+    if max_fit_time_s is not None:
+        best_model = best_model.estimator_
+    if binner is not None:
+        best_model = Pipeline([("binner", binner), ("model", best_model)])
 
     log_metadata(
         metadata={
-            "metric": float(score)},
+            "metric": float(score),
+            "search_strategy": strategy["name"],
+            "prebin": prebin,
+            "max_fit_time_s": max_fit_time_s,
+            "search_config": {
+                key: value for key, value in strategy.items() if key != "name"
+            },
+        },
         artifact_name="hp_result",
         infer_artifact=True
     )
+    context = get_step_context()
+    Leaderboard().record(
+        run_id=str(context.pipeline_run.id),
+        step_name=context.step_run.name,
+        config_name=config_name or model_class.__name__,
+        model_class=f"{model_package}.{model_class.__name__}",
+        params=best_params,
+        holdout_score=float(score),
+        cv_score=float(cv.best_score_),
+        fit_time_s=fit_time,
+        artifact_uri=context.get_output_artifact_uri("hp_result"),
+    )
+    log_metadata(
+        metadata={
+            "peak_rss_mb": sampler.peak_mb,
+            "rss_growth_mb": sampler.delta_mb,
+            "peak_worker_rss_mb": peak_children_rss_mb(),
+            "shared_dataset": shared_dataset is not None,
+        }
+    )
 
-    return cv.best_estimator_
+    return best_model
@@ -1,9 +1,18 @@
+import time
 from typing import Optional
 
+import numpy as np
 import pandas as pd
+from sklearn.pipeline import Pipeline
 from typing_extensions import Annotated
 
-from zenml import get_step_context, step
+from materializers import ParquetDataFrameMaterializer
+from utils.compact_forest import load_predictor
+from utils.hashing import hash_object
+from utils.prediction_cache import PredictionCache, hash_rows
+from utils.profiling import profile_step
+
+from zenml import get_step_context, log_metadata, step
 from zenml.integrations.mlflow.services.mlflow_deployment import (
     MLFlowDeploymentService,
 )
@@ -11,28 +20,87 @@ from zenml.logger import get_logger
 
 logger = get_logger(__name__)
 
-@step
+@step(output_materializers={"Predictions": ParquetDataFrameMaterializer})
+@profile_step
 def inference_predict(
-        dataset_info: pd.DataFrame,
+        dataset_inf: pd.DataFrame,
+        prediction_cache: bool = False,
+        preprocess_pipeline: Optional[Pipeline] = None,
+        cache_ttl_hours: float = 24 * 7,
+        cache_max_entries: int = 10_000_000,
 ) -> Annotated[pd.Series, "Predictions"]:
     """a predictions step that takes the data in and returns
-    predicted values."""
+    predicted values.
+
+    Without a running deployment service the compact model is used if it was
+    exported, which is memory-mapped instead of unpickled.
+
+    With `prediction_cache`, predictions are looked up per feature row in an
+    on-disk cache keyed by model version, preprocessing pipeline and row hash,
+    and only cache misses are predicted.
+
+    Args:
+        dataset_inf: The preprocessed scoring dataset.
+        prediction_cache: If `True` cached predictions of identical rows are reused.
+        preprocess_pipeline: Preprocessing pipeline the rows went through, part of the cache key.
+        cache_ttl_hours: Age after which cached predictions expire.
+        cache_max_entries: Number of cached rows above which least recently used ones are evicted.
+
+    Returns:
+        Predictions in the row order of `dataset_inf`.
+    """
 
     model = get_step_context().model
 
     #get predictor
-    predictor_service = Optional[MLFlowDeploymentService] = model.load_artifact(
-        "mlflow_deployment"
-    )
-    if predictor_service is None:
-        prediction = predictor_service.predict(requests=dataset_info)
+    try:
+        predictor_service: Optional[MLFlowDeploymentService] = model.load_artifact(
+            "mlflow_deployment"
+        )
+    except KeyError:
+        predictor_service = None
+    if predictor_service is not None:
+        predict = lambda features: predictor_service.predict(request=features)
     else:
         logger.warning("Predicting from loaded model instead of deployment service "
             "as the orchestrator is not local.")
 
         #run prediction from memory
-        predictor = model.load_artifact("model")
-        predictions = predictor.predict(requests=dataset_info)
+        predict = load_predictor(model).predict
 
-    predictions = pd.Series(predictions, name="predicted")
-    return predictions
\ No newline at end of file
+    if not prediction_cache:
+        return pd.Series(predict(dataset_inf), name="predicted")
+
+    cache = PredictionCache(
+        ttl_seconds=cache_ttl_hours * 3600, max_entries=cache_max_entries
+    )
+    namespace = f"{model.name}:{model.id}:{hash_object(preprocess_pipeline)}"
+    row_hashes = hash_rows(dataset_inf)
+    hits, predictions = cache.lookup(namespace, row_hashes)
+
+    n_misses = int((~hits).sum())
+    predict_time = 0.0
+    if n_misses:
+        start = time.perf_counter()
+        miss_predictions = np.asarray(predict(dataset_inf[~hits]))
+        predict_time = time.perf_counter() - start
+        predictions[~hits] = miss_predictions
+        cache.store(namespace, row_hashes[~hits], miss_predictions)
+
+    n_hits = len(dataset_inf) - n_misses
+    hit_rate = n_hits / len(dataset_inf) if len(dataset_inf) else 0.0
+    # hits would have cost the same per row as the predicted misses
+    saved_time = predict_time / n_misses * n_hits if n_misses else None
+    logger.info(f"Prediction cache: {n_hits} hits, {n_misses} misses ({hit_rate:.1%} hit rate)")
+    log_metadata(
+        metadata={
+            "prediction_cache": {
+                "hits": n_hits,
+                "misses": n_misses,
+                "hit_rate": hit_rate,
+                "predict_time_s": predict_time,
+                **({"saved_time_s": saved_time} if saved_time is not None else {}),
+            }
+        }
+    )
+    return pd.Series(predictions, name="predicted").infer_objects()
@@ -0,0 +1,90 @@
+from typing import Dict, Optional
+
+import pandas as pd
+from typing_extensions import Annotated
+
+from materializers import ParquetDataFrameMaterializer
+from utils.compact_forest import load_predictor
+from utils.profiling import profile_step
+from utils.segment_routing import ModelCache, parse_model_spec, score_segments
+
+from zenml import Model, log_metadata, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _pin_model_spec(spec: str) -> str:
+    """`name:<version id>` spec of the model version `spec` points to now."""
+    name, version = parse_model_spec(spec)
+    return f"{name}:{Model(name=name, version=version).id}"
+
+
+def _load_model(spec: str):
+    name, version = parse_model_spec(spec)
+    return load_predictor(Model(name=name, version=version))
+
+
+def _load_preprocess_pipeline(spec: str):
+    name, version = parse_model_spec(spec)
+    return Model(name=name, version=version).load_artifact("preprocess_pipeline")
+
+
+# models stay loaded across steps run in the same process, keyed by pinned
+# spec, so a stage moved to another version doesn't hit the old one
+_model_cache = ModelCache(_load_model)
+
+
+@step(output_materializers={"Predictions": ParquetDataFrameMaterializer})
+@profile_step
+def segmented_inference_predict(
+        dataset_inf: pd.DataFrame,
+        segment_key: str,
+        segment_models: Dict[str, str],
+        target: str = "target",
+        default_model: Optional[str] = None,
+        max_cached_models: int = 8,
+        segment_key_is_feature: bool = False,
+) -> Annotated[pd.Series, "Predictions"]:
+    """Prediction step routing rows to per-segment model versions.
+
+    Every row is scored by the model version configured for its value of
+    `segment_key`. Model versions are loaded once into an in-process LRU
+    cache, and rows of models with identical preprocess pipelines are
+    preprocessed together. Stage specs are resolved to the version they point
+    to once per run.
+
+    Args:
+        dataset_inf: The raw scoring dataset.
+        segment_key: Column routing rows to model versions.
+        segment_models: `name:version` model spec per segment value, e.g.
+            `{"eu": "e2e_use_case_eu:production"}`.
+        target: Name of target column the preprocess pipelines were fitted with.
+        default_model: Model spec for segments missing in `segment_models`,
+            rows of such segments are not scored otherwise.
+        max_cached_models: Number of models kept loaded.
+        segment_key_is_feature: If `True` `segment_key` is passed to the models as a feature.
+
+    Returns:
+        Predictions in the row order of `dataset_inf`.
+    """
+    _model_cache.max_models = max_cached_models
+    specs = set(segment_models.values()) | ({default_model} if default_model else set())
+    pinned = {spec: _pin_model_spec(spec) for spec in specs}
+    predictions, stats = score_segments(
+        dataset=dataset_inf,
+        segment_key=segment_key,
+        segment_models={segment: pinned[spec] for segment, spec in segment_models.items()},
+        model_cache=_model_cache,
+        load_preprocess_pipeline=_load_preprocess_pipeline,
+        target=target,
+        default_model=pinned[default_model] if default_model else None,
+        segment_key_is_feature=segment_key_is_feature,
+    )
+    stats["model_versions"] = pinned
+    logger.info(
+        f"Scored {len(dataset_inf) - stats['unrouted_rows']} rows with "
+        f"{len(stats['rows_per_model'])} model versions"
+    )
+    log_metadata(metadata={"segmented_inference": stats})
+    return predictions.reset_index(drop=True)
@@ -0,0 +1,93 @@
+import os
+import time
+from typing import Optional
+
+from sklearn.pipeline import Pipeline
+from typing_extensions import Annotated
+
+from utils.compact_forest import load_predictor
+from utils.drift import DriftSketch, enforce_drift_gate, summarize_drift
+from utils.profiling import profile_step
+from utils.sharded_inference import run_sharded_inference
+
+from zenml import get_step_context, log_metadata, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# only the path of the scoring set is an input, a rewritten file must not be a cache hit
+@step(enable_cache=False)
+@profile_step
+def sharded_inference_predict(
+        source_path: str,
+        preprocess_pipeline: Pipeline,
+        target: str = "target",
+        output_path: Optional[str] = None,
+        n_shards: Optional[int] = None,
+        n_workers: Optional[int] = None,
+        chunk_size: int = 100_000,
+        max_retries: int = 2,
+        reference_sketch: Optional[DriftSketch] = None,
+        fail_on_drift: bool = False,
+) -> Annotated[str, "predictions_path"]:
+    """Prediction step scoring a large scoring set in shards over worker processes.
+
+    The scoring set is split into `n_shards` contiguous row ranges. Each worker
+    process loads the preprocess pipeline and the model once and scores its
+    shards chunk by chunk. Shard outputs are merged into a single Parquet file
+    ordered by `row_id`, and a failed shard is retried alone.
+
+    Args:
+        source_path: Path to the scoring set (`.csv` or `.parquet`).
+        preprocess_pipeline: Fitted training preprocess pipeline.
+        target: Name of target column the pipeline was fitted with.
+        output_path: Path of the predictions Parquet file, defaults to
+            `<source_path>_predictions.parquet`.
+        n_shards: Number of shards, one per worker by default.
+        n_workers: Number of worker processes, all CPUs by default.
+        chunk_size: Number of rows per chunk within a shard.
+        max_retries: Attempts per shard after its first failure.
+        reference_sketch: Drift sketch of the train dataset built at training time.
+        fail_on_drift: If `True` drift fails the step once all predictions are
+            written, otherwise it is only logged.
+
+    Returns:
+        Path to the predictions Parquet file.
+    """
+    if output_path is None:
+        output_path = f"{os.path.splitext(source_path)[0]}_predictions.parquet"
+
+    start = time.perf_counter()
+    result = run_sharded_inference(
+        source_path=source_path,
+        output_path=output_path,
+        preprocess_pipeline=preprocess_pipeline,
+        predictor=load_predictor(get_step_context().model),
+        target=target,
+        n_shards=n_shards,
+        n_workers=n_workers,
+        chunk_size=chunk_size,
+        max_retries=max_retries,
+        reference_sketch=reference_sketch,
+    )
+    elapsed = time.perf_counter() - start
+
+    throughput = result["rows"] / elapsed if elapsed > 0 else 0.0
+    logger.info(
+        f"Scored {result['rows']} rows in {result['shards']} shards in {elapsed:.1f}s "
+        f"({throughput:.0f} rows/s). Predictions written to {output_path}"
+    )
+    metadata = {
+        "rows": result["rows"],
+        "shards": result["shards"],
+        "shard_retries": result["retries"],
+        "rows_per_second": throughput,
+    }
+    drift = None
+    if result["comparison_sketch"] is not None:
+        drift = reference_sketch.compare(result["comparison_sketch"])
+        metadata["drift"] = summarize_drift(drift)
+    log_metadata(metadata=metadata)
+    if drift is not None:
+        enforce_drift_gate(drift, result["rows"], fail_on_drift)
+    return output_path
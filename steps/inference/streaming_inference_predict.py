@@ -0,0 +1,103 @@
+import os
+import time
+from typing import Optional
+
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from typing_extensions import Annotated
+
+from utils.chunked_io import ParquetChunkWriter, iter_frame_chunks
+from utils.compact_forest import load_predictor
+from utils.drift import DriftSketch, enforce_drift_gate, summarize_drift
+from utils.preprocess import transform_inference_frame
+from utils.profiling import profile_step
+from utils.resources import RSSSampler
+
+from zenml import get_step_context, log_metadata, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# only the path of the scoring set is an input, a rewritten file must not be a cache hit
+@step(enable_cache=False)
+@profile_step
+def streaming_inference_predict(
+        source_path: str,
+        preprocess_pipeline: Pipeline,
+        target: str = "target",
+        output_path: Optional[str] = None,
+        chunk_size: int = 100_000,
+        reference_sketch: Optional[DriftSketch] = None,
+        fail_on_drift: bool = False,
+) -> Annotated[str, "predictions_path"]:
+    """Chunked prediction step for scoring sets larger than memory.
+
+    The scoring set is read from a local CSV/Parquet file in chunks of `chunk_size`
+    rows, each chunk goes through the fitted preprocess pipeline and the model,
+    and predictions are appended to a Parquet file. Only one chunk is held in
+    memory at a time. If `reference_sketch` is given, drift statistics are
+    updated from the same chunks and logged, without another pass over the data.
+    `row_id` of a prediction is the position of its row in the scoring set,
+    so the preprocess pipeline must not drop rows.
+
+    Args:
+        source_path: Path to the scoring set (`.csv` or `.parquet`).
+        preprocess_pipeline: Fitted training preprocess pipeline.
+        target: Name of target column the pipeline was fitted with.
+        output_path: Path of the predictions Parquet file, defaults to
+            `<source_path>_predictions.parquet`.
+        chunk_size: Number of rows per chunk.
+        reference_sketch: Drift sketch of the train dataset built at training time.
+        fail_on_drift: If `True` drift fails the step once all predictions are
+            written, otherwise it is only logged.
+
+    Returns:
+        Path to the predictions Parquet file.
+    """
+    if output_path is None:
+        output_path = f"{os.path.splitext(source_path)[0]}_predictions.parquet"
+
+    predictor = load_predictor(get_step_context().model)
+    comparison_sketch = reference_sketch.empty_like() if reference_sketch is not None else None
+
+    n_rows = 0
+    start = time.perf_counter()
+    with RSSSampler() as sampler, ParquetChunkWriter(output_path) as writer:
+        for chunk in iter_frame_chunks(source_path, chunk_size):
+            features = transform_inference_frame(preprocess_pipeline, chunk, target)
+            if len(features) != len(chunk):
+                raise ValueError(
+                    f"Preprocess pipeline dropped {len(chunk) - len(features)} of the rows "
+                    f"{n_rows}..{n_rows + len(chunk) - 1}, predictions can't be matched to "
+                    "the scoring set rows; clean the scoring set or refit without `drop_na`"
+                )
+            if comparison_sketch is not None:
+                comparison_sketch.update(features)
+            writer.write(
+                pd.DataFrame({
+                    "row_id": range(n_rows, n_rows + len(chunk)),
+                    "predicted": predictor.predict(features),
+                })
+            )
+            n_rows += len(chunk)
+    elapsed = time.perf_counter() - start
+
+    throughput = n_rows / elapsed if elapsed > 0 else 0.0
+    logger.info(
+        f"Scored {n_rows} rows in {elapsed:.1f}s ({throughput:.0f} rows/s), "
+        f"peak memory {sampler.peak_mb:.0f} MB. Predictions written to {output_path}"
+    )
+    metadata = {
+        "rows": n_rows,
+        "rows_per_second": throughput,
+        "peak_rss_mb": sampler.peak_mb,
+        "rss_growth_mb": sampler.delta_mb,
+    }
+    drift = None
+    if comparison_sketch is not None:
+        drift = reference_sketch.compare(comparison_sketch)
+        metadata["drift"] = summarize_drift(drift)
+    log_metadata(metadata=metadata)
+    if drift is not None:
+        enforce_drift_gate(drift, n_rows, fail_on_drift)
+    return output_path
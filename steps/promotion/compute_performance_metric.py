@@ -1,23 +1,50 @@
-from typing import Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
-from sklearn.metrics import accuracy_score
 from typing_extensions import Annotated
 
-from zenml import Model, get_step_context, step
+from utils.compact_forest import load_predictor
+from utils.model_comparison import compare_models
+from utils.profiling import profile_step
+
+from zenml import Model, get_step_context, log_metadata, step
 from zenml.logger import get_logger
 
 logger = get_logger(__name__)
 
 @step
+@profile_step
 def compute_performance_metric_on_current_data(
         dataset_tst: pd.DataFrame,
-        target_env: str
-) -> Tuple[Annotated[float, "latest_metric"], Annotated[float, "Current_metric"]]:
+        target_env: str,
+        challenger_versions: Optional[List[str]] = None,
+        n_workers: Optional[int] = None,
+        n_blocks: int = 5,
+        alpha: float = 0.05,
+) -> Tuple[
+    Annotated[float, "latest_metric"],
+    Annotated[float, "Current_metric"],
+    Annotated[Dict[str, Any], "metric_comparison"],
+]:
     """Get metrics for comparison during promotion on fresh dataset.
 
         A metrics calculation step. It computes metric
-        on recent test dataset.
+        on recent test dataset for the latest model version, the version
+        currently promoted to `target_env` and optional older challenger versions.
+        Models are scored in parallel worker processes block by block and scoring
+        stops early once one of them is significantly better than all others.
+        Compact models are used where exported, workers memory-map them by path.
+
+        Args:
+            dataset_tst: The test dataset.
+            target_env: The environment the current model version is promoted to.
+            challenger_versions: Additional model versions (numbers or stages) to compare.
+            n_workers: Number of worker processes, one per model version by default.
+            n_blocks: Number of blocks the test set is scored in.
+            alpha: Significance level of the sequential comparison.
+
+        Returns:
+            Metric of the latest version, metric of the current version and the full comparison.
     """
     X = dataset_tst.drop(columns=["target"])
     y = dataset_tst["target"]
@@ -35,15 +62,28 @@ def compute_performance_metric_on_current_data(
     if current_version_number is None:
         current_version_number = -1
         metrics = {latest_version_number: 1.0, current_version_number: 0.0}
+        comparison = {"metrics": {str(latest_version_number): 1.0}, "winner": str(latest_version_number)}
     else:
         #get predictor
+        versions = {
+            latest_version_number: latest_version,
+            current_version_number: current_version,
+        }
+        for challenger in challenger_versions or []:
+            challenger_version = Model(name=latest_version.name, version=challenger)
+            versions.setdefault(challenger_version.number, challenger_version)
         predictors = {
-            latest_version_number: latest_version.load_artifact("model"),
-            current_version_number: current_version.load_artifact("model"),
+            str(number): load_predictor(version) for number, version in versions.items()
+        }
+        comparison = compare_models(
+            predictors, X, y, n_workers=n_workers, n_blocks=n_blocks, alpha=alpha
+        )
+        metrics = {
+            number: comparison["metrics"][str(number)] for number in versions
         }
-        metrics = {}
-        for version in [latest_version_number, current_version_number]:
-            #predict and ealuate
-            predictions = predictors[version].predict(X)
-            metrics[version] = accuracy_score(y, predictions)
-    return metrics[latest_version_number], metrics[current_version_number]
+    comparison["latest_version"] = str(latest_version_number)
+    comparison["current_version"] = str(current_version_number)
+    log_metadata(
+        metadata={"metric_comparison": {key: value for key, value in comparison.items() if value is not None}}
+    )
+    return metrics[latest_version_number], metrics[current_version_number], comparison
@@ -1,4 +1,7 @@
+from typing import Any, Dict, Optional
+
 from utils import promote_in_model_registry
+from utils.profiling import profile_step
 
 from zenml import Model, get_step_context, step
 from zenml.logger import get_logger
@@ -6,11 +9,13 @@ from zenml.logger import get_logger
 logger = get_logger(__name__)
 
 @step
+@profile_step
 def promote_with_metric_compare(
         latest_metric: float,
         current_metric: float,
         mlflow_model_name: str,
-        target_env: str
+        target_env: str,
+        metric_comparison: Optional[Dict[str, Any]] = None,
 ) -> None:
     """Try to promote trained model.
     a model promotion step. It gets precomputed
@@ -21,9 +26,14 @@ def promote_with_metric_compare(
     tag, otherwise previously promoted model version will remain.
 
     If the latest version is the only one - it will get promoted automatically.
+
+    If `metric_comparison` holds a version that is significantly better than all
+    others (including older challenger versions), that version is promoted instead.
+    Without a significant winner the plain metric comparison is used.
     """
 
     should_promote = True
+    promote_version = None
 
     latest_version = get_step_context().model
     current_version = Model(name=latest_version.name, version=target_env)
@@ -41,7 +51,17 @@ def promote_with_metric_compare(
             f"Latest model metric={latest_metric:.6f}\n"
             f"Current model metric={current_metric:.6f}"
         )
-        if latest_metric >= current_metric:
+        winner = (metric_comparison or {}).get("winner")
+        if winner is not None:
+            if winner == metric_comparison["latest_version"]:
+                logger.info(f"Latest model version {winner} is significantly better - promoting latest")
+            elif winner == metric_comparison["current_version"]:
+                logger.info(f"Current model version {winner} is significantly better - keeping current")
+                should_promote = False
+            else:
+                logger.info(f"Challenger model version {winner} is significantly better - promoting challenger")
+                promote_version = winner
+        elif latest_metric >= current_metric:
             logger.info("Latest model version outperforms current version - promoting latest")
         else:
             logger.info("Current model version outperforms latest version - keeping current")
@@ -50,8 +70,10 @@ def promote_with_metric_compare(
     if should_promote:
         #promote in model control plane
         model = get_step_context().model
+        if promote_version is not None:
+            model = Model(name=model.name, version=promote_version)
         model.set_stage(
             stage=target_env, force=True
         )
-        logger.info(f"Current model version was promoted to {target_env},")
+        logger.info(f"Model version {model.number} was promoted to {target_env},")
 
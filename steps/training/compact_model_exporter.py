@@ -0,0 +1,52 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import ClassifierMixin
+from typing_extensions import Annotated
+
+from materializers import CompactForestMaterializer
+from utils.compact_forest import CompactForest, supports_compact_export
+from utils.profiling import profile_step
+
+from zenml import log_metadata, step
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+@step(output_materializers={"compact_model": CompactForestMaterializer})
+@profile_step
+def compact_model_exporter(
+        model: ClassifierMixin,
+        dataset_tst: pd.DataFrame,
+        target: str,
+) -> Annotated[Optional[CompactForest], "compact_model"]:
+    """Export a trained tree model into a compact memory-mappable representation.
+
+    Decision trees and random/extra forests are flattened into node arrays with
+    float32 thresholds. The export is checked to give identical predictions on
+    the test set, other models and mismatching exports produce no compact model
+    and consumers fall back to the pickled `model`.
+
+    Args:
+        model: The trained model.
+        dataset_tst: The test dataset, used to validate the export.
+        target: Name of target column.
+
+    Returns:
+        Compact model or `None` if it can't be exported.
+    """
+    if not supports_compact_export(model):
+        logger.info(f"{type(model).__name__} has no compact representation, skipping export")
+        return None
+
+    compact_model = CompactForest.from_estimator(model)
+    X = dataset_tst.drop(columns=[target])
+    if not np.array_equal(compact_model.predict(X), model.predict(X)):
+        logger.warning("Compact model predictions differ from the trained model, skipping export")
+        return None
+
+    size_mb = sum(array.nbytes for array in compact_model.arrays.values()) / 1024 ** 2
+    logger.info(f"Exported {compact_model.n_trees} trees into a {size_mb:.1f} MB compact model")
+    log_metadata(metadata={"compact_model": {"n_trees": compact_model.n_trees, "size_mb": size_mb}})
+    return compact_model
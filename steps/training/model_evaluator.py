@@ -1,41 +1,104 @@
-import mlflow
+from typing import Any, Dict
+
 import pandas as pd
 from sklearn.base import ClassifierMixin
 
+from utils.async_mlflow import AsyncMlflowLogger
+from utils.profiling import profile_step
+from utils.sequential_eval import sequential_accuracy
+
 from zenml import step
 from zenml.client import Client
 from zenml.logger import get_logger
 
 logger = get_logger(__name__)
 
-@step
-def model_evaluator(
+
+def _sequential_gate(
+        name: str,
+        model: ClassifierMixin,
+        dataset: pd.DataFrame,
+        target: str,
+        threshold: float,
+        confidence: float,
+        initial_sample_size: int,
+        interval_method: str,
+) -> Dict[str, Any]:
+    result = sequential_accuracy(
+        model,
+        dataset.drop(columns=[target]),
+        dataset[target],
+        threshold=threshold,
+        confidence=confidence,
+        initial_sample_size=initial_sample_size,
+        method=interval_method,
+    )
+    logger.info(
+        f"{name} Accuracy: {result['accuracy'] * 100:.2f}% "
+        f"[{result['lower'] * 100:.2f}%, {result['upper'] * 100:.2f}%] "
+        f"on {result['n_scored']}/{result['n_rows']} rows ({result['decision']})"
+    )
+    return result
+
+
+def _evaluate(
+        mlflow_logger: AsyncMlflowLogger,
         model: ClassifierMixin,
         dataset_trn: pd.DataFrame,
         dataset_tst: pd.DataFrame,
         target: str,
-        min_train_accuracy: float=0.0,
-        min_test_accuracy: float=0.0,
-        fail_on_accuracy_quality_gates: bool = False,
+        min_train_accuracy: float,
+        min_test_accuracy: float,
+        fail_on_accuracy_quality_gates: bool,
+        early_stopping: bool,
+        confidence: float,
+        initial_sample_size: int,
+        interval_method: str,
 ) -> None:
-    """Evaluate a trained model"""
-    trn_acc = model.score(
-        dataset_trn.drop(columns=[target]),
-        dataset_tst[target],
-    )
-    logger.info(f"Train Accuracy: {trn_acc * 100:.2f}%")
+    """Score the model and apply the accuracy quality gates."""
+    if not early_stopping:
+        trn_acc = model.score(
+            dataset_trn.drop(columns=[target]),
+            dataset_trn[target],
+        )
+        logger.info(f"Train Accuracy: {trn_acc * 100:.2f}%")
 
-    tst_acc = model.score(
-        dataset_tst.drop(columns=[target]),
-        dataset_tst[target],
-    )
-    logger.info(f"Test Accuracy: {tst_acc * 100:.2f}%")
-    mlflow.log_metric("testing_accuracy", tst_acc)
+        tst_acc = model.score(
+            dataset_tst.drop(columns=[target]),
+            dataset_tst[target],
+        )
+        logger.info(f"Test Accuracy: {tst_acc * 100:.2f}%")
+        mlflow_logger.log_metric("testing_accuracy", tst_acc)
+    else:
+        gate_args = dict(
+            model=model, target=target, confidence=confidence,
+            initial_sample_size=initial_sample_size, interval_method=interval_method,
+        )
+        trn = _sequential_gate("Train", dataset=dataset_trn, threshold=min_train_accuracy, **gate_args)
+        mlflow_logger.log_metrics({
+            "training_accuracy_ci_lower": trn["lower"],
+            "training_accuracy_ci_upper": trn["upper"],
+            "training_accuracy_rows_scored": trn["n_scored"],
+        })
+        trn_acc = trn["accuracy"]
+        if trn["decision"] == "fail" and fail_on_accuracy_quality_gates:
+            # clearly below the gate, the test set needs no scoring
+            tst_acc = None
+        else:
+            tst = _sequential_gate("Test", dataset=dataset_tst, threshold=min_test_accuracy, **gate_args)
+            tst_acc = tst["accuracy"]
+            mlflow_logger.log_metrics({
+                # `testing_accuracy` is always the accuracy on the whole test set
+                "testing_accuracy" if tst["decision"] == "exact" else "testing_accuracy_sampled": tst_acc,
+                "testing_accuracy_ci_lower": tst["lower"],
+                "testing_accuracy_ci_upper": tst["upper"],
+                "testing_accuracy_rows_scored": tst["n_scored"],
+            })
 
     messages = []
     if trn_acc < min_train_accuracy:
         messages.append(f"Train Accuracy {trn_acc *100:.2f}% is below {min_train_accuracy * 100:.2f}% !")
-    if tst_acc < min_test_accuracy:
+    if tst_acc is not None and tst_acc < min_test_accuracy:
         messages.append(
             f"Test Accuracy {tst_acc * 100:.2f}% is below {min_test_accuracy * 100:.2f}% !"
         )
@@ -46,4 +109,47 @@ def model_evaluator(
         )
     else:
         for message in messages:
-            logger.info(message)
\ No newline at end of file
+            logger.info(message)
+
+
+@step
+@profile_step
+def model_evaluator(
+        model: ClassifierMixin,
+        dataset_trn: pd.DataFrame,
+        dataset_tst: pd.DataFrame,
+        target: str,
+        min_train_accuracy: float=0.0,
+        min_test_accuracy: float=0.0,
+        fail_on_accuracy_quality_gates: bool = False,
+        early_stopping: bool = False,
+        confidence: float = 0.99,
+        initial_sample_size: int = 1000,
+        interval_method: str = "wilson",
+) -> None:
+    """Evaluate a trained model
+
+    With `early_stopping` accuracy is estimated on growing random samples
+    until its confidence interval is clearly above or below the quality gate,
+    so only borderline models are scored on the full datasets. A model clearly
+    failing a gate stops the step before the remaining dataset is scored.
+
+    Args:
+        model: The trained model.
+        dataset_trn: The train dataset.
+        dataset_tst: The test dataset.
+        target: Name of target column in dataset.
+        min_train_accuracy: Minimal acceptable training accuracy value.
+        min_test_accuracy: Minimal acceptable testing accuracy value.
+        fail_on_accuracy_quality_gates: If `True` a failed quality gate raises.
+        early_stopping: If `True` accuracy is estimated on samples with confidence intervals.
+        confidence: Confidence level of the accuracy intervals.
+        initial_sample_size: Rows scored in the first sampling round.
+        interval_method: "wilson" or "clopper_pearson" confidence intervals.
+    """
+    with AsyncMlflowLogger() as mlflow_logger:
+        _evaluate(
+            mlflow_logger, model, dataset_trn, dataset_tst, target, min_train_accuracy,
+            min_test_accuracy, fail_on_accuracy_quality_gates, early_stopping, confidence,
+            initial_sample_size, interval_method,
+        )
@@ -1,9 +1,23 @@
+import time
+from typing import Optional, Tuple
+
 import mlflow
 import pandas as pd
 from sklearn.base import ClassifierMixin
 from typing_extensions import Annotated
 
-from zenml import step, ArtifactConfig, get_step_context
+from utils.async_mlflow import AsyncMlflowLogger, configure_autolog
+from utils.get_model_from_config import estimator_spec
+from utils.incremental import (
+    incremental_fit,
+    schema_matches,
+    supports_partial_fit,
+    select_new_rows,
+    supports_incremental,
+)
+from utils.profiling import profile_step
+
+from zenml import Model, step, ArtifactConfig, get_step_context, log_metadata
 from zenml.client import Client
 from zenml.logger import get_logger
 from zenml.integrations.mlflow.experiment_trackers import (
@@ -15,28 +29,162 @@ mlflow_register_model_step
 from zenml.logger import get_logger
 
 logger = get_logger(__name__)
-experiment_tracker = Client().active_stack.experiment_tracker
 
-if not experiment_tracker or not isinstance(experiment_tracker,
-                                            MLFlowExperimentTracker):
-    raise RuntimeError(
-        "Your active stack needs to contain a MLFlow experiemnt "
-        "tracker for this example to work"
+
+def _check_experiment_tracker() -> None:
+    """Fail if the active stack has no MLflow experiment tracker.
+
+    Checked when the step runs rather than on import, so importing the
+    pipeline doesn't need a stack lookup.
+    """
+    experiment_tracker = Client().active_stack.experiment_tracker
+    if not experiment_tracker or not isinstance(experiment_tracker,
+                                                MLFlowExperimentTracker):
+        raise RuntimeError(
+            "Your active stack needs to contain a MLFlow experiemnt "
+            "tracker for this example to work"
+        )
+
+def _fit_incrementally(
+        dataset_trn: pd.DataFrame,
+        target: str,
+        target_env: str,
+        extra_estimators: int,
+        max_new_rows_fraction: float,
+) -> Tuple[Optional[ClassifierMixin], bool]:
+    """Continue training the model promoted to `target_env` on new rows only.
+
+    Returns:
+        Updated model or `None` if a full refit is needed, and whether the model
+        was trained by `fit`, the only method MLflow autologging records.
+    """
+    latest_version = get_step_context().model
+    current_version = Model(name=latest_version.name, version=target_env)
+    try:
+        current_version.number
+    except KeyError:
+        logger.info(f"No model promoted to {target_env} - running full refit")
+        return None, False
+    previous_model = current_version.load_artifact("model")
+    previous_dataset = current_version.load_artifact("dataset_trn")
+
+    columns = [column for column in dataset_trn.columns if column != target]
+    if not supports_incremental(previous_model):
+        logger.info(f"{type(previous_model).__name__} can't be trained incrementally - running full refit")
+        return None, False
+    if not schema_matches(previous_model, columns) or list(previous_dataset.columns) != list(dataset_trn.columns):
+        logger.info("Feature schema changed since last promoted version - running full refit")
+        return None, False
+
+    new_rows = select_new_rows(dataset_trn, previous_dataset)
+    if len(new_rows) > max_new_rows_fraction * len(dataset_trn):
+        logger.info(
+            f"{len(new_rows)} of {len(dataset_trn)} rows are new - running full refit"
+        )
+        return None, False
+    if new_rows.empty:
+        logger.info("No new rows since last promoted version - reusing promoted model")
+        return previous_model, False
+
+    logger.info(f"Continue training promoted model on {len(new_rows)} new rows....")
+    model = incremental_fit(
+        previous_model,
+        new_rows.drop(columns=[target]),
+        new_rows[target],
+        extra_estimators=extra_estimators,
     )
+    # `partial_fit` updates aren't autologged, `warm_start` ones go through `fit`
+    return model, model is not None and not supports_partial_fit(model)
+
 
 @step
+@profile_step
 def model_trainer(
         dataset_trn: pd.DataFrame,
         model: ClassifierMixin,
         target: str,
-        name: str
+        name: str,
+        incremental: bool = False,
+        target_env: str = "production",
+        extra_estimators: int = 50,
+        max_new_rows_fraction: float = 0.5,
+        autolog_mode: str = "full",
 ) -> Annotated[
     ClassifierMixin, ArtifactConfig(name="model", is_model_artifact = True)
 ]:
-    logger.info(f"Train Model: {model}....")
-    mlflow.sklearn.autolog()
-    model.fit(dataset_trn.drop(columns=[target]),
-              dataset_trn[target])
+    """Train a model.
+
+    In incremental mode the model promoted to `target_env` is loaded from the model
+    control plane and trained further on rows it has not seen yet: `partial_fit`
+    estimators are updated, `warm_start` estimators get `extra_estimators` new
+    trees/stages. A full refit of `model` is done instead if there is no promoted
+    model, it does not support incremental training, the feature schema changed or
+    more than `max_new_rows_fraction` of the rows are new.
+
+    Args:
+        dataset_trn: The train dataset.
+        model: The model instance to train on full refit.
+        target: Name of target column in dataset.
+        name: Name of the model in the MLflow model registry.
+        incremental: If `True` try to continue training the promoted model.
+        target_env: The environment the currently promoted model is in.
+        extra_estimators: Number of trees/stages to add on warm start.
+        max_new_rows_fraction: Share of new rows above which a full refit is done.
+        autolog_mode: MLflow sklearn autologging, `full`, `light` (no datasets,
+            input examples or signatures) or `off` (params and model only, no plots).
+
+    Returns:
+        The trained model artifact.
+    """
+    _check_experiment_tracker()
+    configure_autolog(autolog_mode)
+    # opened before training, so params and timings are sent while the model fits
+    with AsyncMlflowLogger() as mlflow_logger:
+        incremental_model, fitted = None, False
+        if incremental:
+            incremental_model, fitted = _fit_incrementally(
+                dataset_trn=dataset_trn,
+                target=target,
+                target_env=target_env,
+                extra_estimators=extra_estimators,
+                max_new_rows_fraction=max_new_rows_fraction,
+            )
+        training_mode = "incremental" if incremental_model is not None else "full"
+        mlflow_logger.set_tag("training_mode", training_mode)
+        mlflow_logger.log_metric("training_rows", len(dataset_trn))
+
+        if incremental_model is not None:
+            model = incremental_model
+        else:
+            if autolog_mode == "off":
+                # autolog logs the params itself otherwise
+                mlflow_logger.log_params(model.get_params())
+            logger.info(f"Train Model: {model}....")
+            spec = estimator_spec(type(model))
+            features = dataset_trn.drop(columns=[target])
+            if spec.float32:
+                features = features.astype("float32")
+            n_jobs = model.get_params()["n_jobs"] if spec.n_jobs else None
+            if spec.n_jobs:
+                # a single fit has all cores, the model keeps its tuned setting
+                model.set_params(n_jobs=-1)
+            start = time.perf_counter()
+            model.fit(features, dataset_trn[target])
+            fitted = True
+            mlflow_logger.log_metric("fit_time_s", time.perf_counter() - start)
+            if spec.n_jobs:
+                model.set_params(n_jobs=n_jobs)
+        log_metadata(
+            metadata={"training_mode": training_mode},
+            artifact_name="model",
+            infer_artifact=True,
+        )
+
+        if autolog_mode == "off" and incremental_model is not None:
+            mlflow_logger.log_params(model.get_params())
+        if autolog_mode == "off" or not fitted:
+            # model registration needs the model in the run, autolog only logs it on `fit`
+            mlflow.sklearn.log_model(model, "model")
 
     #register mlflow model
     mlflow_register_model_step.entrypoint(
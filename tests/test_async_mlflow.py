@@ -0,0 +1,70 @@
+import mlflow
+import pytest
+from mlflow.entities import RunStatus
+from mlflow.tracking import MlflowClient
+
+from utils.async_mlflow import MAX_PARAM_VALUE_LENGTH, AsyncMlflowLogger
+
+
+@pytest.fixture(autouse=True)
+def tracking_uri(tmp_path, monkeypatch):
+    # a local file store is all the logger needs
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri(f"file:{tmp_path / 'mlruns'}")
+    yield
+    while mlflow.active_run() is not None:
+        mlflow.end_run()
+
+
+class _CountingClient(MlflowClient):
+    def __init__(self):
+        super().__init__()
+        self.batches = 0
+
+    def log_batch(self, *args, **kwargs):
+        self.batches += 1
+        return super().log_batch(*args, **kwargs)
+
+
+def test_logged_values_are_sent_in_batches():
+    with mlflow.start_run() as run:
+        mlflow_logger = AsyncMlflowLogger(flush_interval_s=60)
+        mlflow_logger._client = client = _CountingClient()
+        with mlflow_logger:
+            mlflow_logger.log_params({"alpha": 0.5, "nested": object(), "long": "x" * 10_000})
+            mlflow_logger.log_metrics({f"metric_{i}": i for i in range(250)})
+            mlflow_logger.set_tag("training_mode", "full")
+            assert mlflow_logger.flush(timeout=10)
+    data = MlflowClient().get_run(run.info.run_id).data
+    assert client.batches == 1
+    assert data.params["alpha"] == "0.5"
+    assert "nested" not in data.params
+    assert len(data.params["long"]) == MAX_PARAM_VALUE_LENGTH
+    assert len(data.metrics) == 250
+    assert data.tags["training_mode"] == "full"
+
+
+def test_logged_values_are_flushed_when_the_block_fails():
+    with mlflow.start_run() as run:
+        with pytest.raises(RuntimeError):
+            with AsyncMlflowLogger(flush_interval_s=60) as mlflow_logger:
+                mlflow_logger.log_metric("accuracy", 0.9)
+                raise RuntimeError("training failed")
+    assert MlflowClient().get_run(run.info.run_id).data.metrics == {"accuracy": 0.9}
+
+
+def test_run_started_by_the_logger_is_ended_on_close():
+    with AsyncMlflowLogger() as first:
+        first.log_metric("accuracy", 0.9)
+    assert mlflow.active_run() is None
+    assert MlflowClient().get_run(first.run_id).info.status == RunStatus.to_string(RunStatus.FINISHED)
+    with AsyncMlflowLogger() as second:
+        second.log_metric("accuracy", 0.8)
+    assert second.run_id != first.run_id
+
+
+def test_active_run_is_left_open():
+    with mlflow.start_run() as run:
+        with AsyncMlflowLogger() as mlflow_logger:
+            assert mlflow_logger.run_id == run.info.run_id
+        assert mlflow.active_run().info.run_id == run.info.run_id
@@ -0,0 +1,56 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from utils.compact_forest import CompactForest, supports_compact_export
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    X, y = make_classification(
+        n_samples=2_000, n_features=12, n_informative=6, n_classes=3, random_state=0
+    )
+    X = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
+    return X.iloc[:1_500], y[:1_500], X.iloc[1_500:]
+
+
+@pytest.mark.parametrize("estimator", [
+    DecisionTreeClassifier(max_depth=8, random_state=0),
+    RandomForestClassifier(n_estimators=20, random_state=0),
+    ExtraTreesClassifier(n_estimators=20, random_state=0),
+])
+def test_predictions_equal_sklearn(dataset, estimator):
+    x_trn, y_trn, x_tst = dataset
+    model = estimator.fit(x_trn, y_trn)
+    compact = CompactForest.from_estimator(model)
+    np.testing.assert_allclose(compact.predict_proba(x_tst), model.predict_proba(x_tst))
+    np.testing.assert_array_equal(compact.predict(x_tst), model.predict(x_tst))
+
+
+def test_columns_are_matched_by_name(dataset):
+    x_trn, y_trn, x_tst = dataset
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(x_trn, y_trn)
+    compact = CompactForest.from_estimator(model)
+    np.testing.assert_array_equal(compact.predict(x_tst[x_tst.columns[::-1]]), model.predict(x_tst))
+
+
+def test_saved_forest_is_memory_mapped_and_pickled_by_path(dataset, tmp_path):
+    x_trn, y_trn, x_tst = dataset
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(x_trn, y_trn)
+    CompactForest.from_estimator(model).save(str(tmp_path))
+
+    loaded = CompactForest.load(str(tmp_path))
+    assert all(isinstance(array, np.memmap) for array in loaded.arrays.values())
+    unpickled = pickle.loads(pickle.dumps(loaded))
+    np.testing.assert_array_equal(unpickled.predict(x_tst), model.predict(x_tst))
+
+
+def test_unsupported_models_are_not_exported(dataset):
+    x_trn, y_trn, _ = dataset
+    assert not supports_compact_export(HistGradientBoostingClassifier(max_iter=5).fit(x_trn, y_trn))
+    assert not supports_compact_export(DecisionTreeClassifier())
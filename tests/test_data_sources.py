@@ -0,0 +1,96 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from utils.data_sources import CsvSource, DataSource, ParquetSource, SqliteSource, read_source
+
+
+def _write_partitions(root: str, extension: str) -> None:
+    for year in (2022, 2023, 2024):
+        directory = os.path.join(root, f"year={year}")
+        os.makedirs(directory)
+        df = pd.DataFrame({"value": range(year * 10, year * 10 + 5), "group": list("aabbc")})
+        path = os.path.join(directory, f"part.{extension}")
+        if extension == "csv":
+            df.to_csv(path, index=False)
+        else:
+            df.to_parquet(path, index=False)
+
+
+@pytest.fixture(params=[ParquetSource, CsvSource])
+def file_source(request, tmp_path):
+    _write_partitions(str(tmp_path), "csv" if request.param is CsvSource else "parquet")
+    return request.param(str(tmp_path))
+
+
+@pytest.fixture
+def sqlite_source(tmp_path):
+    path = str(tmp_path / "warehouse.db")
+    connection = sqlite3.connect(path)
+    pd.DataFrame({
+        "year": [2022] * 5 + [2023] * 5,
+        "value": range(10),
+        "group": list("aabbc") * 2,
+    }).to_sql("rows", connection, index=False)
+    connection.close()
+    return SqliteSource(path, "rows", partition_keys=["year"])
+
+
+class _CountingSource(DataSource):
+    """Partitions of 10 rows each, recording which partitions and limits were read."""
+
+    def __init__(self, n_partitions: int):
+        self.n_partitions = n_partitions
+        self.reads = []
+
+    def list_partitions(self):
+        return [{"part": str(i)} for i in range(self.n_partitions)]
+
+    def read_partition(self, partition, columns, filters, limit=None):
+        self.reads.append((partition["part"], limit))
+        return pd.DataFrame({"value": range(10)})
+
+
+@pytest.mark.parametrize("filters, years", [
+    ([["year", ">=", 2023]], [2023, 2024]),
+    ([["year", "==", 2022]], [2022]),
+    ([["year", "<", 2023.5]], [2022, 2023]),
+    ([["year", "in", [2022, 2024]]], [2022, 2024]),
+    ([["year", "not in", [2022]]], [2023, 2024]),
+    ([["year", "==", "2023"]], [2023]),
+])
+def test_numeric_partition_filters(file_source, filters, years):
+    df = read_source(file_source, filters=filters, n_threads=2)
+    assert sorted(df["year"].astype(int).unique()) == years
+
+
+def test_partition_filters_exclude_every_partition(file_source):
+    with pytest.raises(ValueError):
+        read_source(file_source, filters=[["year", ">", 2030]])
+
+
+def test_row_filters_are_pushed_down(file_source):
+    df = read_source(file_source, columns=["value"], filters=[["group", "==", "a"], ["year", "==", 2024]])
+    assert df["value"].tolist() == [20240, 20241]
+
+
+def test_max_rows_stops_scheduling_partitions():
+    source = _CountingSource(n_partitions=20)
+    df = read_source(source, max_rows=25, n_threads=2)
+    assert len(df) == 25
+    # the budget is spent on the third partition, at most a window of reads past it
+    assert len(source.reads) <= 4
+    assert source.reads[0] == ("0", 25)
+
+
+def test_sqlite_limit_is_pushed_down(sqlite_source):
+    df = read_source(sqlite_source, columns=["value"], max_rows=3, n_threads=1)
+    assert df["value"].tolist() == [0, 1, 2]
+    assert len(sqlite_source.read_partition({"year": "2023"}, None, [], limit=2)) == 2
+
+
+def test_sqlite_numeric_partition_filter(sqlite_source):
+    df = read_source(sqlite_source, filters=[["year", ">", 2022], ["group", "in", ["a", "c"]]])
+    assert df["value"].tolist() == [5, 6, 9]
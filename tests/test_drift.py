@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.drift import DriftSketch, drifted_columns, enforce_drift_gate, na_ratio_drift, summarize_drift
+
+
+def _reference(n_rows: int = 50_000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "a": rng.normal(size=n_rows),
+        "b": rng.uniform(size=n_rows),
+        "target": rng.integers(0, 2, size=n_rows),
+    })
+
+
+def _sketch(reference: DriftSketch, dataset: pd.DataFrame, chunk_size: int = 1_000) -> DriftSketch:
+    sketch = reference.empty_like()
+    for start in range(0, len(dataset), chunk_size):
+        sketch.update(dataset.iloc[start: start + chunk_size])
+    return sketch
+
+
+def test_reference_sketch_excludes_columns():
+    sketch = DriftSketch.from_reference(_reference(), exclude_columns=["target"])
+    assert sketch.columns == ["a", "b"]
+    assert all(counts.sum() == 50_000 for counts in sketch.counts)
+
+
+def test_same_distribution_does_not_drift():
+    reference = DriftSketch.from_reference(_reference(), exclude_columns=["target"])
+    current = _reference(20_000).assign(a=lambda df: df["a"].sample(frac=1, random_state=1).to_numpy())
+    drift = reference.compare(_sketch(reference, current))
+    assert drifted_columns(drift) == {}
+
+
+def test_shifted_column_drifts():
+    reference = DriftSketch.from_reference(_reference(), exclude_columns=["target"])
+    current = _reference(20_000).assign(a=lambda df: df["a"] + 1.0)
+    drifted = drifted_columns(reference.compare(_sketch(reference, current)))
+    assert list(drifted) == ["a"]
+
+
+def test_psi_of_small_sample_is_smoothed():
+    reference = DriftSketch.from_reference(_reference(), exclude_columns=["target"])
+    current = _reference(1_000).iloc[:28]
+    drift = reference.compare(_sketch(reference, current))
+    # with 20 bins and 28 rows most bins are empty, unsmoothed PSI was above 2
+    assert all(stats["psi"] < 1.0 for stats in drift.values())
+
+
+def test_merged_sketches_equal_single_pass():
+    reference = DriftSketch.from_reference(_reference(), exclude_columns=["target"])
+    current = _reference(10_000)
+    merged = _sketch(reference, current.iloc[:4_000])
+    merged.merge(_sketch(reference, current.iloc[4_000:]))
+    single = _sketch(reference, current)
+    assert merged.n_rows == single.n_rows
+    for merged_counts, single_counts in zip(merged.counts, single.counts):
+        np.testing.assert_array_equal(merged_counts, single_counts)
+
+
+def test_na_ratio_drift():
+    dataset = _reference(10_000)
+    dataset.loc[:999, "b"] = np.nan
+    reference = DriftSketch.from_reference(dataset, exclude_columns=["target"])
+    current = _reference(10_000)
+    current.loc[:4_999, "b"] = np.nan
+    drift = reference.compare(_sketch(reference, current))
+    assert drift["b"]["na_ratio_reference"] == 0.1
+    assert drift["b"]["na_ratio_current"] == 0.5
+    assert "b" in drifted_columns(drift)
+    assert summarize_drift(drift)["max_psi"] >= drift["a"]["psi"]
+
+
+def test_na_ratio_drift_compares_ratios_from_metadata():
+    reference = {"shape": [1_000, 3], "null_counts": {"a": 100, "b": 0, "target": 0}}
+    current = {"shape": [100, 2], "null_counts": {"a": 10, "b": 50}}
+    assert na_ratio_drift(reference, current) == {}
+    current["null_counts"]["a"] = 30
+    assert na_ratio_drift(reference, current) == {"a": (0.1, 0.3)}
+    assert na_ratio_drift(reference, current, na_drift_tolerance=5.0) == {}
+
+
+def test_drift_gate_fails_only_when_asked_and_on_enough_rows():
+    reference = DriftSketch.from_reference(_reference(), exclude_columns=["target"])
+    shifted = _reference(n_rows=5_000).assign(a=lambda df: df["a"] + 2)
+    drift = reference.compare(_sketch(reference, shifted))
+    assert "a" in enforce_drift_gate(drift, n_rows=5_000)
+    with pytest.raises(RuntimeError, match="a: psi="):
+        enforce_drift_gate(drift, n_rows=5_000, fail_on_drift=True)
+    # too few rows to trust, only a warning
+    assert "a" in enforce_drift_gate(drift, n_rows=500, fail_on_drift=True)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.hash_split import hash_split_file, hash_split_frame, hash_split_mask
+
+
+def _dataset(n_rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": np.arange(n_rows),
+        "x": np.arange(n_rows, dtype=np.float64),
+        "target": np.arange(n_rows) % 3 == 0,
+    })
+
+
+def test_unstratified_split_is_stable_as_data_grows():
+    small, large = _dataset(1_000), _dataset(5_000)
+    is_test_small = hash_split_mask(small["id"], 0.2)
+    is_test_large = hash_split_mask(large["id"], 0.2)
+    np.testing.assert_array_equal(is_test_small, is_test_large[:1_000])
+
+
+def test_unstratified_split_size():
+    dataset_tr, dataset_tst = hash_split_frame(_dataset(20_000), "id", 0.2)
+    assert len(dataset_tr) + len(dataset_tst) == 20_000
+    assert len(dataset_tst) / 20_000 == pytest.approx(0.2, abs=0.01)
+
+
+def test_stratified_split_is_exact_per_class():
+    dataset = _dataset(3_000)
+    _, dataset_tst = hash_split_frame(dataset, "id", 0.2, stratify_on="target")
+    for label, count in dataset["target"].value_counts().items():
+        assert (dataset_tst["target"] == label).sum() == round(count * 0.2)
+
+
+@pytest.mark.parametrize("stratify_on", [None, "target"])
+def test_file_split_matches_frame_split(tmp_path, stratify_on):
+    dataset = _dataset(2_500)
+    source_path = str(tmp_path / "dataset.parquet")
+    dataset.to_parquet(source_path)
+
+    train_path, test_path, counts = hash_split_file(
+        source_path, str(tmp_path / "split"), "id", 0.2, chunk_size=300, stratify_on=stratify_on,
+    )
+    expected_tr, expected_tst = hash_split_frame(dataset, "id", 0.2, stratify_on=stratify_on)
+    assert counts == {"train": len(expected_tr), "test": len(expected_tst)}
+    assert sorted(pd.read_parquet(test_path)["id"]) == sorted(expected_tst["id"])
+    assert sorted(pd.read_parquet(train_path)["id"]) == sorted(expected_tr["id"])
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.prediction_cache as prediction_cache
+from utils.prediction_cache import PredictionCache, hash_rows
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(prediction_cache, "time", clock)
+    return clock
+
+
+def _n_entries(cache: PredictionCache) -> int:
+    with cache._connect() as connection:
+        (n_entries,) = connection.execute("SELECT n_entries FROM entry_count").fetchone()
+        (counted,) = connection.execute("SELECT COUNT(*) FROM predictions").fetchone()
+    assert n_entries == counted
+    return n_entries
+
+
+def test_lookup_of_duplicate_rows(tmp_path):
+    cache = PredictionCache(str(tmp_path / "cache.sqlite"))
+    features = pd.DataFrame({"a": [1, 2, 1, 3, 2, 1], "b": [0.5, 1.5, 0.5, 2.5, 1.5, 0.5]})
+    row_hashes = hash_rows(features)
+    cache.store("v1", row_hashes[[0, 1]], np.array([10, 20]))
+
+    hits, predictions = cache.lookup("v1", row_hashes)
+    assert hits.tolist() == [True, True, True, False, True, True]
+    assert predictions[hits].tolist() == [10, 20, 10, 20, 10]
+    assert not cache.lookup("v2", row_hashes)[0].any()
+
+
+def test_expired_entries_miss_and_are_evicted(tmp_path, clock):
+    cache = PredictionCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+    cache.store("v1", np.array([1, 2]), np.array([10, 20]))
+    clock.now += 30
+    cache.store("v1", np.array([3]), np.array([30]))
+
+    clock.now += 45
+    hits, _ = cache.lookup("v1", np.array([1, 2, 3]))
+    assert hits.tolist() == [False, False, True]
+    cache.evict()
+    assert _n_entries(cache) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = PredictionCache(str(tmp_path / "cache.sqlite"), max_entries=3)
+    for row_hash in range(3):
+        clock.now += 1
+        cache.store("v1", np.array([row_hash]), np.array([row_hash]))
+    clock.now += 1
+    cache.lookup("v1", np.array([0]))
+
+    clock.now += 1
+    cache.store("v1", np.array([3, 4]), np.array([3, 4]))
+    hits, _ = cache.lookup("v1", np.arange(5))
+    assert hits.tolist() == [True, False, False, True, True]
+    assert _n_entries(cache) == 3
+
+
+def test_entry_count_follows_replaced_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = PredictionCache(path)
+    cache.store("v1", np.array([1, 2]), np.array([10, 20]))
+    cache.store("v1", np.array([2, 3]), np.array([21, 30]))
+    assert _n_entries(cache) == 3
+    assert cache.lookup("v1", np.array([2]))[1].tolist() == [21]
+    # reopening keeps the count instead of recounting
+    assert _n_entries(PredictionCache(path)) == 3
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from utils.prediction_server import MicroBatcher, PredictionServer
+from utils.preprocess import FusedPreprocessor
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    dataset = pd.DataFrame({"a": rng.normal(size=500), "b": rng.normal(size=500)})
+    dataset["target"] = (dataset["a"] + dataset["b"] > 0).astype(int)
+    preprocess_pipeline = Pipeline([("fused", FusedPreprocessor(normalize=True, target="target"))])
+    dataset_trn = preprocess_pipeline.fit_transform(dataset)
+    model = LogisticRegression().fit(dataset_trn.drop(columns=["target"]), dataset_trn["target"])
+    return model, preprocess_pipeline
+
+
+async def _post(port: int, payload) -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST /predict HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+
+def _serve(batcher: MicroBatcher, *requests):
+    async def run():
+        server = PredictionServer(batcher, port=0)
+        await server.start()
+        try:
+            return await asyncio.gather(*(_post(server.port, request) for request in requests))
+        finally:
+            await server.stop()
+
+    return asyncio.run(run())
+
+
+def test_feature_names_from_the_fitted_pipeline(fitted):
+    model, preprocess_pipeline = fitted
+    assert MicroBatcher(model, preprocess_pipeline).feature_names == ["a", "b"]
+    chained = Pipeline([("passthrough", "passthrough")]).fit(pd.DataFrame({"a": [0.0], "b": [0.0]}))
+    assert MicroBatcher(model, chained).feature_names == ["a", "b"]
+
+
+def test_concurrent_requests_are_batched(fitted):
+    model, preprocess_pipeline = fitted
+    batcher = MicroBatcher(model, preprocess_pipeline, max_batch_size=64, max_wait_ms=200)
+    # key order differs from training, the batcher restores the column order
+    requests = [{"instances": [{"b": float(i), "a": float(i)}]} for i in range(-4, 4)]
+    responses = _serve(batcher, *requests)
+    assert [status for status, _ in responses] == [200] * 8
+    assert [payload["predictions"] for _, payload in responses] == [[0]] * 4 + [[0]] + [[1]] * 3
+    assert max(batcher.batch_sizes) > 1
+
+
+def test_malformed_request_is_rejected_alone(fitted):
+    model, preprocess_pipeline = fitted
+    batcher = MicroBatcher(model, preprocess_pipeline, max_batch_size=64, max_wait_ms=200)
+    responses = _serve(
+        batcher,
+        {"instances": [{"a": 2.0, "b": 2.0}]},
+        {"instances": [{"a": 2.0}]},
+        {"instances": [{"a": "high", "b": 2.0}]},
+        {"instances": [{"a": -2.0, "b": -2.0}]},
+    )
+    assert [status for status, _ in responses] == [200, 400, 400, 200]
+    assert "missing features ['b']" in responses[1][1]["error"]
+    assert responses[0][1]["predictions"] == [1] and responses[3][1]["predictions"] == [0]
+    # the valid requests were scored together, not one by one after a failed batch
+    assert list(batcher.batch_sizes) == [2]
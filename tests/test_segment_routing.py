@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+
+from utils.segment_routing import ModelCache, parse_model_spec, route_segments, score_segments, segment_label
+
+
+class _ConstantModel:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        return np.full(len(features), self.value)
+
+
+def _identity_pipeline() -> Pipeline:
+    return Pipeline([("identity", FunctionTransformer())])
+
+
+@pytest.mark.parametrize("value, label", [
+    (1, "1"), (1.0, "1"), (np.float64(2.0), "2"), (np.int64(3), "3"), (1.5, "1.5"),
+    ("eu", "eu"), ("1.0", "1.0"), (True, "True"), (None, None), (np.nan, None), (pd.NA, None),
+])
+def test_segment_label(value, label):
+    assert segment_label(value) == label
+
+
+def test_parse_model_spec():
+    assert parse_model_spec("model:name:production") == ("model:name", "production")
+    with pytest.raises(ValueError):
+        parse_model_spec("model")
+
+
+def test_float_segments_with_missing_values_match_integer_keys(caplog):
+    segments = pd.Series([1.0, 2.0, np.nan, 1.0, 3.0])
+    routes = route_segments(segments, {1: "a:1", "2": "b:1"})
+    assert routes.keys() == {"a:1", "b:1"}
+    assert routes["a:1"].tolist() == [0, 3]
+    assert routes["b:1"].tolist() == [1]
+    assert "`3`" in caplog.text and "`<missing>`" in caplog.text
+
+
+def test_default_model_takes_missing_and_unknown_segments():
+    segments = pd.Series(["eu", None, "us", "apac"])
+    routes = route_segments(segments, {"eu": "eu:1"}, default_model="all:1")
+    assert routes["eu:1"].tolist() == [0]
+    assert routes["all:1"].tolist() == [1, 2, 3]
+
+
+def test_model_cache_evicts_least_recently_used():
+    loaded = []
+    cache = ModelCache(lambda spec: loaded.append(spec) or spec, max_models=2)
+    for spec in ["a:1", "b:1", "a:1", "c:1", "a:1", "b:1"]:
+        cache.get(spec)
+    assert loaded == ["a:1", "b:1", "c:1", "b:1"]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_score_segments_keeps_row_order():
+    dataset = pd.DataFrame({"region": [2.0, 1.0, np.nan, 2.0], "x": [0.1, 0.2, 0.3, 0.4]})
+    models = {"a:1": _ConstantModel(10), "b:1": _ConstantModel(20)}
+    predictions, stats = score_segments(
+        dataset,
+        segment_key="region",
+        segment_models={"1": "a:1", "2": "b:1"},
+        model_cache=ModelCache(models.__getitem__),
+        load_preprocess_pipeline=lambda spec: _identity_pipeline(),
+    )
+    assert predictions.tolist()[:2] == [20, 10]
+    assert pd.isna(predictions.iloc[2])
+    assert predictions.iloc[3] == 20
+    assert stats["rows_per_model"] == {"a:1": 1, "b:1": 2}
+    assert stats["unrouted_rows"] == 1
+    assert stats["preprocess_groups"] == 1
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sequential_eval import clopper_pearson_interval, sequential_accuracy, wilson_interval
+
+
+class _NoisyModel:
+    """Predicts the label copied into column `x`, wrong on a fixed share of the rows."""
+
+    def __init__(self, error_rate: float):
+        self.error_rate = error_rate
+        self.n_predicted = 0
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        self.n_predicted += len(features)
+        wrong = features["noise"].to_numpy() < self.error_rate
+        return np.where(wrong, 1 - features["x"].to_numpy(), features["x"].to_numpy())
+
+
+def _dataset(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    labels = pd.Series(rng.integers(0, 2, size=n_rows))
+    return pd.DataFrame({"x": labels, "noise": rng.uniform(size=n_rows)}), labels
+
+
+def test_wilson_interval_contains_proportion():
+    lower, upper = wilson_interval(90, 100, confidence=0.95)
+    assert lower < 0.9 < upper
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_wilson_interval_collapses_on_whole_population():
+    lower, upper = wilson_interval(90, 100, confidence=0.95, population=100)
+    assert lower == pytest.approx(0.9)
+    assert upper == pytest.approx(0.9)
+
+
+def test_clopper_pearson_interval_contains_proportion():
+    lower, upper = clopper_pearson_interval(90, 100, confidence=0.95)
+    assert lower < 0.9 < upper
+    assert clopper_pearson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_clopper_pearson_interval_keeps_width_at_the_boundaries():
+    lower, upper = clopper_pearson_interval(200, 200, confidence=0.99, population=200_000)
+    assert upper == 1.0
+    assert lower < 0.98
+    assert clopper_pearson_interval(0, 200, confidence=0.99)[1] > 0.02
+
+
+@pytest.mark.parametrize("method", ["wilson", "clopper_pearson"])
+def test_clear_pass_stops_early(method):
+    features, labels = _dataset(100_000)
+    model = _NoisyModel(error_rate=0.05)
+    result = sequential_accuracy(model, features, labels, threshold=0.8, method=method)
+    assert result["decision"] == "pass"
+    assert result["n_scored"] == model.n_predicted < len(features)
+    assert result["lower"] >= 0.8
+
+
+def test_clear_fail_stops_early():
+    features, labels = _dataset(100_000)
+    result = sequential_accuracy(_NoisyModel(error_rate=0.3), features, labels, threshold=0.9)
+    assert result["decision"] == "fail"
+    assert result["upper"] < 0.9
+
+
+def test_borderline_scores_all_rows():
+    features, labels = _dataset(20_000)
+    model = _NoisyModel(error_rate=0.1)
+    result = sequential_accuracy(model, features, labels, threshold=0.9)
+    assert result["decision"] == "exact"
+    assert result["n_scored"] == model.n_predicted == len(features)
+    assert result["lower"] == result["upper"] == result["accuracy"]
+
+
+def test_intervals_are_corrected_for_every_look():
+    # at the same sample size a corrected look is wider than a single one
+    features, labels = _dataset(64_000)
+    model = _NoisyModel(error_rate=0.1)
+    result = sequential_accuracy(model, features, labels, threshold=0.0, confidence=0.95)
+    n_correct = round(result["accuracy"] * result["n_scored"])
+    single_look = wilson_interval(n_correct, result["n_scored"], 0.95, population=len(features))
+    assert result["lower"] < single_look[0]
+
+
+@pytest.mark.parametrize("method", ["wilson", "clopper_pearson"])
+def test_perfect_first_sample_does_not_pass_a_tighter_gate(method):
+    # 99.7% accurate, a first sample without errors must not clear a 99.9% gate
+    features, labels = _dataset(200_000)
+    model = _NoisyModel(error_rate=0.003)
+    result = sequential_accuracy(
+        model, features, labels, threshold=0.999, initial_sample_size=200, method=method
+    )
+    assert result["decision"] != "pass"
+
+
+def test_unknown_method_raises():
+    features, labels = _dataset(100)
+    with pytest.raises(ValueError):
+        sequential_accuracy(_NoisyModel(0.1), features, labels, threshold=0.5, method="bootstrap")
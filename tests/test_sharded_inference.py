@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+
+from utils.sharded_inference import _iter_row_range, count_rows, run_sharded_inference, shard_bounds
+
+
+@pytest.mark.parametrize("n_rows, n_shards", [(10, 3), (9, 3), (2, 5), (1, 1), (1_000, 7)])
+def test_shard_bounds_cover_all_rows_contiguously(n_rows, n_shards):
+    bounds = shard_bounds(n_rows, n_shards)
+    assert len(bounds) == min(n_shards, n_rows)
+    assert bounds[0][0] == 0 and bounds[-1][1] == n_rows
+    assert all(stop == next_start for (_, stop), (next_start, _) in zip(bounds, bounds[1:]))
+    sizes = [stop - start for start, stop in bounds]
+    assert max(sizes) - min(sizes) <= 1
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def source_path(request, tmp_path):
+    dataset = pd.DataFrame({"row": np.arange(1_000), "x": np.arange(1_000) * 0.5})
+    path = str(tmp_path / f"dataset.{request.param}")
+    if request.param == "csv":
+        dataset.to_csv(path, index=False)
+    else:
+        # small row groups, so shards start and stop inside of them
+        dataset.to_parquet(path, row_group_size=128)
+    return path
+
+
+def test_count_rows(source_path):
+    assert count_rows(source_path) == 1_000
+
+
+@pytest.mark.parametrize("start, stop", [(0, 1_000), (0, 1), (100, 300), (127, 129), (999, 1_000), (5, 5)])
+def test_iter_row_range_reads_exactly_the_range(source_path, start, stop):
+    chunks = list(_iter_row_range(source_path, start, stop, chunk_size=50))
+    rows = pd.concat(chunks)["row"].tolist() if chunks else []
+    assert rows == list(range(start, stop))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+
+
+def test_shards_read_every_row_once(source_path):
+    rows = [
+        row
+        for start, stop in shard_bounds(count_rows(source_path), 6)
+        for chunk in _iter_row_range(source_path, start, stop, chunk_size=64)
+        for row in chunk["row"]
+    ]
+    assert rows == list(range(1_000))
+
+
+class _FlakyModel:
+    """Doubles `x`, failing once on the chunk holding `fail_row`."""
+
+    def __init__(self, fail_row: int, marker: str):
+        self.fail_row = fail_row
+        self.marker = marker
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        # workers are separate processes, the marker file records the failure
+        if self.fail_row in features["row"].values and not os.path.exists(self.marker):
+            open(self.marker, "w").close()
+            raise RuntimeError("flaky shard")
+        return features["x"].to_numpy() * 2
+
+
+def _identity_pipeline() -> Pipeline:
+    return Pipeline([("identity", FunctionTransformer())])
+
+
+def test_run_sharded_inference_retries_failing_shard_and_merges_in_order(source_path, tmp_path):
+    output_path = str(tmp_path / "predictions.parquet")
+    result = run_sharded_inference(
+        source_path, output_path, _identity_pipeline(),
+        _FlakyModel(fail_row=600, marker=str(tmp_path / "failed")),
+        n_shards=5, n_workers=2, chunk_size=64, max_retries=1,
+    )
+    assert result["rows"] == 1_000
+    assert result["shards"] == 5
+    assert result["retries"] == 1
+    predictions = pd.read_parquet(output_path)
+    assert predictions["row_id"].tolist() == list(range(1_000))
+    assert predictions["predicted"].tolist() == (np.arange(1_000) * 0.5 * 2).tolist()
+
+
+def test_run_sharded_inference_gives_up_after_max_retries(source_path, tmp_path):
+    with pytest.raises(RuntimeError, match="Shard 0 failed"):
+        run_sharded_inference(
+            source_path, str(tmp_path / "predictions.parquet"), _identity_pipeline(),
+            _FlakyModel(fail_row=0, marker=str(tmp_path / "failed")),
+            n_shards=2, n_workers=1, max_retries=0,
+        )
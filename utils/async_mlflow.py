@@ -0,0 +1,189 @@
+import numbers
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import mlflow
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+AUTOLOG_MODES = ("full", "light", "off")
+# entities per `log_batch` request accepted by the tracking server
+MAX_BATCH_METRICS = 1000
+MAX_BATCH_PARAMS = 100
+MAX_BATCH_TAGS = 100
+# longest param value the tracking server stores
+MAX_PARAM_VALUE_LENGTH = 6000
+
+_FLUSH = object()
+_STOP = object()
+
+
+def configure_autolog(mode: str = "full") -> None:
+    """Turn on sklearn autologging at the given weight.
+
+    `full` logs everything autolog supports. `light` still logs the model,
+    which MLflow model registration needs, but skips datasets, input examples,
+    signatures and post-training metrics. `off` disables autolog; per-estimator
+    plots and the other artifacts are then only logged explicitly.
+    """
+    if mode not in AUTOLOG_MODES:
+        raise ValueError(f"Unknown autolog mode `{mode}`, expected one of {AUTOLOG_MODES}")
+    if mode == "full":
+        mlflow.sklearn.autolog()
+    elif mode == "light":
+        mlflow.sklearn.autolog(
+            log_input_examples=False,
+            log_model_signatures=False,
+            log_datasets=False,
+            log_post_training_metrics=False,
+            max_tuning_runs=0,
+            silent=True,
+        )
+    else:
+        mlflow.sklearn.autolog(disable=True)
+
+
+class AsyncMlflowLogger:
+    """Log params, metrics, tags and artifacts to MLflow from a background thread.
+
+    Calls only enqueue; the thread groups params, metrics and tags into
+    `log_batch` requests, sent every `flush_interval_s` or once a batch is
+    full, and uploads artifacts in logging order. Used as a context manager
+    everything logged is flushed when the block exits, also on failure;
+    flushes give up after `flush_timeout_s`, so an unreachable tracking server
+    doesn't hang the step. Logging errors are reported, not raised, like MLflow
+    autologging does. Param values are truncated to `MAX_PARAM_VALUE_LENGTH`
+    characters. Without `run_id` the active run is logged to; if there is
+    none, a run is started and ended again on close.
+    """
+
+    def __init__(
+            self,
+            run_id: Optional[str] = None,
+            flush_interval_s: float = 5.0,
+            flush_timeout_s: Optional[float] = 60.0,
+    ):
+        # a run started here is ended on close, so later loggers don't log into it
+        self._started_run = run_id is None and mlflow.active_run() is None
+        if run_id is None:
+            run_id = (mlflow.active_run() or mlflow.start_run()).info.run_id
+        self.run_id = run_id
+        self.flush_interval_s = flush_interval_s
+        self.flush_timeout_s = flush_timeout_s
+        self.errors = 0
+        self._client = MlflowClient()
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="async-mlflow-logger", daemon=True)
+        self._thread.start()
+
+    def log_param(self, key: str, value: Any) -> None:
+        self._queue.put(Param(key, str(value)[:MAX_PARAM_VALUE_LENGTH]))
+
+    def log_params(self, params: Dict[str, Any]) -> None:
+        """Log the scalar params, e.g. nested estimators of `get_params()` are skipped."""
+        for key, value in params.items():
+            if value is None or isinstance(value, (str, numbers.Number)):
+                self.log_param(key, value)
+
+    def log_metric(self, key: str, value: float, step: Optional[int] = None) -> None:
+        self._queue.put(Metric(key, float(value), int(time.time() * 1000), step or 0))
+
+    def log_metrics(self, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        for key, value in metrics.items():
+            self.log_metric(key, value, step)
+
+    def set_tag(self, key: str, value: Any) -> None:
+        self._queue.put(RunTag(key, str(value)))
+
+    def log_artifact(self, local_path: str, artifact_path: Optional[str] = None) -> None:
+        self._queue.put(("artifact", local_path, artifact_path))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything logged so far is sent.
+
+        Args:
+            timeout: Seconds to wait at most, `flush_timeout_s` by default.
+
+        Returns:
+            `False` if the timeout expired before everything was sent.
+        """
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        if done.wait(self.flush_timeout_s if timeout is None else timeout):
+            return True
+        logger.warning("Timed out waiting for MLflow logging requests to be sent")
+        return False
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            # the thread sends everything logged before stopping
+            self._queue.put(_STOP)
+            self._thread.join(self.flush_timeout_s)
+            if self._thread.is_alive():
+                logger.warning("Timed out waiting for MLflow logging requests to be sent")
+        if self._started_run:
+            self._started_run = False
+            active_run = mlflow.active_run()
+            if active_run is not None and active_run.info.run_id == self.run_id:
+                mlflow.end_run()
+        if self.errors:
+            logger.warning(f"{self.errors} MLflow logging requests failed, see errors above")
+
+    def __enter__(self) -> "AsyncMlflowLogger":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _send(self, metrics: List[Metric], params: List[Param], tags: List[RunTag]) -> None:
+        while metrics or params or tags:
+            batch_params, params = params[:MAX_BATCH_PARAMS], params[MAX_BATCH_PARAMS:]
+            batch_tags, tags = tags[:MAX_BATCH_TAGS], tags[MAX_BATCH_TAGS:]
+            n_metrics = MAX_BATCH_METRICS - len(batch_params) - len(batch_tags)
+            batch_metrics, metrics = metrics[:n_metrics], metrics[n_metrics:]
+            try:
+                self._client.log_batch(
+                    self.run_id, metrics=batch_metrics, params=batch_params, tags=batch_tags
+                )
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"MLflow batch logging failed: {e}")
+
+    def _run(self) -> None:
+        metrics, params, tags = [], [], []
+        next_send = time.monotonic() + self.flush_interval_s
+        while True:
+            try:
+                item = self._queue.get(timeout=max(next_send - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+            if isinstance(item, Metric):
+                metrics.append(item)
+            elif isinstance(item, Param):
+                params.append(item)
+            elif isinstance(item, RunTag):
+                tags.append(item)
+            full = len(metrics) >= MAX_BATCH_METRICS or len(params) >= MAX_BATCH_PARAMS or len(tags) >= MAX_BATCH_TAGS
+            due = time.monotonic() >= next_send
+            if due or full or not isinstance(item, (Metric, Param, RunTag)):
+                # artifacts and flushes wait for everything logged before them
+                self._send(metrics, params, tags)
+                metrics, params, tags = [], [], []
+                next_send = time.monotonic() + self.flush_interval_s
+            if item is _STOP:
+                return
+            if isinstance(item, tuple) and item[0] is _FLUSH:
+                item[1].set()
+            elif isinstance(item, tuple) and item[0] == "artifact":
+                _, local_path, artifact_path = item
+                try:
+                    self._client.log_artifact(self.run_id, local_path, artifact_path)
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"MLflow artifact upload of {local_path} failed: {e}")
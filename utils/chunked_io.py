@@ -0,0 +1,66 @@
+import os
+from typing import Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def iter_frame_chunks(
+        path: str,
+        chunk_size: int,
+        columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Read a local CSV or Parquet file as DataFrames of at most `chunk_size` rows.
+
+    Only one chunk is held in memory at a time.
+
+    Args:
+        path: Path to a `.csv` or `.parquet` file.
+        chunk_size: Maximum number of rows per chunk.
+        columns: Columns to read, all if not set.
+
+    Yields:
+        Consecutive chunks of the file.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+    elif extension in (".parquet", ".pq"):
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported file format for chunked reading: {path}")
+
+
+class ParquetChunkWriter:
+    """Append DataFrame chunks to a single Parquet file.
+
+    The schema is taken from the first chunk, every chunk becomes a row group.
+    """
+
+    def __init__(self, path: str, compression: str = "snappy"):
+        self.path = path
+        self.compression = compression
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._writer = pq.ParquetWriter(
+                self.path, table.schema, compression=self.compression
+            )
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,186 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import ClassifierMixin
+from sklearn.tree import DecisionTreeClassifier
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+_ARRAYS = ("roots", "children_left", "children_right", "feature", "threshold", "value")
+_META_FILENAME = "meta.json"
+# rows traversed at a time, bounds the (rows x trees) node index matrix
+_ROWS_PER_BATCH = 8192
+
+
+def _float32_round_down(values: np.ndarray) -> np.ndarray:
+    """Largest float32 not above each value.
+
+    sklearn trees compare float32 features against float64 thresholds, and
+    `x <= t` equals `x <= t32` for every float32 `x` exactly when `t32` is `t`
+    rounded down to float32, so predictions stay identical.
+    """
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def supports_compact_export(model: ClassifierMixin) -> bool:
+    """Whether `model` is a fitted single-output decision tree or forest of them."""
+    trees = getattr(model, "estimators_", [model])
+    return (
+        all(isinstance(tree, DecisionTreeClassifier) and hasattr(tree, "tree_") for tree in trees)
+        and getattr(model, "n_outputs_", 1) == 1
+    )
+
+
+class CompactForest:
+    """Array-backed copy of a fitted decision tree classifier or forest.
+
+    Nodes of all trees are flattened into shared arrays with float32 thresholds
+    and per-node class probabilities. Predictions traverse all trees for a batch
+    of rows at once with NumPy and equal those of the original estimator.
+    Saved as `.npy` files, which are loaded memory-mapped, so loading costs no
+    unpickling and pages are shared between processes.
+    """
+
+    def __init__(
+            self,
+            arrays: Dict[str, np.ndarray],
+            classes: List[Any],
+            n_features: int,
+            feature_names: Optional[List[str]] = None,
+            path: Optional[str] = None,
+    ):
+        self.arrays = arrays
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = n_features
+        self.feature_names_in_ = feature_names
+        # directory the arrays are memory-mapped from, if any
+        self.path = path
+
+    @classmethod
+    def from_estimator(cls, model: ClassifierMixin) -> "CompactForest":
+        """Export a fitted `DecisionTreeClassifier`, `RandomForestClassifier` or `ExtraTreesClassifier`."""
+        if not supports_compact_export(model):
+            raise ValueError(f"{type(model).__name__} can't be exported as a compact forest")
+        trees = [tree.tree_ for tree in getattr(model, "estimators_", [model])]
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        children_left, children_right = [], []
+        for offset, tree in zip(offsets, trees):
+            is_leaf = tree.children_left == -1
+            children_left.append(np.where(is_leaf, -1, tree.children_left + offset))
+            children_right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        value = np.concatenate([tree.value[:, 0, :] for tree in trees]).astype(np.float64)
+        # older sklearn versions store class counts, newer ones fractions
+        value /= np.maximum(value.sum(axis=1, keepdims=True), np.finfo(np.float64).tiny)
+
+        arrays = {
+            "roots": offsets[:-1].astype(np.int32),
+            "children_left": np.concatenate(children_left).astype(np.int32),
+            "children_right": np.concatenate(children_right).astype(np.int32),
+            "feature": np.concatenate([tree.feature for tree in trees]).astype(np.int32),
+            "threshold": _float32_round_down(np.concatenate([tree.threshold for tree in trees])),
+            "value": value,
+        }
+        feature_names = getattr(model, "feature_names_in_", None)
+        return cls(
+            arrays,
+            classes=model.classes_.tolist(),
+            n_features=model.n_features_in_,
+            feature_names=feature_names.tolist() if feature_names is not None else None,
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.arrays["roots"])
+
+    def _features(self, X: Any) -> np.ndarray:
+        if isinstance(X, pd.DataFrame) and self.feature_names_in_ is not None:
+            X = X[self.feature_names_in_]
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node of every row in every tree, shape (rows, trees)."""
+        left, right = self.arrays["children_left"], self.arrays["children_right"]
+        feature, threshold = self.arrays["feature"], self.arrays["threshold"]
+        nodes = np.broadcast_to(self.arrays["roots"], (len(X), self.n_trees)).copy()
+        rows = np.arange(len(X))[:, None]
+        active = left[nodes] != -1
+        while active.any():
+            row_index, tree_index = np.nonzero(active)
+            current = nodes[row_index, tree_index]
+            goes_left = X[rows[row_index, 0], feature[current]] <= threshold[current]
+            nodes[row_index, tree_index] = np.where(goes_left, left[current], right[current])
+            active[row_index, tree_index] = left[nodes[row_index, tree_index]] != -1
+        return nodes
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        X = self._features(X)
+        value = self.arrays["value"]
+        proba = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), _ROWS_PER_BATCH):
+            leaves = self._leaves(X[start: start + _ROWS_PER_BATCH])
+            batch = proba[start: start + _ROWS_PER_BATCH]
+            # summed tree by tree, in the same order sklearn forests do
+            for tree_index in range(self.n_trees):
+                batch += value[leaves[:, tree_index]]
+        return proba / self.n_trees
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(self.arrays[name]))
+        with open(os.path.join(directory, _META_FILENAME), "w") as f:
+            json.dump({
+                "classes": self.classes_.tolist(),
+                "n_features": self.n_features_in_,
+                "feature_names": self.feature_names_in_,
+            }, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "CompactForest":
+        with open(os.path.join(directory, _META_FILENAME)) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in _ARRAYS
+        }
+        return cls(
+            arrays,
+            classes=meta["classes"],
+            n_features=meta["n_features"],
+            feature_names=meta["feature_names"],
+            path=directory if mmap else None,
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # memory-mapped forests are shipped to worker processes by path only
+        if self.path is not None:
+            return {"path": self.path}
+        return self.__dict__
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        if set(state) == {"path"}:
+            state = CompactForest.load(state["path"]).__dict__
+        self.__dict__.update(state)
+
+
+def load_predictor(model_version: Any) -> Any:
+    """Load the compact model of a model version, falling back to the pickled `model`."""
+    try:
+        compact_model = model_version.load_artifact("compact_model")
+    except KeyError:
+        compact_model = None
+    if compact_model is not None:
+        return compact_model
+    return model_version.load_artifact("model")
@@ -0,0 +1,412 @@
+import operator
+import os
+import sqlite3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# predicates as `[column, operator, value]`, all of them must hold
+FILTER_OPERATORS = ("==", "!=", "<", "<=", ">", ">=", "in", "not in")
+_SQL_OPERATORS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">=",
+                  "in": "IN", "not in": "NOT IN"}
+
+
+def _validate_filters(filters: Optional[Sequence[Sequence[Any]]]) -> List[tuple]:
+    validated = []
+    for predicate in filters or []:
+        column, operator, value = predicate
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator `{operator}`, expected one of {FILTER_OPERATORS}")
+        if operator in ("in", "not in"):
+            value = list(value)
+        validated.append((column, operator, value))
+    return validated
+
+
+def _filter_mask(df: pd.DataFrame, filters: List[tuple]) -> pd.Series:
+    mask = pd.Series(True, index=df.index)
+    for column, operator, value in filters:
+        values = df[column]
+        if operator == "in":
+            mask &= values.isin(value)
+        elif operator == "not in":
+            mask &= ~values.isin(value)
+        else:
+            mask &= {
+                "==": values.__eq__, "!=": values.__ne__, "<": values.__lt__,
+                "<=": values.__le__, ">": values.__gt__, ">=": values.__ge__,
+            }[operator](value)
+    return mask
+
+
+class DataSource:
+    """Partitioned table readable with column and predicate pushdown.
+
+    A partition is a dict of partition key values, e.g. `{"date": "2024-01-01"}`.
+    Subclasses list the partitions and read a single partition; partitions are
+    read in parallel by `read_source`. `limit` is an upper bound on the rows
+    needed from a partition, sources that can't stop early may return more.
+    """
+
+    def list_partitions(self) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+    def read_partition(
+            self,
+            partition: Dict[str, str],
+            columns: Optional[List[str]],
+            filters: List[tuple],
+            limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def estimate_bytes(self, partition: Dict[str, str], columns: Optional[List[str]]) -> Optional[int]:
+        """Size of a partition before reading it, `None` if unknown."""
+        return None
+
+
+class _FileSource(DataSource):
+    """Directory of files, optionally in hive style `key=value` subdirectories."""
+
+    extensions: tuple = ()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._files: Dict[tuple, List[str]] = {}
+
+    def list_partitions(self) -> List[Dict[str, str]]:
+        if not self._files:
+            if os.path.isfile(self.path):
+                self._files[()] = [self.path]
+            for root, dirs, files in os.walk(self.path):
+                dirs.sort()
+                keys = tuple(
+                    tuple(part.split("=", 1))
+                    for part in os.path.relpath(root, self.path).split(os.sep)
+                    if "=" in part
+                )
+                paths = [os.path.join(root, f) for f in sorted(files) if f.lower().endswith(self.extensions)]
+                if paths:
+                    self._files.setdefault(keys, []).extend(paths)
+        return [dict(keys) for keys in self._files]
+
+    def _paths(self, partition: Dict[str, str]) -> List[str]:
+        return self._files[tuple(partition.items())]
+
+    def _read_file(
+            self,
+            path: str,
+            columns: Optional[List[str]],
+            filters: List[tuple],
+            limit: Optional[int],
+    ) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def read_partition(self, partition, columns, filters, limit=None):
+        # filters on partition keys were resolved when pruning partitions
+        file_columns = None if columns is None else [c for c in columns if c not in partition]
+        file_filters = [f for f in filters if f[0] not in partition]
+        frames, n_rows = [], 0
+        for path in self._paths(partition):
+            frames.append(self._read_file(
+                path, file_columns, file_filters, None if limit is None else limit - n_rows
+            ))
+            n_rows += len(frames[-1])
+            if limit is not None and n_rows >= limit:
+                break
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        for key, value in partition.items():
+            if columns is None or key in columns:
+                df[key] = value
+        return df if columns is None else df[columns]
+
+    def estimate_bytes(self, partition, columns):
+        return sum(os.path.getsize(path) for path in self._paths(partition))
+
+
+class ParquetSource(_FileSource):
+    """Parquet files, filters are pushed down to row group statistics."""
+
+    extensions = (".parquet", ".pq")
+
+    def _read_file(self, path, columns, filters, limit):
+        return pq.read_table(path, columns=columns, filters=filters or None).to_pandas()
+
+    def estimate_bytes(self, partition, columns):
+        # uncompressed size of the selected column chunks from the footers
+        total = 0
+        for path in self._paths(partition):
+            metadata = pq.ParquetFile(path).metadata
+            for i in range(metadata.num_row_groups):
+                row_group = metadata.row_group(i)
+                for j in range(row_group.num_columns):
+                    column = row_group.column(j)
+                    if columns is None or column.path_in_schema in columns:
+                        total += column.total_uncompressed_size
+        return total
+
+
+class CsvSource(_FileSource):
+    """CSV files, read in chunks so filtered out rows are never held in full.
+
+    Reading a file stops at the first chunk that completes `limit` rows.
+    """
+
+    extensions = (".csv",)
+
+    def __init__(self, path: str, chunk_size: int = 100_000):
+        super().__init__(path)
+        self.chunk_size = chunk_size
+
+    def _read_file(self, path, columns, filters, limit):
+        usecols = None if columns is None else list(dict.fromkeys(columns + [f[0] for f in filters]))
+        chunks, n_rows = [], 0
+        with pd.read_csv(path, usecols=usecols, chunksize=self.chunk_size) as reader:
+            for chunk in reader:
+                chunks.append(chunk[_filter_mask(chunk, filters)] if filters else chunk)
+                n_rows += len(chunks[-1])
+                if limit is not None and n_rows >= limit:
+                    break
+        df = pd.concat(chunks, ignore_index=True)
+        return df if columns is None else df[columns]
+
+
+class SqliteSource(DataSource):
+    """Table of a SQLite database, partitioned by the values of `partition_keys`.
+
+    Columns, filters and the row limit become the `SELECT` list, `WHERE` and
+    `LIMIT` clauses, every partition is a separate query on its own connection.
+    """
+
+    def __init__(self, path: str, table: str, partition_keys: Optional[List[str]] = None):
+        self.path = path
+        self.table = table
+        self.partition_keys = list(partition_keys or [])
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        return '"' + identifier.replace('"', '""') + '"'
+
+    def list_partitions(self) -> List[Dict[str, str]]:
+        if not self.partition_keys:
+            return [{}]
+        keys = ", ".join(map(self._quote, self.partition_keys))
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f"SELECT DISTINCT {keys} FROM {self._quote(self.table)} ORDER BY {keys}"
+            ).fetchall()
+        finally:
+            connection.close()
+        return [{key: str(value) for key, value in zip(self.partition_keys, row)} for row in rows]
+
+    def read_partition(self, partition, columns, filters, limit=None):
+        # partition values are listed as text, compare on the column's text form
+        clauses = [f"CAST({self._quote(key)} AS TEXT) = ?" for key in partition]
+        params = list(partition.values())
+        for column, operator, value in filters:
+            if operator in ("in", "not in"):
+                clauses.append(f"{self._quote(column)} {_SQL_OPERATORS[operator]} ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{self._quote(column)} {_SQL_OPERATORS[operator]} ?")
+                params.append(value)
+        select = "*" if columns is None else ", ".join(map(self._quote, columns))
+        query = f"SELECT {select} FROM {self._quote(self.table)}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        connection = self._connect()
+        try:
+            return pd.read_sql_query(query, connection, params=params)
+        finally:
+            connection.close()
+
+
+SOURCE_TYPES = {"parquet": ParquetSource, "csv": CsvSource, "sqlite": SqliteSource}
+
+
+def source_from_config(config: Dict[str, Any]) -> DataSource:
+    """Build a data source from the `source` section of a pipeline config.
+
+    Keys other than `type` are the source's constructor arguments, e.g.
+    `{"type": "sqlite", "path": "warehouse.db", "table": "patients"}`.
+    """
+    config = dict(config)
+    source_type = config.pop("type")
+    if source_type not in SOURCE_TYPES:
+        raise ValueError(f"Unknown data source type `{source_type}`, expected one of {list(SOURCE_TYPES)}")
+    return SOURCE_TYPES[source_type](**config)
+
+
+def _as_strings(values: Any) -> List[str]:
+    return [str(v) for v in (values if isinstance(values, (list, tuple)) else [values])]
+
+
+_PARTITION_OPERATORS = {
+    "==": operator.eq, "!=": operator.ne, "<": operator.lt,
+    "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+
+
+def _cast_like(text: str, like: Any) -> Any:
+    """Partition value `text` as the type of the filter value `like`, unchanged if it doesn't parse."""
+    try:
+        if isinstance(like, bool):
+            return {"true": True, "false": False, "1": True, "0": False}[text.lower()]
+        if isinstance(like, int):
+            number = float(text)
+            return int(number) if number.is_integer() else number
+        if isinstance(like, float):
+            return float(text)
+    except (KeyError, ValueError):
+        pass
+    return text
+
+
+def _partition_matches(partition: Dict[str, str], filters: List[tuple]) -> bool:
+    # partition values are text, compared as the type of the filter value
+    for column, op, value in filters:
+        if op in ("in", "not in"):
+            found = any(_cast_like(partition[column], v) == v for v in value)
+            matches = found if op == "in" else not found
+        else:
+            try:
+                matches = _PARTITION_OPERATORS[op](_cast_like(partition[column], value), value)
+            except TypeError:
+                # a value that doesn't parse as the filter type can't be ordered against it
+                matches = False
+        if not matches:
+            return False
+    return True
+
+
+def _select_partitions(
+        partitions: List[Dict[str, str]],
+        selection: Optional[Dict[str, Any]],
+        filters: List[tuple],
+) -> List[Dict[str, str]]:
+    selected = []
+    for partition in partitions:
+        if selection and any(
+                key in partition and partition[key] not in _as_strings(values)
+                for key, values in selection.items()
+        ):
+            continue
+        if not _partition_matches(partition, [f for f in filters if f[0] in partition]):
+            continue
+        selected.append(partition)
+    return selected
+
+
+def read_source(
+        source: DataSource,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Sequence[Sequence[Any]]] = None,
+        partitions: Optional[Dict[str, Any]] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        n_threads: Optional[int] = None,
+) -> pd.DataFrame:
+    """Read a slice of a data source into a single DataFrame.
+
+    Partitions not matching `partitions` or filters on partition keys are
+    never opened. Remaining partitions are read in order by a thread pool with
+    columns, filters and the rows still missing from `max_rows` pushed down to
+    the source. No further partition is scheduled once `max_rows` rows or
+    `max_bytes` bytes in memory are reached; partitions whose size is known to
+    exceed `max_bytes` upfront are not read.
+
+    Args:
+        source: Source to read from.
+        columns: Columns to read, all by default.
+        filters: Row predicates as `[column, operator, value]`, all must hold.
+        partitions: Partition key values to read, e.g. `{"date": ["2024-01-01"]}`.
+        max_rows: Maximal number of rows returned.
+        max_bytes: Maximal in-memory size of the returned rows.
+        n_threads: Number of reader threads, one per CPU by default.
+
+    Returns:
+        Rows of all selected partitions in partition order.
+    """
+    filters = _validate_filters(filters)
+    selected = _select_partitions(source.list_partitions(), partitions, filters)
+    if not selected:
+        raise ValueError("No partition of the data source matches the selection")
+
+    if max_bytes is not None:
+        planned, planned_bytes = [], 0
+        for partition in selected:
+            estimate = source.estimate_bytes(partition, columns)
+            if planned and estimate is not None and planned_bytes + estimate > max_bytes:
+                break
+            planned.append(partition)
+            planned_bytes += estimate or 0
+        if len(planned) < len(selected):
+            logger.warning(
+                f"Reading {len(planned)} of {len(selected)} partitions within the "
+                f"{max_bytes} bytes budget."
+            )
+        selected = planned
+
+    n_threads = n_threads or os.cpu_count() or 1
+    kept, n_rows, n_bytes, truncated = [], 0, 0, False
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        # at most `n_threads` partitions ahead of the one being kept, so reading
+        # stops soon after the budget is spent instead of after every partition
+        in_flight, next_partition = deque(), 0
+        while True:
+            while next_partition < len(selected) and len(in_flight) < n_threads:
+                limit = None if max_rows is None else max_rows - n_rows
+                in_flight.append(executor.submit(
+                    source.read_partition, selected[next_partition], columns, filters, limit
+                ))
+                next_partition += 1
+            if not in_flight:
+                break
+            frame = in_flight.popleft().result()
+            if max_rows is not None and n_rows + len(frame) > max_rows:
+                frame, truncated = frame.iloc[:max_rows - n_rows], True
+            frame_bytes = int(frame.memory_usage(index=False).sum())
+            if max_bytes is not None and kept and n_bytes + frame_bytes > max_bytes:
+                truncated = True
+                break
+            kept.append(frame)
+            n_rows += len(frame)
+            n_bytes += frame_bytes
+            if max_rows is not None and n_rows >= max_rows and (in_flight or next_partition < len(selected)):
+                truncated = True
+            if truncated:
+                break
+        for future in in_flight:
+            future.cancel()
+    if truncated:
+        logger.warning(f"Data source read truncated to {n_rows} rows by the budget.")
+    return pd.concat(kept, ignore_index=True) if len(kept) > 1 else kept[0].reset_index(drop=True)
+
+
+def load_from_config(config: Dict[str, Any]) -> pd.DataFrame:
+    """Read the slice described by a `source` config section.
+
+    Besides the source keys, the section takes `columns`, `filters`,
+    `partitions`, `max_rows`, `max_bytes` and `n_threads` of `read_source`.
+    """
+    config = dict(config)
+    read_args = {
+        key: config.pop(key)
+        for key in ("columns", "filters", "partitions", "max_rows", "max_bytes", "n_threads")
+        if key in config
+    }
+    return read_source(source_from_config(config), **read_args)
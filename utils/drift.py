@@ -0,0 +1,206 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# pseudo-count added to every bin, keeps PSI finite and damps noise of sparse bins
+_SMOOTHING = 0.5
+# below this many comparison rows drift statistics are dominated by sampling noise
+MIN_DRIFT_ROWS = 1000
+
+
+class DriftSketch:
+    """Mergeable per-column summary of a dataset for single-pass drift detection.
+
+    For every numeric column it keeps a histogram over fixed bin edges, the NA
+    count and the row count. Bin edges are the reference dataset quantiles, so
+    the reference histogram is also a quantile sketch of it. A comparison
+    sketch shares the reference edges and is updated chunk by chunk, so the
+    reference is summarized once and never rescanned.
+    """
+
+    def __init__(self, columns: List[str], bin_edges: List[np.ndarray]):
+        self.columns = list(columns)
+        # inner edges only, the outer bins are open-ended
+        self.bin_edges = [np.asarray(edges, dtype=np.float64) for edges in bin_edges]
+        self.counts = [np.zeros(len(edges) + 1, dtype=np.int64) for edges in self.bin_edges]
+        self.na_counts = np.zeros(len(self.columns), dtype=np.int64)
+        self.n_rows = 0
+
+    @classmethod
+    def from_reference(
+            cls,
+            dataset: pd.DataFrame,
+            n_bins: int = 20,
+            exclude_columns: Optional[Iterable[str]] = None,
+    ) -> "DriftSketch":
+        """Build the reference sketch with quantile bin edges of `dataset`.
+
+        Args:
+            dataset: Reference dataset, usually the preprocessed train set.
+            n_bins: Maximum number of bins per column.
+            exclude_columns: Columns to leave out, e.g. the target.
+
+        Returns:
+            Sketch summarizing `dataset`.
+        """
+        exclude_columns = set(exclude_columns or [])
+        columns = [
+            column for column in dataset.select_dtypes("number").columns
+            if column not in exclude_columns
+        ]
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        bin_edges = []
+        for column in columns:
+            values = dataset[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            bin_edges.append(np.unique(np.quantile(values, quantiles)) if len(values) else np.array([]))
+        sketch = cls(columns, bin_edges)
+        sketch.update(dataset)
+        return sketch
+
+    def empty_like(self) -> "DriftSketch":
+        """Empty sketch with the same columns and bin edges, to summarize a comparison dataset."""
+        return DriftSketch(self.columns, self.bin_edges)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add a chunk of rows to the sketch."""
+        for i, column in enumerate(self.columns):
+            values = chunk[column].to_numpy(dtype=np.float64)
+            is_na = np.isnan(values)
+            self.na_counts[i] += int(is_na.sum())
+            bins = np.searchsorted(self.bin_edges[i], values[~is_na], side="right")
+            self.counts[i] += np.bincount(bins, minlength=len(self.counts[i]))
+        self.n_rows += len(chunk)
+
+    def merge(self, other: "DriftSketch") -> None:
+        """Add the counts of a sketch with the same bin edges, e.g. of another shard."""
+        for i in range(len(self.columns)):
+            self.counts[i] += other.counts[i]
+        self.na_counts += other.na_counts
+        self.n_rows += other.n_rows
+
+    def compare(self, comparison: "DriftSketch") -> Dict[str, Dict[str, float]]:
+        """Per-column drift of `comparison` relative to this reference sketch.
+
+        PSI is computed on bin frequencies with half a count added to every
+        bin of both histograms, so bins that are empty in a small comparison
+        sample don't each add a large `log(count / eps)` term.
+
+        Returns:
+            PSI, KS statistic over the bin boundaries and NA ratios per column.
+        """
+        drift = {}
+        for i, column in enumerate(self.columns):
+            n_bins = len(self.counts[i])
+            reference = (self.counts[i] + _SMOOTHING) / (self.counts[i].sum() + _SMOOTHING * n_bins)
+            current = (comparison.counts[i] + _SMOOTHING) / (comparison.counts[i].sum() + _SMOOTHING * n_bins)
+            psi = np.sum((current - reference) * np.log(current / reference))
+            ks = np.max(np.abs(
+                np.cumsum(comparison.counts[i]) / max(comparison.counts[i].sum(), 1)
+                - np.cumsum(self.counts[i]) / max(self.counts[i].sum(), 1)
+            ))
+            drift[column] = {
+                "psi": float(psi),
+                "ks": float(ks),
+                "na_ratio_reference": float(self.na_counts[i] / max(self.n_rows, 1)),
+                "na_ratio_current": float(comparison.na_counts[i] / max(comparison.n_rows, 1)),
+            }
+        return drift
+
+
+def drifted_columns(
+        drift: Dict[str, Dict[str, float]],
+        psi_threshold: float = 0.2,
+        ks_threshold: float = 0.2,
+        na_drift_tolerance: float = 0.1,
+) -> Dict[str, List[str]]:
+    """Columns whose drift exceeds thresholds, with the reasons per column."""
+    drifted = {}
+    for column, stats in drift.items():
+        reasons = []
+        if stats["psi"] > psi_threshold:
+            reasons.append(f"psi={stats['psi']:.3f}")
+        if stats["ks"] > ks_threshold:
+            reasons.append(f"ks={stats['ks']:.3f}")
+        na_reference = stats["na_ratio_reference"]
+        if na_reference > 0 and abs(stats["na_ratio_current"] - na_reference) / na_reference > na_drift_tolerance:
+            reasons.append(f"na_ratio={stats['na_ratio_current']:.3f}")
+        if reasons:
+            drifted[column] = reasons
+    return drifted
+
+
+def enforce_drift_gate(
+        drift: Dict[str, Dict[str, float]],
+        n_rows: int,
+        fail_on_drift: bool = False,
+        min_rows: int = MIN_DRIFT_ROWS,
+        psi_threshold: float = 0.2,
+        ks_threshold: float = 0.2,
+        na_drift_tolerance: float = 0.1,
+) -> Dict[str, List[str]]:
+    """Report drifted columns, raising RuntimeError on drift if `fail_on_drift` is set.
+
+    Drift of fewer than `min_rows` scoring rows is only a warning, their
+    histograms being too sparse to tell drift from noise.
+
+    Returns:
+        Drifted columns with the reasons per column.
+    """
+    drifted = drifted_columns(drift, psi_threshold, ks_threshold, na_drift_tolerance)
+    if not drifted:
+        logger.info("No drift detected against the reference dataset")
+        return drifted
+    message = "Scoring dataset drifted from train dataset:\n" + "\n".join(
+        f"{column}: {', '.join(reasons)}" for column, reasons in drifted.items()
+    )
+    if n_rows < min_rows:
+        logger.warning(
+            f"{message}\nOnly {n_rows} rows were scored "
+            f"(less than {min_rows}), drift statistics are unreliable"
+        )
+        return drifted
+    if fail_on_drift:
+        raise RuntimeError(message)
+    logger.warning(message)
+    return drifted
+
+
+def na_ratio_drift(
+        reference: Dict[str, Any],
+        current: Dict[str, Any],
+        na_drift_tolerance: float = 0.1,
+) -> Dict[str, Tuple[float, float]]:
+    """Columns whose NA ratio changed by more than `na_drift_tolerance` relative to the reference.
+
+    `reference` and `current` are the `shape` and `null_counts` metadata that
+    `ParquetDataFrameMaterializer` logs for DataFrame artifacts, so neither
+    dataset has to be loaded. Columns missing from either side are skipped.
+
+    Returns:
+        Reference and current NA ratio per drifted column.
+    """
+    reference_rows, current_rows = max(reference["shape"][0], 1), max(current["shape"][0], 1)
+    drifted = {}
+    for column, reference_nulls in reference["null_counts"].items():
+        if column not in current["null_counts"]:
+            continue
+        na_reference = reference_nulls / reference_rows
+        na_current = current["null_counts"][column] / current_rows
+        if na_reference > 0 and abs(na_current - na_reference) / na_reference > na_drift_tolerance:
+            drifted[column] = (na_reference, na_current)
+    return drifted
+
+
+def summarize_drift(drift: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """Compact drift summary for step metadata."""
+    return {
+        "max_psi": max((stats["psi"] for stats in drift.values()), default=0.0),
+        "max_ks": max((stats["ks"] for stats in drift.values()), default=0.0),
+        "columns": drift,
+    }
@@ -0,0 +1,61 @@
+import os
+import pickle
+import tempfile
+from typing import Any, Optional
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_ETL_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "e2e_use_case", "etl"
+)
+
+
+class ETLCache:
+    """Content-addressed on-disk cache with LRU eviction by total size.
+
+    Entries are pickled into one file per key. Reading an entry refreshes its
+    modification time, so eviction drops the least recently used entries
+    until the cache fits into `max_bytes`.
+    """
+
+    def __init__(self, root_dir: str = DEFAULT_ETL_CACHE_DIR, max_bytes: int = 1024 ** 3):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        # write to a temp file first, so concurrent readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for file_name in os.listdir(self.root_dir):
+            if file_name.endswith(".pkl"):
+                stat = os.stat(os.path.join(self.root_dir, file_name))
+                entries.append((stat.st_mtime, stat.st_size, file_name))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, file_name in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.root_dir, file_name))
+            total_size -= size
+            logger.info(f"Evicted ETL cache entry {file_name}")
@@ -0,0 +1,120 @@
+import time
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin, MetaEstimatorMixin, TransformerMixin, clone
+
+from utils.get_model_from_config import estimator_spec
+from utils.incremental import GROWTH_PARAMS
+
+# prefix of wrapped estimator parameters in search grids
+CAPPED_PARAM_PREFIX = "estimator__"
+
+
+class QuantileBinner(TransformerMixin, BaseEstimator):
+    """Map every feature to its quantile bin, the way histogram boosting bins.
+
+    Binning once up front lets all search candidates and CV folds fit on the
+    binned matrix instead of each fit recomputing quantiles on raw floats.
+    Missing values go to the extra bin `max_bins`.
+    """
+
+    def __init__(self, max_bins: int = 255, subsample: int = 200_000, random_state: int = 42):
+        self.max_bins = max_bins
+        self.subsample = subsample
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        if hasattr(X, "columns"):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        values = np.asarray(X, dtype=np.float64)
+        if self.subsample and len(values) > self.subsample:
+            rows = np.random.default_rng(self.random_state).choice(len(values), self.subsample, replace=False)
+            values = values[rows]
+        quantiles = np.linspace(0, 1, self.max_bins + 1)[1:-1]
+        self.bin_edges_ = []
+        for column in values.T:
+            column = column[~np.isnan(column)]
+            edges = np.unique(np.quantile(column, quantiles)) if len(column) else np.array([])
+            self.bin_edges_.append(edges)
+        self.n_features_in_ = values.shape[1]
+        return self
+
+    def transform(self, X):
+        values = np.asarray(X, dtype=np.float64)
+        binned = np.empty(values.shape, dtype=np.uint8 if self.max_bins < 256 else np.uint16)
+        for j, edges in enumerate(self.bin_edges_):
+            column = values[:, j]
+            binned[:, j] = np.searchsorted(edges, column, side="left")
+            binned[np.isnan(column), j] = self.max_bins
+        if hasattr(X, "columns"):
+            return pd.DataFrame(binned, columns=X.columns, index=X.index)
+        return binned
+
+
+class FitTimeCap(MetaEstimatorMixin, ClassifierMixin, BaseEstimator):
+    """Fit a `warm_start` estimator only as far as a time cap allows.
+
+    A probe fit grows the first `probe_fraction` of the growth parameter
+    (`max_iter` or `n_estimators`), its time per tree/iteration decides how
+    far the second, warm started fit may grow within `max_fit_time_s`.
+    Resuming a fit replays the fitted stages, so growing in two fits is
+    cheaper than checking the clock after every small increment.
+    Estimators without `warm_start` are fitted in one go.
+    """
+
+    def __init__(self, estimator: ClassifierMixin, max_fit_time_s: float = 60.0, probe_fraction: float = 0.1):
+        self.estimator = estimator
+        self.max_fit_time_s = max_fit_time_s
+        self.probe_fraction = probe_fraction
+
+    def fit(self, X, y):
+        model = clone(self.estimator)
+        params = model.get_params()
+        growth_param = next((param for param in GROWTH_PARAMS if param in params), None)
+        start = time.perf_counter()
+        self.capped_ = False
+        if not estimator_spec(type(model)).warm_start or growth_param is None:
+            model.fit(X, y)
+        else:
+            target_size = params[growth_param]
+            probe_size = min(max(int(target_size * self.probe_fraction), 1), target_size)
+            model.set_params(warm_start=True, **{growth_param: probe_size})
+            model.fit(X, y)
+            elapsed = time.perf_counter() - start
+            # estimators with early stopping may have stopped within the probe
+            if probe_size < target_size and getattr(model, "n_iter_", probe_size) >= probe_size:
+                affordable = probe_size + int((self.max_fit_time_s - elapsed) / (elapsed / probe_size))
+                size = min(target_size, affordable)
+                self.capped_ = size < target_size
+                if size > probe_size:
+                    model.set_params(**{growth_param: size})
+                    model.fit(X, y)
+            model.set_params(warm_start=params["warm_start"], **{growth_param: target_size})
+        self.fit_time_s_ = time.perf_counter() - start
+        self.estimator_ = model
+        self.classes_ = model.classes_
+        return self
+
+    def predict(self, X):
+        return self.estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.estimator_.predict_proba(X)
+
+
+def capped_search_space(
+        search_grid: Dict[str, Any],
+        strategy: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Search grid and strategy addressing the estimator wrapped by `FitTimeCap`."""
+    search_grid = {f"{CAPPED_PARAM_PREFIX}{key}": values for key, values in search_grid.items()}
+    if strategy["resource"] != "n_samples":
+        strategy = {**strategy, "resource": f"{CAPPED_PARAM_PREFIX}{strategy['resource']}"}
+    return search_grid, strategy
+
+
+def uncapped_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {key[len(CAPPED_PARAM_PREFIX):] if key.startswith(CAPPED_PARAM_PREFIX) else key: value
+            for key, value in params.items()}
@@ -1,18 +1,90 @@
+import importlib
+from functools import lru_cache
+from typing import Type
+
 from sklearn.base import ClassifierMixin
 
-def get_model_from_config(
-    model_package: str, model_class: str
-) -> ClassifierMixin:
-    if model_package == "sklearn.ensemble":
-        import sklearn.ensemble as package
+# estimator packages a search space may reference
+ALLOWED_PACKAGES = (
+    "sklearn.ensemble",
+    "sklearn.tree",
+    "sklearn.linear_model",
+    "sklearn.naive_bayes",
+    "sklearn.neighbors",
+    "sklearn.svm",
+    "lightgbm",
+    "xgboost",
+)
+# installed separately, not required by the template
+OPTIONAL_PACKAGES = ("lightgbm", "xgboost")
+# modules whose estimators work on float32 features without an upcasting copy
+_FLOAT32_MODULES = ("sklearn.tree", "sklearn.ensemble._forest", "lightgbm", "xgboost")
+
+
+class EstimatorSpec:
+    """Estimator class and the execution paths it supports.
+
+    Attributes:
+        estimator: The estimator class.
+        warm_start: Whether a fitted model can grow further with `warm_start`.
+        partial_fit: Whether a fitted model can be updated with `partial_fit`.
+        n_jobs: Whether the estimator parallelizes itself via `n_jobs`.
+        float32: Whether float32 features are used as is instead of being copied to float64.
+    """
+
+    def __init__(self, estimator: Type[ClassifierMixin]):
+        try:
+            params = estimator().get_params()
+        except TypeError:
+            # estimators with required arguments, e.g. pipelines
+            params = {}
+        self.estimator = estimator
+        self.warm_start = "warm_start" in params
+        self.partial_fit = hasattr(estimator, "partial_fit")
+        self.n_jobs = "n_jobs" in params
+        self.float32 = estimator.__module__.startswith(_FLOAT32_MODULES)
 
-        model_class = getattr(package, model_class)
-    elif model_class == "sklearn.tree":
-        import sklearn.tree as package
+    def __repr__(self) -> str:
+        flags = ", ".join(
+            flag for flag in ("warm_start", "partial_fit", "n_jobs", "float32") if getattr(self, flag)
+        )
+        return f"EstimatorSpec({self.estimator.__name__}: {flags or 'no capabilities'})"
 
-        model_class = getattr(package, model_class)
-    else:
-        raise ValueError(f"Unsuppoted model package: {model_class}")
 
-    return model_class
+@lru_cache(maxsize=None)
+def estimator_spec(estimator: Type[ClassifierMixin]) -> EstimatorSpec:
+    """Capabilities of an estimator class, computed once per class."""
+    return EstimatorSpec(estimator)
 
+
+@lru_cache(maxsize=None)
+def get_estimator_spec(model_package: str, model_class: str) -> EstimatorSpec:
+    """Resolve a `model_search_space` entry to its estimator class and capabilities.
+
+    Raises:
+        ValueError: If the package is not allowed or has no such classifier.
+        ImportError: If an optional package is not installed.
+    """
+    if model_package not in ALLOWED_PACKAGES:
+        raise ValueError(
+            f"Unsupported model package: {model_package}, expected one of {ALLOWED_PACKAGES}"
+        )
+    try:
+        package = importlib.import_module(model_package)
+    except ImportError as e:
+        if model_package in OPTIONAL_PACKAGES:
+            raise ImportError(
+                f"{model_package} is not installed, run `pip install {model_package}` "
+                f"to search {model_class}"
+            ) from e
+        raise
+    estimator = getattr(package, model_class, None)
+    if not isinstance(estimator, type) or not issubclass(estimator, ClassifierMixin):
+        raise ValueError(f"Unsupported model class: {model_package}.{model_class}")
+    return estimator_spec(estimator)
+
+
+def get_model_from_config(
+    model_package: str, model_class: str
+) -> Type[ClassifierMixin]:
+    return get_estimator_spec(model_package, model_class).estimator
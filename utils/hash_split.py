@@ -0,0 +1,162 @@
+import os
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.chunked_io import ParquetChunkWriter, iter_frame_chunks
+
+
+def hash_fractions(keys: pd.Series) -> np.ndarray:
+    """Map keys to stable pseudo-random numbers in [0, 1).
+
+    Uses pandas' fixed-key hashing, so a key maps to the same number across runs,
+    processes and dataset versions.
+    """
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return hashes / np.float64(2 ** 64)
+
+
+def stratified_thresholds(
+        chunks: Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]],
+        test_size: float,
+) -> Dict[object, float]:
+    """Per-class hash thresholds putting exactly `test_size` of every class into the test set.
+
+    The thresholds are quantiles of the current data, so unlike the
+    unstratified split (fixed threshold `test_size`) rows near a threshold can
+    change partition when rows are added or removed. Only the unstratified
+    split is stable as the dataset grows.
+
+    Takes two passes over `(hash fractions, labels)` chunks: the first counts rows
+    per class, the second keeps only the smallest `test_size * count` fractions
+    of every class, so memory is bounded by the test set keys, not the dataset.
+
+    Args:
+        chunks: Callable returning a fresh iterator of `(fractions, labels)` chunks.
+        test_size: Proportion of every class to put into the test set.
+
+    Returns:
+        Highest fraction assigned to the test set per class.
+    """
+    counts: Dict[object, int] = {}
+    for _, labels in chunks():
+        for label, count in zip(*np.unique(labels, return_counts=True)):
+            counts[label] = counts.get(label, 0) + int(count)
+    n_test = {label: int(round(count * test_size)) for label, count in counts.items()}
+
+    smallest = {label: np.empty(0) for label in counts}
+    for fractions, labels in chunks():
+        for label in np.unique(labels):
+            k = n_test[label]
+            if k == 0:
+                continue
+            candidates = np.concatenate([smallest[label], fractions[labels == label]])
+            if len(candidates) > k:
+                candidates = np.partition(candidates, k - 1)[:k]
+            smallest[label] = candidates
+    return {
+        label: float(smallest[label].max()) if n_test[label] else -1.0
+        for label in counts
+    }
+
+
+def hash_split_mask(
+        keys: pd.Series,
+        test_size: float,
+        labels: Optional[pd.Series] = None,
+        thresholds: Optional[Dict[object, float]] = None,
+) -> np.ndarray:
+    """Boolean mask of rows assigned to the test set by the hash of their key.
+
+    Args:
+        keys: Split key of every row.
+        test_size: Proportion of rows to put into the test set.
+        labels: Class of every row, required with `thresholds`.
+        thresholds: Per-class thresholds from `stratified_thresholds`.
+
+    Returns:
+        `True` for test rows.
+    """
+    fractions = hash_fractions(keys)
+    if thresholds is None:
+        return fractions < test_size
+    row_thresholds = pd.Series(labels).map(thresholds).fillna(-1.0).to_numpy()
+    return fractions <= row_thresholds
+
+
+def hash_split_frame(
+        dataset: pd.DataFrame,
+        key: str,
+        test_size: float,
+        stratify_on: Optional[str] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split an in-memory DataFrame by the hash of its `key` column.
+
+    See `stratified_thresholds` for the stability of a stratified split.
+    """
+    thresholds = None
+    if stratify_on is not None:
+        chunk = (hash_fractions(dataset[key]), dataset[stratify_on].to_numpy())
+        thresholds = stratified_thresholds(lambda: iter([chunk]), test_size)
+    is_test = hash_split_mask(
+        dataset[key], test_size,
+        labels=dataset[stratify_on] if stratify_on is not None else None,
+        thresholds=thresholds,
+    )
+    return dataset[~is_test], dataset[is_test]
+
+
+def hash_split_file(
+        source_path: str,
+        output_dir: str,
+        key: str,
+        test_size: float,
+        chunk_size: int = 100_000,
+        stratify_on: Optional[str] = None,
+) -> Tuple[str, str, Dict[str, int]]:
+    """Split a CSV/Parquet file into train and test Parquet files chunk by chunk.
+
+    Rows go to train or test by the hash of their `key` column, so a row keeps
+    its partition across runs and as the dataset grows. With `stratify_on`,
+    key and label columns are read in two extra passes to compute per-class
+    thresholds, which depend on the data: every class is split exactly, but
+    a row's partition is only stable for an unchanged dataset. Only one chunk
+    is held in memory at a time.
+
+    Args:
+        source_path: Path to a `.csv` or `.parquet` file.
+        output_dir: Directory of the `train.parquet` and `test.parquet` files.
+        key: Column with a stable row identifier.
+        test_size: Proportion of rows to put into the test set.
+        chunk_size: Number of rows read at a time.
+        stratify_on: Column to stratify the split on, usually the target.
+
+    Returns:
+        Paths of the train and test files and row counts per partition.
+    """
+    thresholds = None
+    if stratify_on is not None:
+        def key_chunks():
+            for chunk in iter_frame_chunks(source_path, chunk_size, columns=[key, stratify_on]):
+                yield hash_fractions(chunk[key]), chunk[stratify_on].to_numpy()
+        thresholds = stratified_thresholds(key_chunks, test_size)
+
+    os.makedirs(output_dir, exist_ok=True)
+    train_path = os.path.join(output_dir, "train.parquet")
+    test_path = os.path.join(output_dir, "test.parquet")
+    counts = {"train": 0, "test": 0}
+    with ParquetChunkWriter(train_path) as train_writer, ParquetChunkWriter(test_path) as test_writer:
+        for chunk in iter_frame_chunks(source_path, chunk_size):
+            is_test = hash_split_mask(
+                chunk[key], test_size,
+                labels=chunk[stratify_on] if stratify_on is not None else None,
+                thresholds=thresholds,
+            )
+            if (~is_test).any():
+                train_writer.write(chunk[~is_test])
+            if is_test.any():
+                test_writer.write(chunk[is_test])
+            counts["train"] += int((~is_test).sum())
+            counts["test"] += int(is_test.sum())
+    return train_path, test_path, counts
@@ -0,0 +1,27 @@
+import hashlib
+import json
+import pickle
+from typing import Any
+
+import pandas as pd
+
+
+def hash_dataframe(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame covering its values, columns and dtypes."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(column) for column in df.columns]).encode())
+    digest.update(json.dumps([str(dtype) for dtype in df.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def hash_params(**params: Any) -> str:
+    """Hash of JSON-serializable parameters, independent of their order."""
+    return hashlib.sha256(
+        json.dumps(params, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def hash_object(obj: Any) -> str:
+    """Hash of the pickled representation of an object."""
+    return hashlib.sha256(pickle.dumps(obj)).hexdigest()
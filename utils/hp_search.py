@@ -0,0 +1,249 @@
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.base import ClassifierMixin
+# Successive halving is still flagged as experimental in sklearn
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingRandomSearchCV, RandomizedSearchCV
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+SEARCH_STRATEGIES = ("random", "halving", "hyperband")
+
+DEFAULT_SEARCH_STRATEGY = {
+    "name": "random",
+    "n_iter": 10,
+    "cv": 3,
+    "factor": 3,
+    "resource": "n_samples",
+    "scoring": "accuracy",
+    "n_jobs": -1,
+}
+
+
+def resolve_search_strategy(search_strategy: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merge configured search strategy with the defaults.
+
+    Args:
+        search_strategy: `search_strategy` block of a `model_search_space` entry.
+
+    Returns:
+        Complete search strategy configuration.
+    """
+    strategy = dict(DEFAULT_SEARCH_STRATEGY)
+    strategy.update(search_strategy or {})
+    if strategy["name"] not in SEARCH_STRATEGIES:
+        raise ValueError(
+            f"Unsupported search strategy: {strategy['name']}. "
+            f"Expected one of {SEARCH_STRATEGIES}"
+        )
+    return strategy
+
+
+def expand_search_grid(search_grid: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn `range` blocks of a configured search grid into `range` objects."""
+    expanded = {}
+    for search_key, values in search_grid.items():
+        if isinstance(values, dict) and "range" in values:
+            values = range(
+                values["range"]["start"],
+                values["range"]["end"],
+                values["range"].get("step", 1),
+            )
+        expanded[search_key] = values
+    return expanded
+
+
+def resource_bounds(
+        strategy: Dict[str, Any],
+        search_grid: Dict[str, Any],
+        y: Any,
+) -> Dict[str, Any]:
+    """Pop the resource from the search grid and derive its min/max budget.
+
+    When the resource is an estimator parameter (e.g. `n_estimators`) it can't be
+    searched over at the same time, so its grid values only define the budget.
+    """
+    resource = strategy["resource"]
+    min_resources = strategy.get("min_resources")
+    max_resources = strategy.get("max_resources")
+
+    if resource in search_grid:
+        values = list(search_grid.pop(resource))
+        min_resources = min_resources or min(values)
+        max_resources = max_resources or max(values)
+    if resource == "n_samples":
+        max_resources = max_resources or len(y)
+        # same heuristic sklearn uses for `min_resources="smallest"`
+        min_resources = min_resources or 2 * strategy["cv"] * len(np.unique(y))
+    if min_resources is None or max_resources is None:
+        raise ValueError(
+            f"Search resource `{resource}` needs `min_resources` and `max_resources` "
+            "either in the search strategy or as values in the search grid"
+        )
+    return {"min_resources": int(min_resources), "max_resources": int(max_resources)}
+
+
+def hyperband_brackets(
+        min_resources: int,
+        max_resources: int,
+        factor: int,
+        max_brackets: Optional[int] = None,
+) -> List[Dict[str, int]]:
+    """Number of candidates and starting resource of every hyperband bracket.
+
+    Each bracket trades number of candidates against the starting resource,
+    from many candidates on `min_resources` to few on `max_resources`.
+    """
+    s_max = int(math.log(max_resources / min_resources, factor))
+    brackets = []
+    for s in range(s_max, -1, -1):
+        brackets.append({
+            "n_candidates": int(math.ceil((s_max + 1) / (s + 1) * factor ** s)),
+            "min_resources": max(min_resources, int(max_resources * factor ** -s)),
+        })
+    return brackets[: max_brackets] if max_brackets else brackets
+
+
+def halving_schedule(
+        n_candidates: Any,
+        min_resources: int,
+        max_resources: int,
+        factor: int,
+) -> List[Dict[str, int]]:
+    """Candidates kept and resource per round of successive halving.
+
+    Follows `HalvingRandomSearchCV` without aggressive elimination:
+    `"exhaust"` samples as many candidates as `max_resources // min_resources`,
+    and rounds stop at `max_resources` even with more than one candidate left.
+    """
+    if n_candidates == "exhaust":
+        n_candidates = max(max_resources // min_resources, 1)
+    n_possible = 1 + int(math.floor(math.log(max(max_resources // min_resources, 1), factor)))
+    n_required = 1 + int(math.floor(math.log(max(n_candidates, 1), factor)))
+    return [
+        {
+            "n_candidates": int(math.ceil(n_candidates / factor ** i)),
+            "n_resources": min(int(min_resources * factor ** i), max_resources),
+        }
+        for i in range(min(n_possible, n_required))
+    ]
+
+
+class HyperbandSearchCV:
+    """Hyperband-style search built from successive halving brackets.
+
+    Each bracket trades number of candidates against the starting resource,
+    so that both many cheap and few expensive candidates get explored.
+    The best estimator across all brackets is kept.
+    """
+
+    def __init__(
+            self,
+            estimator: ClassifierMixin,
+            param_distributions: Dict[str, Any],
+            resource: str,
+            min_resources: int,
+            max_resources: int,
+            factor: int = 3,
+            max_brackets: Optional[int] = None,
+            **halving_kwargs,
+    ):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.resource = resource
+        self.min_resources = min_resources
+        self.max_resources = max_resources
+        self.factor = factor
+        self.max_brackets = max_brackets
+        self.halving_kwargs = halving_kwargs
+
+    def fit(self, X, y):
+        self.brackets_ = []
+        self.best_score_ = None
+        brackets = hyperband_brackets(self.min_resources, self.max_resources, self.factor, self.max_brackets)
+        for bracket in brackets:
+            search = HalvingRandomSearchCV(
+                estimator=self.estimator,
+                param_distributions=self.param_distributions,
+                resource=self.resource,
+                max_resources=self.max_resources,
+                factor=self.factor,
+                **bracket,
+                **self.halving_kwargs,
+            )
+            search.fit(X, y)
+            logger.info(
+                f"Hyperband bracket {bracket}: best score {search.best_score_:.4f}"
+            )
+            self.brackets_.append({**bracket, "best_score": float(search.best_score_)})
+            if self.best_score_ is None or search.best_score_ > self.best_score_:
+                self.best_score_ = search.best_score_
+                self.best_params_ = search.best_params_
+                self.best_estimator_ = search.best_estimator_
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+
+def build_search(
+        estimator: ClassifierMixin,
+        search_grid: Dict[str, Any],
+        y: Any,
+        search_strategy: Optional[Dict[str, Any]] = None,
+        random_state: int = 42,
+):
+    """Build an unfitted search object for the configured strategy.
+
+    Args:
+        estimator: Estimator instance to tune.
+        search_grid: Parameter distributions to sample from.
+        y: Training target, used to derive `n_samples` budgets.
+        search_strategy: `search_strategy` block of a `model_search_space` entry.
+        random_state: Seed for candidate sampling.
+
+    Returns:
+        Search object exposing `fit`, `predict`, `best_estimator_` and `best_score_`.
+    """
+    strategy = resolve_search_strategy(search_strategy)
+    search_grid = dict(search_grid)
+    common = {
+        "cv": strategy["cv"],
+        "scoring": strategy["scoring"],
+        "n_jobs": strategy["n_jobs"],
+        "random_state": random_state,
+        "refit": True,
+    }
+
+    if strategy["name"] == "random":
+        return RandomizedSearchCV(
+            estimator=estimator,
+            param_distributions=search_grid,
+            n_iter=strategy["n_iter"],
+            **common,
+        )
+
+    bounds = resource_bounds(strategy, search_grid, y)
+    if strategy["name"] == "halving":
+        return HalvingRandomSearchCV(
+            estimator=estimator,
+            param_distributions=search_grid,
+            n_candidates=strategy.get("n_candidates", "exhaust"),
+            resource=strategy["resource"],
+            factor=strategy["factor"],
+            **bounds,
+            **common,
+        )
+    return HyperbandSearchCV(
+        estimator=estimator,
+        param_distributions=search_grid,
+        resource=strategy["resource"],
+        factor=strategy["factor"],
+        max_brackets=strategy.get("max_brackets"),
+        **bounds,
+        **common,
+    )
@@ -0,0 +1,85 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import ClassifierMixin
+
+from utils.get_model_from_config import estimator_spec
+
+# estimator parameter counting fitted stages/trees, grown on warm start
+GROWTH_PARAMS = ("n_estimators", "max_iter")
+
+
+def supports_partial_fit(model: ClassifierMixin) -> bool:
+    return estimator_spec(type(model)).partial_fit
+
+
+def supports_warm_start(model: ClassifierMixin) -> bool:
+    params = model.get_params()
+    return estimator_spec(type(model)).warm_start and any(param in params for param in GROWTH_PARAMS)
+
+
+def supports_incremental(model: ClassifierMixin) -> bool:
+    """Whether a fitted model can continue training on new rows only."""
+    return supports_partial_fit(model) or supports_warm_start(model)
+
+
+def schema_matches(model: ClassifierMixin, columns: List[str]) -> bool:
+    """Whether a fitted model was trained on exactly these feature columns."""
+    feature_names = getattr(model, "feature_names_in_", None)
+    return feature_names is not None and list(feature_names) == list(columns)
+
+
+def select_new_rows(current: pd.DataFrame, previous: pd.DataFrame) -> pd.DataFrame:
+    """Select rows of `current` not present in `previous` by row content hash.
+
+    Args:
+        current: Dataset the model should be trained on now.
+        previous: Dataset the previous model version was trained on.
+
+    Returns:
+        Rows of `current` that the previous model version has not seen.
+    """
+    current_hashes = pd.util.hash_pandas_object(current, index=False)
+    previous_hashes = pd.util.hash_pandas_object(
+        previous[current.columns], index=False
+    )
+    return current[~current_hashes.isin(previous_hashes).to_numpy()]
+
+
+def incremental_fit(
+        model: ClassifierMixin,
+        x_new: pd.DataFrame,
+        y_new: pd.Series,
+        extra_estimators: int = 50,
+) -> Optional[ClassifierMixin]:
+    """Continue training a fitted model on new rows.
+
+    `partial_fit` estimators are updated in place, `warm_start` estimators get
+    `extra_estimators` new trees/stages fitted on the new rows.
+
+    Args:
+        model: Previously fitted model.
+        x_new: Features of new rows.
+        y_new: Target of new rows.
+        extra_estimators: Number of trees/stages to add for `warm_start` estimators.
+
+    Returns:
+        Updated model or `None` if the model can't be updated incrementally.
+    """
+    classes = getattr(model, "classes_", None)
+    if supports_partial_fit(model):
+        return model.partial_fit(x_new, y_new, classes=classes)
+    if not supports_warm_start(model):
+        return None
+    # new trees are fitted on new rows only, they must see the same label set
+    if classes is None or not np.array_equal(np.unique(y_new), np.sort(classes)):
+        return None
+
+    params = model.get_params()
+    growth_param = next(param for param in GROWTH_PARAMS if param in params)
+    model.set_params(
+        warm_start=True,
+        **{growth_param: params[growth_param] + extra_estimators},
+    )
+    return model.fit(x_new, y_new)
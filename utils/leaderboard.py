@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import pandas as pd
+
+# set to move the leaderboard database, e.g. to a shared volume
+LEADERBOARD_PATH_ENV = "E2E_LEADERBOARD_PATH"
+DEFAULT_LEADERBOARD_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "e2e_use_case", "leaderboard.sqlite"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hp_results (
+    run_id TEXT NOT NULL,
+    step_name TEXT NOT NULL,
+    config_name TEXT NOT NULL,
+    model_class TEXT NOT NULL,
+    params TEXT NOT NULL,
+    cv_score REAL,
+    holdout_score REAL NOT NULL,
+    fit_time_s REAL,
+    artifact_uri TEXT,
+    artifact_id TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hp_results_run ON hp_results (run_id, holdout_score);
+"""
+
+
+class Leaderboard:
+    """SQLite index of hyperparameter search results.
+
+    Search steps record one row per tuned model with its scores and where its
+    `hp_result` artifact lives, so the best model of a run can be found without
+    loading any estimator. The database is a local file, steps of a run have to
+    share a filesystem (e.g. the local orchestrator) to see each other's rows.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get(LEADERBOARD_PATH_ENV, DEFAULT_LEADERBOARD_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            # parallel search steps write concurrently
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.row_factory = sqlite3.Row
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def record(
+            self,
+            run_id: str,
+            step_name: str,
+            config_name: str,
+            model_class: str,
+            params: Dict[str, Any],
+            holdout_score: float,
+            cv_score: Optional[float] = None,
+            fit_time_s: Optional[float] = None,
+            artifact_uri: Optional[str] = None,
+            artifact_id: Optional[str] = None,
+    ) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO hp_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id, step_name, config_name, model_class,
+                    json.dumps(params, sort_keys=True, default=str),
+                    cv_score, holdout_score, fit_time_s,
+                    artifact_uri, artifact_id, time.time(),
+                ),
+            )
+
+    def best(self, run_id: str, step_names: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Row with the highest holdout score of a run, optionally limited to some steps."""
+        query = "SELECT * FROM hp_results WHERE run_id = ?"
+        args: List[Any] = [run_id]
+        if step_names:
+            query += f" AND step_name IN ({', '.join('?' * len(step_names))})"
+            args.extend(step_names)
+        query += " ORDER BY holdout_score DESC, cv_score DESC LIMIT 1"
+        with self._connect() as connection:
+            row = connection.execute(query, args).fetchone()
+        return dict(row) if row is not None else None
+
+    def recorded_steps(self, run_id: str, step_names: List[str]) -> Set[str]:
+        """Those of `step_names` that recorded at least one result for a run."""
+        if not step_names:
+            return set()
+        query = (
+            f"SELECT DISTINCT step_name FROM hp_results "
+            f"WHERE run_id = ? AND step_name IN ({', '.join('?' * len(step_names))})"
+        )
+        with self._connect() as connection:
+            rows = connection.execute(query, [run_id, *step_names]).fetchall()
+        return {row[0] for row in rows}
+
+    def top(self, n: int = 20, run_id: Optional[str] = None) -> pd.DataFrame:
+        """Best `n` results over all runs or a single run."""
+        query = "SELECT * FROM hp_results"
+        args: List[Any] = []
+        if run_id is not None:
+            query += " WHERE run_id = ?"
+            args.append(run_id)
+        query += " ORDER BY holdout_score DESC, cv_score DESC LIMIT ?"
+        args.append(n)
+        with self._connect() as connection:
+            return pd.read_sql_query(query, connection, params=args)
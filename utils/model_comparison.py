@@ -0,0 +1,146 @@
+import math
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import ClassifierMixin
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# evaluation data shipped once per worker process, models loaded on first use
+_worker_state: Dict[str, Any] = {}
+
+
+def mcnemar_p_value(correct_a: np.ndarray, correct_b: np.ndarray) -> float:
+    """Two-sided p-value of McNemar's test with continuity correction.
+
+    Args:
+        correct_a: Per-row correctness of model A.
+        correct_b: Per-row correctness of model B on the same rows.
+
+    Returns:
+        Probability of seeing this disagreement if both models are equally accurate.
+    """
+    only_a = int(np.sum(correct_a & ~correct_b))
+    only_b = int(np.sum(~correct_a & correct_b))
+    if only_a + only_b == 0:
+        return 1.0
+    chi2 = (abs(only_a - only_b) - 1) ** 2 / (only_a + only_b)
+    # survival function of chi-square with one degree of freedom
+    return math.erfc(math.sqrt(chi2 / 2))
+
+
+def _init_worker(X: pd.DataFrame, y: np.ndarray) -> None:
+    _worker_state["models"] = {}
+    _worker_state["X"] = X
+    _worker_state["y"] = y
+
+
+def _score_block(version: str, model_path: str, rows: np.ndarray) -> Tuple[str, np.ndarray, float]:
+    models = _worker_state["models"]
+    if version not in models:
+        with open(model_path, "rb") as f:
+            models[version] = pickle.load(f)
+    start = time.perf_counter()
+    predictions = models[version].predict(_worker_state["X"].iloc[rows])
+    return version, predictions == _worker_state["y"][rows], time.perf_counter() - start
+
+
+def compare_models(
+        models: Dict[str, ClassifierMixin],
+        X: pd.DataFrame,
+        y: pd.Series,
+        n_workers: Optional[int] = None,
+        n_blocks: int = 5,
+        alpha: float = 0.05,
+        random_state: int = 42,
+) -> Dict[str, Any]:
+    """Compare accuracy of several models in parallel, stopping once one is significantly best.
+
+    Rows are shuffled and scored block by block, every model predicting each
+    block in a separate worker process. Each model is pickled once to a
+    temporary file and only loaded by the workers that score it. After each block the leading model is
+    tested against every other one with McNemar's test. The significance level
+    is split over all looks and comparisons (Bonferroni), so stopping early
+    does not inflate the false positive rate.
+
+    Args:
+        models: Models to compare, keyed by version.
+        X: Evaluation features.
+        y: Evaluation target.
+        n_workers: Number of worker processes, one per model by default.
+        n_blocks: Number of blocks the rows are scored in.
+        alpha: Overall significance level.
+        random_state: Seed for shuffling rows.
+
+    Returns:
+        Comparison with accuracy, cumulative predict time and p-value against the
+        leader per model, rows evaluated and the significantly best version, if any.
+    """
+    versions = list(models)
+    y = np.asarray(y)
+    blocks = np.array_split(np.random.RandomState(random_state).permutation(len(y)), n_blocks)
+    alpha_per_test = alpha / (n_blocks * max(len(versions) - 1, 1))
+
+    correct = {version: [] for version in versions}
+    timings = {version: 0.0 for version in versions}
+    winner, p_values, rows_evaluated = None, {}, 0
+
+    with tempfile.TemporaryDirectory(prefix="compare_models_") as model_dir, ProcessPoolExecutor(
+            max_workers=n_workers or min(len(versions), os.cpu_count() or 1),
+            initializer=_init_worker,
+            initargs=(X, y),
+    ) as executor:
+        model_paths = {}
+        for i, version in enumerate(versions):
+            model_paths[version] = os.path.join(model_dir, f"model_{i}.pkl")
+            with open(model_paths[version], "wb") as f:
+                pickle.dump(models[version], f, protocol=pickle.HIGHEST_PROTOCOL)
+        for block in blocks:
+            futures = [
+                executor.submit(_score_block, version, model_paths[version], block)
+                for version in versions
+            ]
+            for future in futures:
+                version, block_correct, elapsed = future.result()
+                correct[version].append(block_correct)
+                timings[version] += elapsed
+            rows_evaluated += len(block)
+
+            stacked = {version: np.concatenate(correct[version]) for version in versions}
+            leader = max(versions, key=lambda version: stacked[version].mean())
+            p_values = {
+                version: mcnemar_p_value(stacked[leader], stacked[version])
+                for version in versions if version != leader
+            }
+            if p_values and all(p < alpha_per_test for p in p_values.values()):
+                winner = leader
+                break
+
+    stopped_early = rows_evaluated < len(y)
+    metrics = {version: float(np.concatenate(correct[version]).mean()) for version in versions}
+    for version in versions:
+        logger.info(
+            f"Model version {version}: accuracy={metrics[version]:.6f} "
+            f"predict time={timings[version]:.3f}s"
+        )
+    if winner is not None:
+        logger.info(
+            f"Model version {winner} is significantly better after "
+            f"{rows_evaluated} of {len(y)} rows"
+        )
+    return {
+        "metrics": metrics,
+        "timings": timings,
+        "p_values": p_values,
+        "rows_evaluated": rows_evaluated,
+        "stopped_early": stopped_early,
+        "winner": winner,
+    }
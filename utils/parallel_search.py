@@ -0,0 +1,306 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.base import ClassifierMixin, clone
+from sklearn.metrics import accuracy_score, get_scorer
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+from utils.fast_training import FitTimeCap, QuantileBinner, capped_search_space, uncapped_params
+from utils.get_model_from_config import estimator_spec, get_model_from_config
+from utils.hp_search import (
+    expand_search_grid,
+    halving_schedule,
+    hyperband_brackets,
+    resolve_search_strategy,
+    resource_bounds,
+)
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# datasets, shipped once per worker process
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(x_trn: Any, y_trn: Any, x_tst: Any, y_tst: Any) -> None:
+    _worker_state.update(x_trn=x_trn, y_trn=np.asarray(y_trn), x_tst=x_tst, y_tst=np.asarray(y_tst))
+
+
+def _rows(X: Any, rows: np.ndarray) -> Any:
+    return X.iloc[rows] if hasattr(X, "iloc") else X[rows]
+
+
+def _single_threaded(estimator: ClassifierMixin) -> ClassifierMixin:
+    # the pool owns the CPU budget, estimators must not spawn their own workers
+    if estimator_spec(type(estimator)).n_jobs:
+        estimator.set_params(n_jobs=1)
+    return estimator
+
+
+def _features(binning: Optional[Tuple[str, QuantileBinner]]) -> Tuple[Any, Any]:
+    """Train and test features, binned once per worker for `prebin` configurations."""
+    if binning is None:
+        return _worker_state["x_trn"], _worker_state["x_tst"]
+    name, binner = binning
+    binned = _worker_state.setdefault("binned", {})
+    if name not in binned:
+        binned[name] = binner.transform(_worker_state["x_trn"]), binner.transform(_worker_state["x_tst"])
+    return binned[name]
+
+
+def _fit_fold(
+        estimator: ClassifierMixin,
+        params: Dict[str, Any],
+        train_rows: np.ndarray,
+        val_rows: np.ndarray,
+        scoring: str,
+        binning: Optional[Tuple[str, QuantileBinner]],
+) -> float:
+    X, y = _features(binning)[0], _worker_state["y_trn"]
+    model = _single_threaded(clone(estimator).set_params(**params))
+    model.fit(_rows(X, train_rows), y[train_rows])
+    return float(get_scorer(scoring)(model, _rows(X, val_rows), y[val_rows]))
+
+
+def _refit_and_score(
+        estimator: ClassifierMixin,
+        params: Dict[str, Any],
+        binning: Optional[Tuple[str, QuantileBinner]],
+) -> Tuple[ClassifierMixin, float, float]:
+    x_trn, x_tst = _features(binning)
+    model = _single_threaded(clone(estimator).set_params(**params))
+    start = time.perf_counter()
+    model.fit(x_trn, _worker_state["y_trn"])
+    fit_time = time.perf_counter() - start
+    score = accuracy_score(_worker_state["y_tst"], model.predict(x_tst))
+    return model, float(score), fit_time
+
+
+class _Bracket:
+    """Successive halving rounds over one set of sampled candidates.
+
+    Every round is one task per remaining candidate and CV fold; once all
+    its fits are scored, the best `1 / factor` of the candidates go on to the
+    next round with `factor` times the resource. Random search is a bracket of
+    a single round on the full resource.
+    """
+
+    def __init__(self, candidates: List[Dict[str, Any]], schedule: List[Dict[str, int]]):
+        self.candidates = candidates
+        self.schedule = schedule
+        self.round = 0
+        self.best: Optional[Tuple[Dict[str, Any], float]] = None
+
+    @property
+    def n_resources(self) -> Optional[int]:
+        return self.schedule[self.round]["n_resources"]
+
+    def finish_round(self, scores: Dict[int, List[float]]) -> bool:
+        """Keep the best candidates of the round, `True` once the bracket is done."""
+        ranked = sorted(scores, key=lambda i: np.mean(scores[i]), reverse=True)
+        self.round += 1
+        if self.round == len(self.schedule):
+            self.best = self.candidates[ranked[0]], float(np.mean(scores[ranked[0]]))
+            return True
+        self.candidates = [self.candidates[i] for i in ranked[: self.schedule[self.round]["n_candidates"]]]
+        return False
+
+
+class _ConfigSearch:
+    """Task queue and results of one `model_search_space` entry.
+
+    Random search is one round of a task per candidate and CV fold. Halving
+    is such rounds over a shrinking set of candidates, and hyperband runs all
+    its halving brackets side by side, so every round of every bracket is
+    spread over the pool. A refit task on the full train set follows once the
+    best parameters are known. `prebin` and `max_fit_time_s` work as in
+    `hp_tuning_single_search`.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            configuration: Dict[str, Any],
+            x_trn: Any,
+            y_trn: np.ndarray,
+            random_state: int,
+    ):
+        self.name = name
+        self.estimator = get_model_from_config(
+            configuration["model_package"], configuration["model_class"]
+        )()
+        self.strategy = resolve_search_strategy(configuration.get("search_strategy"))
+        search_grid = expand_search_grid(configuration["search_grid"])
+        self.binner = QuantileBinner().fit(x_trn) if configuration.get("prebin") else None
+        self.binning = (name, self.binner) if self.binner is not None else None
+        self.capped = configuration.get("max_fit_time_s") is not None
+        if self.capped:
+            self.estimator = FitTimeCap(self.estimator, max_fit_time_s=configuration["max_fit_time_s"])
+            search_grid, self.strategy = capped_search_space(search_grid, self.strategy)
+        self.n_samples = len(y_trn)
+        self.rng = np.random.RandomState(random_state)
+        self.folds = list(StratifiedKFold(
+            n_splits=self.strategy["cv"], shuffle=True, random_state=random_state
+        ).split(np.zeros(len(y_trn)), y_trn))
+        self.pending: Deque[Tuple[Callable, tuple, Any]] = deque()
+        self.running = 0
+        self.result: Optional[Dict[str, Any]] = None
+
+        if self.strategy["name"] == "random":
+            brackets = [{"n_candidates": self.strategy["n_iter"], "schedule": [{"n_resources": None}]}]
+        else:
+            bounds = resource_bounds(self.strategy, search_grid, y_trn)
+            if self.strategy["name"] == "halving":
+                brackets = [{
+                    "n_candidates": self.strategy.get("n_candidates", "exhaust"),
+                    "min_resources": bounds["min_resources"],
+                }]
+            else:
+                brackets = hyperband_brackets(
+                    bounds["min_resources"], bounds["max_resources"],
+                    self.strategy["factor"], self.strategy.get("max_brackets"),
+                )
+            for bracket in brackets:
+                bracket["schedule"] = halving_schedule(
+                    bracket["n_candidates"], bracket["min_resources"],
+                    bounds["max_resources"], self.strategy["factor"],
+                )
+                bracket["n_candidates"] = bracket["schedule"][0]["n_candidates"]
+        self.brackets = []
+        for bracket in brackets:
+            candidates = list(ParameterSampler(
+                search_grid, n_iter=bracket["n_candidates"], random_state=self.rng
+            ))
+            self.brackets.append(_Bracket(candidates, bracket["schedule"]))
+        self.fold_scores: Dict[int, Dict[int, List[float]]] = {}
+        self.remaining: Dict[int, int] = {}
+        for b in range(len(self.brackets)):
+            self._schedule_round(b)
+
+    def _schedule_round(self, b: int) -> None:
+        bracket = self.brackets[b]
+        n_resources = bracket.n_resources
+        self.fold_scores[b] = {i: [] for i in range(len(bracket.candidates))}
+        self.remaining[b] = len(bracket.candidates) * len(self.folds)
+        for i, params in enumerate(bracket.candidates):
+            if n_resources is not None and self.strategy["resource"] != "n_samples":
+                params = {**params, self.strategy["resource"]: n_resources}
+            for train_rows, val_rows in self.folds:
+                if n_resources is not None and self.strategy["resource"] == "n_samples":
+                    # same per-fold subsampling as `HalvingRandomSearchCV`
+                    n_rows = int(len(train_rows) * n_resources / self.n_samples)
+                    train_rows = np.sort(self.rng.choice(train_rows, n_rows, replace=False))
+                self.pending.append((
+                    _fit_fold,
+                    (self.estimator, params, train_rows, val_rows, self.strategy["scoring"], self.binning),
+                    (b, i),
+                ))
+
+    def _refit(self) -> None:
+        best = max(self.brackets, key=lambda bracket: bracket.best[1])
+        params, self.cv_score = best.best
+        n_resources = best.schedule[-1]["n_resources"]
+        if n_resources is not None and self.strategy["resource"] != "n_samples":
+            # final resource of the bracket, like `best_params_` of the sklearn searches
+            params = {**params, self.strategy["resource"]: n_resources}
+        self.best_params = params
+        self.pending.append((_refit_and_score, (self.estimator, params, self.binning), None))
+
+    def on_result(self, task: Callable, tag: Any, result: Any) -> None:
+        if task is _fit_fold:
+            b, i = tag
+            self.fold_scores[b][i].append(result)
+            self.remaining[b] -= 1
+            if self.remaining[b] > 0:
+                return
+            if not self.brackets[b].finish_round(self.fold_scores[b]):
+                self._schedule_round(b)
+            elif all(bracket.best is not None for bracket in self.brackets):
+                self._refit()
+        else:
+            model, score, fit_time = result
+            if self.capped:
+                model = model.estimator_
+            if self.binner is not None:
+                model = Pipeline([("binner", self.binner), ("model", model)])
+            self.result = {
+                "model": model,
+                "metric": score,
+                "params": uncapped_params(self.best_params),
+                "cv_score": self.cv_score,
+                "fit_time_s": fit_time,
+            }
+
+
+def run_parallel_search(
+        model_search_space: Dict[str, Dict[str, Any]],
+        x_trn: Any,
+        y_trn: Any,
+        x_tst: Any,
+        y_tst: Any,
+        cpu_budget: Optional[int] = None,
+        random_state: int = 42,
+) -> Dict[str, Dict[str, Any]]:
+    """Search all model configurations together over one shared process pool.
+
+    Work of every configuration is split into tasks (candidate x CV fold of
+    every random search, halving round and hyperband bracket round, final refits).
+    At most `cpu_budget` tasks run at a time, each single-threaded, and free
+    slots go round-robin to the configuration with the fewest running tasks,
+    so cheap configurations don't wait behind expensive ones.
+
+    Args:
+        model_search_space: Model configurations keyed by name, as in the train config.
+        x_trn: Train features.
+        y_trn: Train target.
+        x_tst: Test features.
+        y_tst: Test target.
+        cpu_budget: Number of worker processes, all CPUs by default.
+        random_state: Seed for candidate sampling and CV folds.
+
+    Returns:
+        Best fitted model, its test accuracy, CV score, refit time and parameters
+        per configuration.
+    """
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    searches = [
+        _ConfigSearch(name, configuration, x_trn, np.asarray(y_trn), random_state)
+        for name, configuration in model_search_space.items()
+    ]
+    in_flight = {}
+    with ProcessPoolExecutor(
+            max_workers=cpu_budget,
+            initializer=_init_worker,
+            initargs=(x_trn, y_trn, x_tst, y_tst),
+    ) as executor:
+        while True:
+            while len(in_flight) < cpu_budget:
+                ready = [search for search in searches if search.pending]
+                if not ready:
+                    break
+                search = min(ready, key=lambda s: s.running)
+                # move it to the back, so ties go to the next configuration
+                searches.remove(search)
+                searches.append(search)
+                task, args, tag = search.pending.popleft()
+                search.running += 1
+                in_flight[executor.submit(task, *args)] = (search, task, tag)
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                search, task, tag = in_flight.pop(future)
+                search.running -= 1
+                search.on_result(task, tag, future.result())
+
+    results = {search.name: search.result for search in searches}
+    results = {name: results[name] for name in model_search_space}
+    for name, result in results.items():
+        logger.info(f"Search `{name}`: test accuracy {result['metric']:.4f} with {result['params']}")
+    return results
@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# set to move the prediction cache database, e.g. to a shared volume
+PREDICTION_CACHE_PATH_ENV = "E2E_PREDICTION_CACHE_PATH"
+DEFAULT_PREDICTION_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "e2e_use_case", "predictions.sqlite"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    namespace TEXT NOT NULL,
+    row_hash INTEGER NOT NULL,
+    prediction NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, row_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used);
+CREATE INDEX IF NOT EXISTS predictions_created_at ON predictions (created_at);
+-- entry count kept up to date by triggers, so eviction doesn't scan the table
+CREATE TABLE IF NOT EXISTS entry_count (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    n_entries INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO entry_count
+SELECT 0, COUNT(*) FROM predictions WHERE NOT EXISTS (SELECT 1 FROM entry_count);
+CREATE TRIGGER IF NOT EXISTS predictions_insert AFTER INSERT ON predictions
+BEGIN UPDATE entry_count SET n_entries = n_entries + 1; END;
+CREATE TRIGGER IF NOT EXISTS predictions_delete AFTER DELETE ON predictions
+BEGIN UPDATE entry_count SET n_entries = n_entries - 1; END;
+"""
+
+
+def hash_rows(features: pd.DataFrame) -> np.ndarray:
+    """Stable 64-bit hash of every feature row, as signed integers for SQLite."""
+    return pd.util.hash_pandas_object(features, index=False).to_numpy().view(np.int64)
+
+
+class PredictionCache:
+    """On-disk cache of per-row predictions with TTL and LRU eviction.
+
+    Entries are keyed by a namespace, e.g. model version and preprocessing
+    pipeline hash, and the hash of the feature row. Lookups and inserts work on
+    whole batches through a temporary table join instead of per-row queries.
+    """
+
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            ttl_seconds: float = 7 * 24 * 3600,
+            max_entries: int = 10_000_000,
+    ):
+        self.path = path or os.environ.get(PREDICTION_CACHE_PATH_ENV, DEFAULT_PREDICTION_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            # rows replaced by `INSERT OR REPLACE` only fire the delete trigger with this
+            connection.execute("PRAGMA recursive_triggers=ON")
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def lookup(self, namespace: str, row_hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cached predictions of a batch of rows.
+
+        Returns:
+            Boolean hit mask and an object array with predictions of hit rows.
+        """
+        now = time.time()
+        unique_hashes = np.unique(row_hashes)
+        with self._connect() as connection:
+            connection.execute("CREATE TEMP TABLE batch (row_hash INTEGER PRIMARY KEY)")
+            connection.executemany(
+                "INSERT INTO batch VALUES (?)", ((h,) for h in unique_hashes.tolist())
+            )
+            rows = connection.execute(
+                "SELECT p.row_hash, p.prediction FROM predictions p "
+                "JOIN batch b ON p.row_hash = b.row_hash "
+                "WHERE p.namespace = ? AND p.created_at >= ?",
+                (namespace, now - self.ttl_seconds),
+            ).fetchall()
+            connection.execute(
+                "UPDATE predictions SET last_used = ? WHERE namespace = ? "
+                "AND row_hash IN (SELECT row_hash FROM batch)",
+                (now, namespace),
+            )
+            connection.execute("DROP TABLE batch")
+
+        predictions = np.empty(len(row_hashes), dtype=object)
+        if not rows:
+            return np.zeros(len(row_hashes), dtype=bool), predictions
+        cached = pd.Series(
+            [prediction for _, prediction in rows],
+            index=np.array([row_hash for row_hash, _ in rows], dtype=np.int64),
+        )
+        positions = cached.index.get_indexer(row_hashes)
+        hits = positions >= 0
+        predictions[hits] = cached.to_numpy()[positions[hits]]
+        return hits, predictions
+
+    def store(self, namespace: str, row_hashes: np.ndarray, predictions: np.ndarray) -> None:
+        """Insert or refresh predictions of a batch of rows and evict stale entries."""
+        now = time.time()
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                (
+                    (namespace, int(row_hash), prediction, now, now)
+                    for row_hash, prediction in zip(row_hashes, np.asarray(predictions).tolist())
+                ),
+            )
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then least recently used ones above `max_entries`."""
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM predictions WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            (n_entries,) = connection.execute("SELECT n_entries FROM entry_count").fetchone()
+            if n_entries > self.max_entries:
+                connection.execute(
+                    "DELETE FROM predictions WHERE (namespace, row_hash) IN ("
+                    "SELECT namespace, row_hash FROM predictions ORDER BY last_used LIMIT ?)",
+                    (n_entries - self.max_entries,),
+                )
@@ -0,0 +1,302 @@
+import asyncio
+import json
+import numbers
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import ClassifierMixin
+from sklearn.pipeline import Pipeline
+
+from utils.preprocess import transform_inference_frame
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class LatencyTracker:
+    """Rolling window of request latencies for p50/p99 and QPS reporting."""
+
+    def __init__(self, window_size: int = 10_000):
+        self._samples = deque(maxlen=window_size)
+        self.total_requests = 0
+
+    def record(self, latency_seconds: float) -> None:
+        self._samples.append((time.monotonic(), latency_seconds))
+        self.total_requests += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        if not self._samples:
+            return {"p50_ms": 0.0, "p99_ms": 0.0, "qps": 0.0, "total_requests": 0}
+        timestamps, latencies = zip(*self._samples)
+        latencies_ms = np.asarray(latencies) * 1000
+        span = timestamps[-1] - timestamps[0]
+        return {
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p99_ms": float(np.percentile(latencies_ms, 99)),
+            "qps": float(len(timestamps) / span) if span > 0 else 0.0,
+            "total_requests": self.total_requests,
+        }
+
+
+class MicroBatcher:
+    """Group concurrent prediction requests into batches for a single model call.
+
+    A batch is dispatched once it holds `max_batch_size` rows or the oldest
+    request waited `max_wait_ms`, whichever comes first. The model runs in a
+    worker thread, so the event loop keeps accepting requests meanwhile.
+
+    Rows are checked against `feature_names` when a request comes in, so a
+    malformed request is rejected on its own instead of failing the batch it
+    would have joined. `feature_names` default to the input columns the
+    preprocess pipeline was fitted on or, if it doesn't record them (e.g. a
+    pipeline starting with `"passthrough"`), the columns the model was fitted on.
+    """
+
+    def __init__(
+            self,
+            model: ClassifierMixin,
+            preprocess_pipeline: Optional[Pipeline] = None,
+            target: str = "target",
+            max_batch_size: int = 64,
+            max_wait_ms: float = 5.0,
+            feature_names: Optional[Sequence[str]] = None,
+    ):
+        self.model = model
+        self.preprocess_pipeline = preprocess_pipeline
+        self.target = target
+        if feature_names is None:
+            for fitted_on in (preprocess_pipeline, model):
+                feature_names = getattr(fitted_on, "feature_names_in_", None)
+                if feature_names is not None:
+                    break
+        self.feature_names = (
+            [name for name in feature_names if name != target] if feature_names is not None else None
+        )
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batch_sizes = deque(maxlen=1000)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+
+    async def predict(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        self.validate(rows)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    def validate(self, rows: List[Dict[str, Any]]) -> None:
+        """Raise `ValueError` if `rows` can't be scored by the model."""
+        if not isinstance(rows, list) or not rows:
+            raise ValueError("`instances` must be a non-empty list of feature mappings")
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise ValueError(f"Instance {i} is not a mapping of feature names to values")
+            if self.feature_names is None:
+                continue
+            missing = [name for name in self.feature_names if name not in row]
+            if missing:
+                raise ValueError(f"Instance {i} is missing features {missing}")
+            invalid = [
+                name for name in self.feature_names
+                if row[name] is not None and not isinstance(row[name], numbers.Number)
+            ]
+            if invalid:
+                raise ValueError(f"Instance {i} has non-numeric values for features {invalid}")
+
+    def _predict_batch(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        features = pd.DataFrame.from_records(rows)
+        if self.feature_names is not None:
+            # same column order as in training, whatever the key order of each request
+            features = features.reindex(columns=self.feature_names)
+        if self.preprocess_pipeline is not None:
+            features = transform_inference_frame(
+                self.preprocess_pipeline, features, self.target
+            )
+        return self.model.predict(features)
+
+    async def _collect_batch(self) -> List[Tuple[List[Dict[str, Any]], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while n_rows < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            rows = [row for request_rows, _ in batch for row in request_rows]
+            self.batch_sizes.append(len(rows))
+            try:
+                predictions = await loop.run_in_executor(None, self._predict_batch, rows)
+            except Exception as e:
+                if len(batch) == 1:
+                    if not batch[0][1].done():
+                        batch[0][1].set_exception(e)
+                    continue
+                # score requests one by one so only the failing ones get the error
+                for request_rows, future in batch:
+                    try:
+                        result = await loop.run_in_executor(None, self._predict_batch, request_rows)
+                    except Exception as request_error:
+                        if not future.done():
+                            future.set_exception(request_error)
+                        continue
+                    if not future.done():
+                        future.set_result(result.tolist())
+                continue
+            offset = 0
+            for request_rows, future in batch:
+                # the client may have gone away while the batch was running
+                if not future.done():
+                    future.set_result(predictions[offset: offset + len(request_rows)].tolist())
+                offset += len(request_rows)
+
+
+class PredictionServer:
+    """Minimal asyncio HTTP server for low-latency online predictions.
+
+    Endpoints:
+        POST /predict  with `{"instances": [{"feature": value, ...}, ...]}`
+        GET  /metrics  with p50/p99 latency, QPS and mean batch size
+        GET  /health
+    """
+
+    def __init__(self, batcher: MicroBatcher, host: str = "127.0.0.1", port: int = 8000):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.latency = LatencyTracker()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Prediction server listening on http://{self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def metrics(self) -> Dict[str, float]:
+        metrics = self.latency.snapshot()
+        batch_sizes = self.batcher.batch_sizes
+        metrics["mean_batch_size"] = float(np.mean(batch_sizes)) if batch_sizes else 0.0
+        return metrics
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if method == "POST" and path == "/predict":
+            start = time.perf_counter()
+            instances = json.loads(body)["instances"]
+            predictions = await self.batcher.predict(instances)
+            self.latency.record(time.perf_counter() - start)
+            return 200, {"predictions": predictions}
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics()
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        return 404, {"error": f"{method} {path} not found"}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # HTTP/1.1 keep-alive: serve requests until the client closes
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, value = line.decode("latin-1").split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                try:
+                    status, payload = await self._route(method, path, body)
+                except (KeyError, ValueError) as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    logger.error(f"Prediction failed: {e}")
+                    status, payload = 500, {"error": str(e)}
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+def load_promoted_model(model_name: str, model_version: str) -> Tuple[ClassifierMixin, Pipeline]:
+    """Load model and preprocess pipeline of a model version from the model control plane."""
+    from zenml import Model
+
+    from utils.compact_forest import load_predictor
+
+    model_version = Model(name=model_name, version=model_version)
+    return load_predictor(model_version), model_version.load_artifact("preprocess_pipeline")
+
+
+def serve(
+        model_name: str,
+        model_version: str,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+) -> None:
+    """Load the model once and serve predictions until interrupted."""
+    model, preprocess_pipeline = load_promoted_model(model_name, model_version)
+    batcher = MicroBatcher(
+        model=model,
+        preprocess_pipeline=preprocess_pipeline,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+    )
+    try:
+        asyncio.run(PredictionServer(batcher, host=host, port=port).serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Prediction server stopped")
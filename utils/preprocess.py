@@ -1,6 +1,8 @@
-from typing import Union
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
 
 class NADropper():
     "Support class to drop NA values in sklearn Pipeline"
@@ -34,4 +36,107 @@ class DataFrameCaster:
         return self
 
     def transform(self, X):
-        return pd.DataFrame(X, columns=self.columns)
\ No newline at end of file
+        return pd.DataFrame(X, columns=self.columns)
+
+class FusedPreprocessor(BaseEstimator, TransformerMixin):
+    """Single-pass replacement for the NADropper/ColumnDropper/MinMaxScaler/DataFrameCaster chain.
+
+    Kept numeric feature columns are copied once into a contiguous float
+    array, NA rows are dropped and min-max scaling is applied in place on that
+    array. The `target` column and non-numeric columns are passed through
+    with their own dtype and unscaled. The output frame keeps the input index
+    and column order.
+    """
+
+    def __init__(
+            self,
+            drop_na: bool = False,
+            drop_columns: Optional[List[str]] = None,
+            normalize: bool = False,
+            dtype: str = "float64",
+            target: Optional[str] = None,
+    ):
+        self.drop_na = drop_na
+        self.drop_columns = drop_columns
+        self.normalize = normalize
+        self.dtype = dtype
+        self.target = target
+
+    def _select_columns(self, X: pd.DataFrame) -> None:
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        drop_columns = set(self.drop_columns or [])
+        self.columns_ = [column for column in X.columns if column not in drop_columns]
+        self.numeric_columns_ = [
+            column for column in self.columns_
+            if column != self.target and pd.api.types.is_numeric_dtype(X[column])
+        ]
+        self.passthrough_columns_ = [
+            column for column in self.columns_ if column not in set(self.numeric_columns_)
+        ]
+
+    def _to_array(self, X: pd.DataFrame) -> Tuple[np.ndarray, pd.Index, Optional[pd.DataFrame]]:
+        array = np.empty((len(X), len(self.numeric_columns_)), dtype=self.dtype, order="C")
+        for i, column in enumerate(self.numeric_columns_):
+            try:
+                array[:, i] = X[column].to_numpy()
+            except (TypeError, ValueError) as e:
+                raise ValueError(
+                    f"Column `{column}` was numeric when the preprocessor was fitted "
+                    f"but has dtype {X[column].dtype} now"
+                ) from e
+        index = X.index
+        passthrough = X[self.passthrough_columns_] if self.passthrough_columns_ else None
+        if self.drop_na:
+            mask = ~np.isnan(array).any(axis=1)
+            if passthrough is not None:
+                mask &= passthrough.notna().all(axis=1).to_numpy()
+            if not mask.all():
+                array, index = array[mask], index[mask]
+                if passthrough is not None:
+                    passthrough = passthrough[mask]
+        return array, index, passthrough
+
+    def _to_frame(
+            self, array: np.ndarray, index: pd.Index, passthrough: Optional[pd.DataFrame]
+    ) -> pd.DataFrame:
+        if self.normalize:
+            array -= self.min_
+            array *= self.scale_
+        frame = pd.DataFrame(array, columns=self.numeric_columns_, index=index, copy=False)
+        if passthrough is None:
+            return frame
+        return pd.concat([frame, passthrough], axis=1)[self.columns_]
+
+    def _fit_array(self, array: np.ndarray) -> None:
+        if self.normalize:
+            data_min = np.nanmin(array, axis=0)
+            data_range = np.nanmax(array, axis=0) - data_min
+            # constant columns are left unscaled, same as MinMaxScaler
+            data_range[data_range == 0.0] = 1.0
+            self.min_ = data_min
+            self.scale_ = 1.0 / data_range
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self._select_columns(X)
+        self._fit_array(self._to_array(X)[0])
+        return self
+
+    def fit_transform(self, X: pd.DataFrame, y=None, **fit_params) -> pd.DataFrame:
+        self._select_columns(X)
+        array, index, passthrough = self._to_array(X)
+        self._fit_array(array)
+        return self._to_frame(array, index, passthrough)
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        return self._to_frame(*self._to_array(X))
+
+
+def transform_inference_frame(preprocess_pipeline, X: pd.DataFrame, target: str) -> pd.DataFrame:
+    """Apply the fitted training preprocess pipeline to a frame without target.
+
+    The pipeline was fitted with the target column in place, so a dummy target
+    is added before and dropped after the transformation.
+    """
+    X = X.assign(**{target: 1})
+    X = preprocess_pipeline.transform(X)
+    return X.drop(columns=[target])
@@ -0,0 +1,148 @@
+import cProfile
+import functools
+import inspect
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.resources import RSSSampler
+
+from zenml import get_step_context, log_metadata
+from zenml.client import Client
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# set to a directory to dump a cProfile file per step run
+# (e.g. for `snakeviz` or `flameprof` flamegraphs)
+PROFILE_DIR_ENV = "E2E_PROFILE_DIR"
+
+# marks a profiled step running in this thread, steps it calls are not profiled again
+_active = threading.local()
+
+
+def _size_mb(value: Any) -> Optional[float]:
+    """In-memory size of artifact-like values, `None` if it can't be cheaply estimated."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = value.memory_usage(deep=True)
+        return float(size.sum() if isinstance(value, pd.DataFrame) else size) / 1024 ** 2
+    if isinstance(value, np.ndarray):
+        return value.nbytes / 1024 ** 2
+    if isinstance(value, (str, bytes)):
+        return len(value) / 1024 ** 2
+    if isinstance(value, (tuple, list)):
+        sizes = [_size_mb(item) for item in value]
+        sizes = [size for size in sizes if size is not None]
+        return sum(sizes) if sizes else None
+    return None
+
+
+def _step_run_name(default: str) -> str:
+    try:
+        context = get_step_context()
+        return f"{context.step_run.name}_{context.pipeline_run.id}"
+    except RuntimeError:
+        return default
+
+
+def _log_profile(profile: Dict[str, Any]) -> None:
+    try:
+        log_metadata(metadata={"profiling": profile})
+    except RuntimeError:
+        # called outside of a step run, e.g. through `step.entrypoint` in benchmarks
+        logger.debug(f"Step profile: {profile}")
+
+
+def profile_step(func: Callable) -> Callable:
+    """Record resource usage of a step as `profiling` step run metadata.
+
+    Captures wall time, CPU time, peak RSS and its growth during the step and
+    in-memory sizes of inputs and outputs. If `E2E_PROFILE_DIR` is set, a
+    cProfile file of the step is written there as well. A step called through
+    `.entrypoint` from another profiled step is counted in the caller's
+    profile only. Apply it below `@step`:
+
+        @step
+        @profile_step
+        def my_step(...):
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(_active, "step", None) is not None:
+            return func(*args, **kwargs)
+        inputs = signature.bind(*args, **kwargs).arguments
+        input_sizes = {name: _size_mb(value) for name, value in inputs.items()}
+        profile_dir = os.environ.get(PROFILE_DIR_ENV)
+        profiler = cProfile.Profile() if profile_dir else None
+
+        result, failed = None, True
+        _active.step = func.__name__
+        sampler = RSSSampler().start()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _active.step = None
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            sampler.stop()
+
+            profile = {
+                "wall_time_s": wall_time,
+                "cpu_time_s": cpu_time,
+                "peak_rss_mb": sampler.peak_mb,
+                "rss_growth_mb": sampler.delta_mb,
+                "input_sizes_mb": {name: size for name, size in input_sizes.items() if size is not None},
+                "failed": failed,
+            }
+            output_size = _size_mb(result)
+            if output_size is not None:
+                profile["output_size_mb"] = output_size
+            if profiler is not None:
+                os.makedirs(profile_dir, exist_ok=True)
+                profile_path = os.path.join(profile_dir, f"{_step_run_name(func.__name__)}.prof")
+                profiler.dump_stats(profile_path)
+                profile["profile_path"] = profile_path
+            logger.info(
+                f"Step `{func.__name__}` took {wall_time:.2f}s wall, {cpu_time:.2f}s CPU, "
+                f"peak RSS {sampler.peak_mb:.0f} MB"
+            )
+            _log_profile(profile)
+
+    # ZenML parses step inputs and outputs from the signature
+    wrapper.__signature__ = signature
+    return wrapper
+
+
+def load_step_profiles(pipeline_name: str, last_n_runs: int = 10) -> pd.DataFrame:
+    """Collect `profiling` metadata of all steps over the last runs of a pipeline.
+
+    Args:
+        pipeline_name: Name of the pipeline, e.g. `e2e_use_case_training`.
+        last_n_runs: Number of most recent runs to include.
+
+    Returns:
+        One row per step run with its profiling metrics.
+    """
+    rows: List[Dict[str, Any]] = []
+    runs = Client().list_pipeline_runs(
+        pipeline_name=pipeline_name, sort_by="desc:created", size=last_n_runs
+    )
+    for run in runs:
+        for step_name, step_run in run.steps.items():
+            profile = step_run.run_metadata.get("profiling")
+            if profile:
+                rows.append({"run": run.name, "step": step_name, **profile})
+    return pd.DataFrame(rows)
@@ -0,0 +1,85 @@
+import resource
+import sys
+import threading
+
+
+def _maxrss_to_mb(maxrss: int) -> float:
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return maxrss / 1024 ** 2
+    return maxrss / 1024
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB.
+
+    This is the peak over the whole process lifetime, so with steps sharing a
+    process (local orchestrator) it is not a per-step number; use `RSSSampler`
+    for a block of code.
+    """
+    return _maxrss_to_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def peak_children_rss_mb() -> float:
+    """Peak resident set size of the largest terminated child process in MB.
+
+    Workers that are still alive (e.g. reused joblib workers) are not included.
+    """
+    return _maxrss_to_mb(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def current_rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux), peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 1024 ** 2
+    except OSError:
+        return peak_rss_mb()
+
+
+class RSSSampler:
+    """Track the peak RSS of the process while a block of code runs.
+
+    RSS is sampled from a background thread, which does not slow down the
+    measured code the way allocation tracing does. Allocations that live
+    shorter than `interval` seconds may be missed.
+
+    Example:
+        with RSSSampler() as sampler:
+            model.fit(X, y)
+        sampler.peak_mb, sampler.delta_mb
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_mb = 0.0
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def delta_mb(self) -> float:
+        """Peak RSS growth over the RSS at the start of the block."""
+        return self.peak_mb - self.start_mb
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def start(self) -> "RSSSampler":
+        self.start_mb = self.peak_mb = current_rss_mb()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
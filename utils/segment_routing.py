@@ -0,0 +1,172 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.hashing import hash_object
+from utils.preprocess import transform_inference_frame
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_model_spec(spec: str) -> Tuple[str, str]:
+    """Split a `name:version` model spec, the version being a number or stage."""
+    name, sep, version = spec.rpartition(":")
+    if not sep or not name or not version:
+        raise ValueError(f"Model spec `{spec}` is not of the form `name:version`")
+    return name, version
+
+
+class ModelCache:
+    """In-process LRU cache of loaded models keyed by model spec.
+
+    At most `max_models` models are held, the least recently used one is
+    dropped when another model has to be loaded.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], max_models: int = 8):
+        self.loader = loader
+        self.max_models = max_models
+        self.hits = 0
+        self.misses = 0
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, spec: str) -> Any:
+        if spec in self._models:
+            self.hits += 1
+            self._models.move_to_end(spec)
+            return self._models[spec]
+        self.misses += 1
+        model = self.loader(spec)
+        self._models[spec] = model
+        while len(self._models) > self.max_models:
+            evicted, _ = self._models.popitem(last=False)
+            logger.info(f"Evicted model {evicted} from the model cache")
+        return model
+
+    def __contains__(self, spec: str) -> bool:
+        return spec in self._models
+
+
+def segment_label(value: Any) -> Optional[str]:
+    """Segment value as the string it is routed by, `None` if missing.
+
+    Integral floats lose their fraction, so `1`, `1.0` and `"1"` are the same
+    segment whether they come from a config key or a float column with NAs.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def route_segments(
+        segments: pd.Series,
+        segment_models: Dict[Any, str],
+        default_model: Optional[str] = None,
+) -> Dict[str, np.ndarray]:
+    """Row positions routed to each model spec by segment value.
+
+    Segment values and `segment_models` keys are compared by `segment_label`;
+    rows of segments without a model, including rows missing the segment, go
+    to `default_model` or stay unrouted with a warning.
+    """
+    models = {segment_label(key): spec for key, spec in segment_models.items()}
+    codes, values = pd.factorize(segments)
+    labels = [segment_label(value) for value in values]
+    routes: Dict[str, List[np.ndarray]] = {}
+    unrouted: Dict[str, int] = {}
+    # code -1 marks missing values
+    for code in range(-1, len(values)):
+        rows = np.flatnonzero(codes == code)
+        if not len(rows):
+            continue
+        label = labels[code] if code >= 0 else None
+        spec = models.get(label, default_model) if label is not None else default_model
+        if spec is None:
+            name = "<missing>" if label is None else label
+            unrouted[name] = unrouted.get(name, 0) + len(rows)
+            continue
+        routes.setdefault(spec, []).append(rows)
+    if unrouted:
+        logger.warning(
+            f"No model for segment value(s) {', '.join(f'`{name}`' for name in sorted(unrouted))}, "
+            f"their {sum(unrouted.values())} rows are not scored"
+        )
+    return {spec: np.sort(np.concatenate(rows)) for spec, rows in routes.items()}
+
+
+def score_segments(
+        dataset: pd.DataFrame,
+        segment_key: str,
+        segment_models: Dict[Any, str],
+        model_cache: ModelCache,
+        load_preprocess_pipeline: Callable[[str], Any],
+        target: str = "target",
+        default_model: Optional[str] = None,
+        segment_key_is_feature: bool = False,
+) -> Tuple[pd.Series, Dict[str, Any]]:
+    """Score every row with the model of its segment.
+
+    Models whose preprocess pipelines hash the same share one transformation
+    of all their rows; each model is then taken from `model_cache` and
+    predicts only its own rows.
+
+    Args:
+        dataset: Raw scoring set including `segment_key`.
+        segment_key: Column routing rows to models.
+        segment_models: Model spec `name:version` per segment value, see `route_segments`.
+        model_cache: Cache loading models by spec.
+        load_preprocess_pipeline: Loads the preprocess pipeline of a model spec.
+        target: Name of target column the pipelines were fitted with.
+        default_model: Model spec for segments missing in `segment_models`.
+        segment_key_is_feature: If `True` the models were trained with
+            `segment_key` as a feature, otherwise it is dropped before preprocessing.
+
+    Returns:
+        Predictions in the row order of `dataset`, missing for unrouted rows,
+        and rows, preprocessing group and cache statistics.
+    """
+    routes = route_segments(dataset[segment_key], segment_models, default_model)
+    features_in = dataset if segment_key_is_feature else dataset.drop(columns=[segment_key])
+    groups: Dict[str, Tuple[Any, List[str]]] = {}
+    # models still cached are used first, before loading others can evict them
+    for spec in sorted(routes, key=lambda spec: spec not in model_cache):
+        pipeline = load_preprocess_pipeline(spec)
+        groups.setdefault(hash_object(pipeline), (pipeline, []))[1].append(spec)
+
+    predictions = np.full(len(dataset), None, dtype=object)
+    hits, misses = model_cache.hits, model_cache.misses
+    for pipeline_hash, (pipeline, specs) in groups.items():
+        rows = np.sort(np.concatenate([routes[spec] for spec in specs]))
+        features = transform_inference_frame(pipeline, features_in.iloc[rows], target)
+        if len(features) != len(rows):
+            raise ValueError(
+                f"Preprocess pipeline {pipeline_hash[:12]} dropped rows, "
+                "predictions can't be routed back to the scoring set"
+            )
+        for spec in specs:
+            spec_rows = routes[spec]
+            model = model_cache.get(spec)
+            predictions[spec_rows] = np.asarray(
+                model.predict(features.iloc[np.searchsorted(rows, spec_rows)])
+            )
+        logger.info(
+            f"Scored {len(rows)} rows with {len(specs)} model(s) sharing preprocess "
+            f"pipeline {pipeline_hash[:12]}"
+        )
+
+    stats = {
+        "rows_per_model": {spec: int(len(rows)) for spec, rows in routes.items()},
+        "unrouted_rows": int(len(dataset) - sum(len(rows) for rows in routes.values())),
+        "preprocess_groups": len(groups),
+        "model_cache_hits": model_cache.hits - hits,
+        "model_cache_misses": model_cache.misses - misses,
+    }
+    return pd.Series(predictions, index=dataset.index, name="predicted").infer_objects(), stats
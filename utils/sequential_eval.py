@@ -0,0 +1,126 @@
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import beta, norm
+from sklearn.base import ClassifierMixin
+
+INTERVAL_METHODS = ("wilson", "clopper_pearson")
+
+
+def wilson_interval(
+        successes: int,
+        n: int,
+        confidence: float = 0.99,
+        population: Optional[int] = None,
+) -> Tuple[float, float]:
+    """Wilson score interval of a proportion.
+
+    With `population` the sample is treated as drawn without replacement and
+    the interval shrinks by the finite population correction, down to a point
+    once the whole population is scored.
+    """
+    if n == 0:
+        return 0.0, 1.0
+    z = norm.ppf(0.5 + confidence / 2)
+    if population is not None and population > 1:
+        z *= np.sqrt(max(population - n, 0) / (population - 1))
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return float(max(center - half_width, 0.0)), float(min(center + half_width, 1.0))
+
+
+def clopper_pearson_interval(
+        successes: int,
+        n: int,
+        confidence: float = 0.99,
+        population: Optional[int] = None,
+) -> Tuple[float, float]:
+    """Clopper-Pearson (exact binomial) interval of a proportion.
+
+    Conservative and still of positive width when all or none of the rows
+    are successes. With `population` both bounds move towards the observed
+    proportion by the finite population correction, as in `wilson_interval`.
+    """
+    if n == 0:
+        return 0.0, 1.0
+    alpha = (1 - confidence) / 2
+    lower = beta.ppf(alpha, successes, n - successes + 1) if successes > 0 else 0.0
+    upper = beta.ppf(1 - alpha, successes + 1, n - successes) if successes < n else 1.0
+    if population is not None and population > 1:
+        p = successes / n
+        correction = np.sqrt(max(population - n, 0) / (population - 1))
+        lower, upper = p - (p - lower) * correction, p + (upper - p) * correction
+    return float(lower), float(upper)
+
+
+def sequential_accuracy(
+        model: ClassifierMixin,
+        features: pd.DataFrame,
+        labels: pd.Series,
+        threshold: float,
+        confidence: float = 0.99,
+        initial_sample_size: int = 1000,
+        growth_factor: float = 4.0,
+        method: str = "wilson",
+        random_state: int = 42,
+) -> Dict[str, Any]:
+    """Estimate accuracy on growing random samples until it is clearly on one side of a threshold.
+
+    Rows are scored in a fixed random order, each round only predicts the rows
+    added to the sample. Scoring stops as soon as the confidence interval
+    lies entirely above or below `threshold`, or once all rows are scored.
+    Every look at the data is a chance to stop on noise, so each interval is
+    built at a Bonferroni corrected confidence over the number of rounds that
+    can end early, keeping the overall error rate within `1 - confidence`.
+
+    Args:
+        model: Fitted classifier.
+        features: Features to score.
+        labels: True labels of `features`.
+        threshold: Minimum acceptable accuracy.
+        confidence: Overall confidence level of the decision.
+        initial_sample_size: Rows scored in the first round.
+        growth_factor: Factor the sample grows by per round.
+        method: Interval method, "wilson" or "clopper_pearson".
+        random_state: Seed of the row order.
+
+    Returns:
+        Accuracy estimate, interval bounds, rows scored and the decision,
+        one of "pass", "fail" (interval clear of the threshold) or "exact"
+        (all rows scored).
+    """
+    if method not in INTERVAL_METHODS:
+        raise ValueError(f"Unknown interval method `{method}`, expected one of {INTERVAL_METHODS}")
+    n_rows = len(features)
+    order = np.random.default_rng(random_state).permutation(n_rows)
+    labels = labels.to_numpy()
+    correct = np.empty(n_rows, dtype=bool)
+    n_scored = 0
+    sample_size = min(max(initial_sample_size, 1), n_rows)
+    # rounds before the sample reaches all rows, the last one is exact
+    n_looks = max(int(np.ceil(np.log(n_rows / sample_size) / np.log(growth_factor))), 1)
+    look_confidence = 1 - (1 - confidence) / n_looks
+    while True:
+        batch = order[n_scored:sample_size]
+        correct[n_scored:sample_size] = (
+            np.asarray(model.predict(features.iloc[batch])) == labels[batch]
+        )
+        n_scored = sample_size
+        accuracy = float(correct[:n_scored].mean())
+        if n_scored == n_rows:
+            return {
+                "accuracy": accuracy, "lower": accuracy, "upper": accuracy,
+                "n_scored": n_scored, "n_rows": n_rows, "decision": "exact",
+            }
+        interval = wilson_interval if method == "wilson" else clopper_pearson_interval
+        lower, upper = interval(int(correct[:n_scored].sum()), n_scored, look_confidence, population=n_rows)
+        if lower >= threshold or upper < threshold:
+            return {
+                "accuracy": accuracy, "lower": lower, "upper": upper,
+                "n_scored": n_scored, "n_rows": n_rows,
+                "decision": "pass" if lower >= threshold else "fail",
+            }
+        sample_size = min(int(np.ceil(sample_size * growth_factor)), n_rows)
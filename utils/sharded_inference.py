@@ -0,0 +1,232 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.pipeline import Pipeline
+from threadpoolctl import threadpool_limits
+
+from utils.chunked_io import ParquetChunkWriter
+from utils.drift import DriftSketch
+from utils.preprocess import transform_inference_frame
+
+from zenml.logger import get_logger
+
+logger = get_logger(__name__)
+
+# preprocess pipeline, model and drift reference, loaded once per worker process
+_worker_state: Dict[str, Any] = {}
+
+
+def count_rows(path: str) -> int:
+    """Number of data rows of a CSV or Parquet file."""
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, "rb") as f:
+            return max(sum(1 for _ in f) - 1, 0)
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def shard_bounds(n_rows: int, n_shards: int) -> List[Tuple[int, int]]:
+    """Split `n_rows` into `n_shards` contiguous, nearly equal row ranges."""
+    n_shards = max(1, min(n_shards, n_rows))
+    size, remainder = divmod(n_rows, n_shards)
+    bounds, start = [], 0
+    for i in range(n_shards):
+        stop = start + size + (1 if i < remainder else 0)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def _iter_row_range(path: str, start: int, stop: int, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Chunks of rows `start:stop` of a CSV or Parquet file."""
+    if os.path.splitext(path)[1].lower() == ".csv":
+        if stop > start:
+            # skipping a count of lines, a range of rows to skip is turned into a set
+            # of all of them, which costs as much as reading them
+            names = pd.read_csv(path, nrows=0).columns.tolist()
+            yield from pd.read_csv(
+                path, skiprows=start + 1, header=None, names=names,
+                nrows=stop - start, chunksize=chunk_size,
+            )
+        return
+    parquet_file = pq.ParquetFile(path)
+    row_group_start = 0
+    for i in range(parquet_file.num_row_groups):
+        row_group_rows = parquet_file.metadata.row_group(i).num_rows
+        row_group_stop = row_group_start + row_group_rows
+        if row_group_stop > start and row_group_start < stop:
+            # skip row groups outside of the shard, slice the boundary ones
+            offset = row_group_start
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, row_groups=[i]):
+                batch_start, batch_stop = max(start - offset, 0), min(stop - offset, len(batch))
+                if batch_stop > batch_start:
+                    yield batch.slice(batch_start, batch_stop - batch_start).to_pandas()
+                offset += len(batch)
+        row_group_start = row_group_stop
+        if row_group_start >= stop:
+            break
+
+
+def _init_worker(
+        preprocess_pipeline: Pipeline,
+        predictor: Any,
+        target: str,
+        reference_sketch: Optional[DriftSketch],
+) -> None:
+    # shards are the unit of parallelism, nested BLAS/OpenMP threads would oversubscribe cores
+    threadpool_limits(1)
+    if "n_jobs" in getattr(predictor, "get_params", dict)():
+        predictor.set_params(n_jobs=1)
+    _worker_state.update(
+        preprocess_pipeline=preprocess_pipeline,
+        predictor=predictor,
+        target=target,
+        reference_sketch=reference_sketch,
+    )
+
+
+def _score_shard(
+        shard_index: int,
+        source_path: str,
+        start: int,
+        stop: int,
+        chunk_size: int,
+        output_dir: str,
+) -> Tuple[int, str, int, Optional[DriftSketch]]:
+    reference_sketch = _worker_state["reference_sketch"]
+    sketch = reference_sketch.empty_like() if reference_sketch is not None else None
+    path = os.path.join(output_dir, f"shard_{shard_index:05d}.parquet")
+    # written under a temporary name, so a failed attempt never leaves a partial shard
+    tmp_path = f"{path}.tmp"
+    row_id = start
+    with ParquetChunkWriter(tmp_path) as writer:
+        for chunk in _iter_row_range(source_path, start, stop, chunk_size):
+            features = transform_inference_frame(
+                _worker_state["preprocess_pipeline"], chunk, _worker_state["target"]
+            )
+            if len(features) != len(chunk):
+                raise ValueError(
+                    f"Preprocess pipeline dropped {len(chunk) - len(features)} of the rows "
+                    f"{row_id}..{row_id + len(chunk) - 1}, predictions can't be matched to "
+                    "the scoring set rows"
+                )
+            if sketch is not None:
+                sketch.update(features)
+            writer.write(pd.DataFrame({
+                "row_id": range(row_id, row_id + len(chunk)),
+                "predicted": _worker_state["predictor"].predict(features),
+            }))
+            row_id += len(chunk)
+    os.replace(tmp_path, path)
+    return shard_index, path, row_id - start, sketch
+
+
+def run_sharded_inference(
+        source_path: str,
+        output_path: str,
+        preprocess_pipeline: Pipeline,
+        predictor: Any,
+        target: str = "target",
+        n_shards: Optional[int] = None,
+        n_workers: Optional[int] = None,
+        chunk_size: int = 100_000,
+        max_retries: int = 2,
+        reference_sketch: Optional[DriftSketch] = None,
+) -> Dict[str, Any]:
+    """Score a CSV/Parquet file in contiguous row shards over a process pool.
+
+    Every worker loads the preprocess pipeline and model once in its initializer
+    and scores whole shards chunk by chunk into shard files, which are merged
+    in row order into `output_path`. `row_id` of a prediction is the position
+    of its row in the scoring set, so the preprocess pipeline must not drop
+    rows. A failing shard is resubmitted on its own up to `max_retries` times,
+    unless it failed on invalid data; if a worker process dies, the pool is
+    restarted and only unfinished shards are resubmitted.
+
+    Args:
+        source_path: Path to the scoring set (`.csv` or `.parquet`).
+        output_path: Path of the merged predictions Parquet file.
+        preprocess_pipeline: Fitted training preprocess pipeline.
+        predictor: Model or compact model to predict with.
+        target: Name of target column the pipeline was fitted with.
+        n_shards: Number of shards, one per worker by default.
+        n_workers: Number of worker processes, all CPUs by default.
+        chunk_size: Number of rows per chunk within a shard.
+        max_retries: Attempts per shard after its first failure.
+        reference_sketch: Drift sketch of the train dataset, comparison sketches
+            of all shards are merged if given.
+
+    Returns:
+        Row count, shard count, retries and merged comparison drift sketch.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    total_rows = count_rows(source_path)
+    if total_rows == 0:
+        raise ValueError(f"Scoring set {source_path} has no rows")
+    bounds = shard_bounds(total_rows, n_shards or n_workers)
+    output_dir = tempfile.mkdtemp(prefix="shards_", dir=os.path.dirname(os.path.abspath(output_path)))
+    initargs = (preprocess_pipeline, predictor, target, reference_sketch)
+
+    results: Dict[int, Tuple[str, int, Optional[DriftSketch]]] = {}
+    attempts = {i: 0 for i in range(len(bounds))}
+    try:
+        while len(results) < len(bounds):
+            with ProcessPoolExecutor(
+                    max_workers=min(n_workers, len(bounds)),
+                    initializer=_init_worker,
+                    initargs=initargs,
+            ) as executor:
+                def submit(i):
+                    attempts[i] += 1
+                    return executor.submit(
+                        _score_shard, i, source_path, *bounds[i], chunk_size, output_dir
+                    )
+
+                in_flight = {submit(i): i for i in range(len(bounds)) if i not in results}
+                try:
+                    while in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            i = in_flight.pop(future)
+                            try:
+                                _, path, n_rows, sketch = future.result()
+                            except (BrokenProcessPool, ValueError):
+                                # a dead pool is handled below, invalid data fails every attempt
+                                raise
+                            except Exception as e:
+                                if attempts[i] > max_retries:
+                                    raise RuntimeError(f"Shard {i} failed {attempts[i]} times") from e
+                                logger.warning(f"Shard {i} failed ({e!r}), retrying")
+                                in_flight[submit(i)] = i
+                                continue
+                            results[i] = (path, n_rows, sketch)
+                except BrokenProcessPool:
+                    unfinished = [i for i in range(len(bounds)) if i not in results]
+                    if any(attempts[i] > max_retries for i in unfinished):
+                        raise
+                    logger.warning(f"Worker process died, restarting pool for shards {unfinished}")
+
+        merged_sketch = reference_sketch.empty_like() if reference_sketch is not None else None
+        n_rows = 0
+        with ParquetChunkWriter(output_path) as writer:
+            for i in range(len(bounds)):
+                path, shard_rows, sketch = results[i]
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+                    writer.write(batch.to_pandas())
+                n_rows += shard_rows
+                if merged_sketch is not None:
+                    merged_sketch.merge(sketch)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        "rows": n_rows,
+        "shards": len(bounds),
+        "retries": sum(attempts.values()) - len(bounds),
+        "comparison_sketch": merged_sketch,
+    }
@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _write_array(path: str, values: np.ndarray) -> None:
+    array = np.lib.format.open_memmap(
+        path, mode="w+", dtype=values.dtype, shape=values.shape
+    )
+    array[:] = values
+    array.flush()
+    del array
+
+
+def materialize_shared_dataset(
+        dataset_trn: pd.DataFrame,
+        dataset_tst: pd.DataFrame,
+        target: str,
+        root_dir: str,
+        dtype: str = "float32",
+) -> Dict[str, Any]:
+    """Write train/test features and targets as `.npy` files for memory-mapped reads.
+
+    Features are stored as one contiguous C-ordered matrix per split, so every
+    reader maps the same pages instead of holding a private copy. Column names
+    are kept in the manifest only.
+
+    Args:
+        dataset_trn: The train dataset.
+        dataset_tst: The test dataset.
+        target: Name of target column.
+        root_dir: Directory to write the arrays and manifest to.
+        dtype: Float dtype of the feature matrices.
+
+    Returns:
+        Manifest describing the written arrays.
+    """
+    os.makedirs(root_dir, exist_ok=True)
+    columns = [column for column in dataset_trn.columns if column != target]
+    manifest = {
+        "root_dir": root_dir,
+        "target": target,
+        "columns": columns,
+        "dtype": dtype,
+    }
+    for split, dataset in (("train", dataset_trn), ("test", dataset_tst)):
+        features_path = os.path.join(root_dir, f"{split}_features.npy")
+        target_path = os.path.join(root_dir, f"{split}_target.npy")
+        _write_array(
+            features_path,
+            np.ascontiguousarray(dataset[columns].to_numpy(dtype=dtype)),
+        )
+        _write_array(target_path, dataset[target].to_numpy())
+        manifest[split] = {
+            "features": features_path,
+            "target": target_path,
+            "rows": int(len(dataset)),
+        }
+
+    with open(os.path.join(root_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_shared_dataset(
+        manifest: Dict[str, Any],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Open the arrays of a shared dataset as read-only memory maps.
+
+    joblib passes `np.memmap` arguments to its workers by file reference,
+    so search workers read the same pages without pickling the data.
+
+    Args:
+        manifest: Manifest returned by `materialize_shared_dataset`.
+
+    Returns:
+        Train features, train target, test features and test target.
+    """
+    arrays = []
+    for split in ("train", "test"):
+        arrays.append(np.load(manifest[split]["features"], mmap_mode="r"))
+        arrays.append(np.load(manifest[split]["target"], mmap_mode="r"))
+    return tuple(arrays)
+
+
+def remove_shared_dataset(manifest: Dict[str, Any]) -> None:
+    """Delete the arrays and manifest of a shared dataset."""
+    shutil.rmtree(manifest["root_dir"], ignore_errors=True)
+
+
+def prune_shared_datasets(parent_dir: str, max_age_s: float = 24 * 3600) -> None:
+    """Delete shared datasets under `parent_dir` left behind by runs that failed.
+
+    Args:
+        parent_dir: Directory holding one shared dataset directory per run.
+        max_age_s: Age in seconds above which a shared dataset is deleted.
+    """
+    if not os.path.isdir(parent_dir):
+        return
+    now = time.time()
+    for name in os.listdir(parent_dir):
+        path = os.path.join(parent_dir, name)
+        if os.path.isdir(path) and now - os.path.getmtime(path) > max_age_s:
+            shutil.rmtree(path, ignore_errors=True)